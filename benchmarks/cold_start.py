@@ -0,0 +1,68 @@
+"""Cold-start cost of the first render: wall time and peak RSS.
+
+Each sample is a fresh interpreter that imports Streamlit and runs the app
+once headlessly (``AppTest``) on the clean calculator screen, which is what
+a new server process pays before its first page. ``--preload pandas``
+imports a module up front to reproduce an app that loads it eagerly.
+
+    $ python benchmarks/cold_start.py --runs 7
+    $ python benchmarks/cold_start.py --runs 7 --preload pandas
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+CHILD = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+for name in sys.argv[2:]:
+    importlib.import_module(name)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.session_state.app_version = "clean"
+at.run()
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "pandas_loaded": "pandas" in sys.modules,
+    "exceptions": len(at.exception),
+}))
+"""
+
+
+def sample(app, preload):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DIMEAL_DB=os.path.join(tmp, "dimeal.db"), DIMEAL_HISTORY=os.path.join(tmp, "history"))
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, app, *preload],
+            capture_output=True, text=True, check=True, env=env,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--preload", nargs="*", default=[], help="Modules to import before the app.")
+    args = parser.parse_args()
+
+    samples = [sample(args.app, args.preload) for _ in range(args.runs)]
+    print(json.dumps({
+        "runs": args.runs,
+        "preload": args.preload,
+        "median_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+        "median_max_rss_mb": round(statistics.median(s["max_rss_mb"] for s in samples), 1),
+        "pandas_loaded": any(s["pandas_loaded"] for s in samples),
+        "exceptions": sum(s["exceptions"] for s in samples),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
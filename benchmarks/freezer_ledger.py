@@ -0,0 +1,129 @@
+"""Freezer view cost with years of ledger history.
+
+Fills a scratch database with ``--years`` of daily meals for ``--dogs``
+dogs (one entry per dog per day) and a batch of every recipe each week,
+through the same trigger the app's writes go through. It then times a
+fresh store's first read of the stock and forecast, against re-summing
+the whole ledger, before and after compaction.
+
+    $ python benchmarks/freezer_ledger.py --years 3 --dogs 100
+    $ python benchmarks/freezer_ledger.py --years 5 --dogs 500 --json
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dimeal.inventory import forecast  # noqa: E402
+from dimeal.storage import SCHEMA, StateStore  # noqa: E402
+
+RECIPES = ("Chicken", "Turkey", "Beef", "Fish")
+
+
+def seed(path, years, dogs):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    start = datetime.date.today() - datetime.timedelta(days=365 * years)
+    names = [f"Dog {i:04d}" for i in range(dogs)]
+    rows = 0
+    with conn:
+        for n in range(365 * years):
+            day = (start + datetime.timedelta(days=n)).isoformat()
+            recipe = RECIPES[(n // 7) % len(RECIPES)]
+            entries = [(day, "eaten", recipe, dog, -12.0, None) for dog in names]
+            if n % 7 == 0:
+                entries += [(day, "cooked", name, None, 12.0 * 7 * dogs, 1.0) for name in RECIPES]
+            conn.executemany(
+                "INSERT INTO freezer_ledger (day, kind, recipe, dog, oz, scale) VALUES (?, ?, ?, ?, ?, ?)", entries
+            )
+            rows += len(entries)
+    conn.close()
+    return rows
+
+
+def time_view(path, repeats):
+    """Median ms for a new store's first stock read and forecast."""
+    samples = []
+    for _ in range(repeats):
+        store = StateStore(path)
+        start = time.perf_counter()
+        stock = store.freezer_stock()
+        forecast({name: on_hand for name, (on_hand, _) in stock.items()}, dict.fromkeys(RECIPES, 37.5))
+        store.freezer_ledger()
+        samples.append((time.perf_counter() - start) * 1000)
+        store.close()
+    return statistics.median(samples), stock
+
+
+def time_resum(path, repeats):
+    """Median ms to rebuild the stock from the whole ledger instead."""
+    conn = sqlite3.connect(path)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stock = dict(conn.execute("SELECT recipe, sum(oz) FROM freezer_ledger GROUP BY recipe"))
+        samples.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    return statistics.median(samples), stock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--dogs", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "freezer.db")
+        started = time.perf_counter()
+        rows = seed(path, args.years, args.dogs)
+        seed_seconds = time.perf_counter() - started
+
+        view_ms, stock = time_view(path, args.repeats)
+        resum_ms, resummed = time_resum(path, args.repeats)
+        if any(abs(stock[name][0] - resummed[name]) > 1e-6 for name in RECIPES):
+            raise SystemExit("running totals disagree with the ledger")
+
+        store = StateStore(path)
+        started = time.perf_counter()
+        store.compact_freezer_ledger(datetime.date.today() - datetime.timedelta(days=365))
+        store.flush()
+        compact_seconds = time.perf_counter() - started
+        remaining = store._conn.execute("SELECT count(*) FROM freezer_ledger").fetchone()[0]
+        store.close()
+        compacted_view_ms, compacted_stock = time_view(path, args.repeats)
+        if compacted_stock != stock:
+            raise SystemExit("compaction changed the stock")
+
+    result = {
+        "ledger_rows": rows,
+        "seed_seconds": round(seed_seconds, 1),
+        "view_ms": round(view_ms, 2),
+        "resum_ms": round(resum_ms, 2),
+        "compact_seconds": round(compact_seconds, 2),
+        "rows_after_compaction": remaining,
+        "compacted_view_ms": round(compacted_view_ms, 2),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{rows} ledger entries (seeded in {result['seed_seconds']} s)")
+        print(f"freezer view: {result['view_ms']} ms; re-summing the ledger: {result['resum_ms']} ms")
+        print(
+            f"compaction: {result['compact_seconds']} s, {remaining} entries left; "
+            f"view afterwards: {result['compacted_view_ms']} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
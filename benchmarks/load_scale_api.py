@@ -0,0 +1,101 @@
+"""Load test for the local scaling API (``python -m dimeal serve``).
+
+Opens keep-alive HTTP/1.1 connections to localhost and issues GET /scale
+requests over a realistic input grid (four recipes, 0.5 oz steps, 1-14
+days) for a fixed duration, then reports throughput and latency
+percentiles.
+
+    $ python -m dimeal serve --port 8600 &
+    $ python benchmarks/load_scale_api.py --port 8600 --connections 64 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+RECIPES = ("Chicken", "Turkey", "Beef", "Fish")
+
+
+def request_paths(seed, count=4096):
+    rng = random.Random(seed)
+    return [
+        f"/scale?recipe={rng.choice(RECIPES)}&total_daily_oz={rng.randrange(20, 120) / 2}&days={rng.randint(1, 14)}"
+        for _ in range(count)
+    ]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def worker(host, port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(args):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(args.host, args.port, request_paths(seed), deadline, latencies, errors)
+        for seed in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Replay recorded visitor traces across hundreds of concurrent sessions.
+
+Traces are recorded by the app itself: started with ``DIMEAL_TRACE=path``
+it appends every change a visitor makes on the calculators and the
+Profiles tab (widget key, value and seconds into the session) to a
+JSON-lines file. ``record`` starts such a server on localhost and writes
+until Ctrl-C; click through the app in a browser meanwhile.
+
+``replay`` starts the app headlessly with a scratch database (or attaches
+to ``--port``) and runs ``--sessions`` virtual users over the websocket
+protocol the browser uses, started evenly over ``--ramp`` seconds. Each
+user opens a session, replays one recorded trace with its think times
+(scaled by ``--think``, capped at ``--max-think``), closes it and starts
+on the next trace, until ``--duration`` is up. Every ``--interval``
+seconds it samples the open sessions, reruns/s, p99 latency and the
+server's RSS; the report ends with throughput, tail latency and the
+memory growth rate after the ramp. Streamlit keeps a closed session's
+state for two minutes, so memory levels off only after runs that long.
+
+    $ python benchmarks/load_sessions.py record -o traces.jsonl
+    $ python benchmarks/load_sessions.py replay --sessions 200 --duration 300
+    $ python benchmarks/load_sessions.py replay --trace traces.jsonl --think 0.5 --json
+
+Without ``--trace`` the sample in ``benchmarks/sample_trace.jsonl`` is
+replayed. Linux only for the memory samples (``/proc/<pid>/status``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import websockets
+
+from streamlit_client import APP, ROOT, Session, free_port, rss_kb, start_server
+
+sys.path.insert(0, ROOT)
+from dimeal.traces import load_traces  # noqa: E402
+
+SAMPLE_TRACE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_trace.jsonl")
+
+# app_version is switched with a button, not a keyed widget
+VERSION_BUTTONS = {"clean": "✨ Try Mobile App UI", "original": "🔙 Switch to Original Calculator"}
+
+# Grids are keyed by a version that grows with every saved edit
+VERSIONED_KEY = re.compile(r"(.+_grid)_\d+")
+
+
+# -------------------------------------------------------------------
+# Replay
+# -------------------------------------------------------------------
+class Stats:
+    def __init__(self):
+        self.reruns = []     # (finished at, seconds)
+        self.active = 0
+        self.sessions = 0
+        self.skipped = 0
+        self.errors = 0
+
+
+def current_key(session, key):
+    """The key ``key`` has on this session's page, following grid versions."""
+    match = VERSIONED_KEY.fullmatch(key)
+    if match is None:
+        return key
+    pattern = re.compile(rf"-({re.escape(match[1])}_\d+)$")
+    for wid in reversed(session.elements):
+        found = pattern.search(wid)
+        if found:
+            return found[1]
+    raise LookupError(f"no widget like {key!r}")
+
+
+async def replay_event(session, key, value):
+    """Apply one recorded change; returns the rerun's seconds, or None if nothing was sent."""
+    if key == "app_version":
+        return await session.set(True, label=VERSION_BUTTONS[value])
+    key = current_key(session, key)
+    _, kind, _, _ = session.find(key=key)
+    if kind == "button" and not value:  # the click ending
+        return None
+    return await session.set(value, key=key)
+
+
+async def virtual_user(port, traces, first, step, stop_at, think, max_think, stats):
+    index = first
+    while time.monotonic() < stop_at:
+        trace = traces[index % len(traces)]
+        index += step
+        session = None
+        stats.active += 1
+        try:
+            session = await Session.connect(port)
+            stats.sessions += 1
+            stats.reruns.append((time.monotonic(), await session.rerun()))
+            previous = 0.0
+            for t, key, value in trace:
+                await asyncio.sleep(min(max(t - previous, 0.0) * think, max_think))
+                previous = t
+                if time.monotonic() >= stop_at:
+                    break
+                try:
+                    elapsed = await replay_event(session, key, value)
+                except LookupError:  # the page has diverged from the recording
+                    stats.skipped += 1
+                    continue
+                if elapsed is not None:
+                    stats.reruns.append((time.monotonic(), elapsed))
+            stats.errors += session.exceptions
+        except (OSError, websockets.ConnectionClosed):
+            stats.errors += 1
+        finally:
+            stats.active -= 1
+            if session is not None:
+                await session.close()
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+async def sample(stats, pid, started, interval, samples):
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        window = [seconds for finished, seconds in stats.reruns if finished > now - interval]
+        samples.append({
+            "t": round(now - started, 1),
+            "active": stats.active,
+            "reruns_per_s": round(len(window) / interval, 1),
+            "p99_ms": round(percentile(window, 99) * 1000, 1) if window else None,
+            "rss_mb": round(rss_kb(pid) / 1024, 1) if pid else None,
+        })
+
+
+async def replay(port, pid, traces, args):
+    stats = Stats()
+    samples = []
+    started = time.monotonic()
+    stop_at = started + args.duration
+    sampler = asyncio.create_task(sample(stats, pid, started, args.interval, samples))
+
+    users = []
+    for i in range(args.sessions):
+        users.append(asyncio.create_task(virtual_user(
+            port, traces, i, args.sessions, stop_at, args.think, args.max_think, stats,
+        )))
+        await asyncio.sleep(args.ramp / args.sessions)
+    await asyncio.gather(*users)
+    elapsed = time.monotonic() - started
+    sampler.cancel()
+    return stats, samples, elapsed
+
+
+def growth_mb_per_min(samples, after):
+    points = [(s["t"] / 60, s["rss_mb"]) for s in samples if s["t"] >= after and s["rss_mb"] is not None]
+    if len(points) < 2:
+        return float("nan")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var if var else float("nan")
+
+
+def run_replay(args):
+    traces = [events for events in load_traces(args.trace) if events]
+    if not traces:
+        raise SystemExit(f"{args.trace}: no recorded events")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.port:
+            port, pid = args.port, args.pid
+        else:
+            env = dict(os.environ, DIMEAL_DB=os.path.join(tmp, "load.db"), DIMEAL_HISTORY=os.path.join(tmp, "history"))
+            env.pop("DIMEAL_TRACE", None)
+            port = free_port()
+            server = start_server(args.app, port, env)
+            pid = server.pid
+        try:
+            stats, samples, elapsed = asyncio.run(replay(port, pid, traces, args))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    latencies = [seconds for _, seconds in stats.reruns]
+    result = {
+        "sessions": args.sessions,
+        "traces": len(traces),
+        "seconds": round(elapsed, 1),
+        "sessions_opened": stats.sessions,
+        "reruns": len(latencies),
+        "reruns_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            name: round(percentile(latencies, q) * 1000, 1)
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "skipped": stats.skipped,
+        "errors": stats.errors,
+        "rss_growth_mb_per_min": round(growth_mb_per_min(samples, args.ramp), 2),
+        "samples": samples,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{'t (s)':>7} {'active':>7} {'reruns/s':>9} {'p99 ms':>8} {'RSS MB':>8}")
+    for s in samples:
+        p99 = f"{s['p99_ms']:>8.1f}" if s["p99_ms"] is not None else f"{'-':>8}"
+        rss = f"{s['rss_mb']:>8.1f}" if s["rss_mb"] is not None else f"{'-':>8}"
+        print(f"{s['t']:>7.1f} {s['active']:>7} {s['reruns_per_s']:>9.1f} {p99} {rss}")
+    latency = result["latency_ms"]
+    print(
+        f"{result['reruns']} reruns in {result['seconds']:.0f} s ({result['reruns_per_s']:.1f}/s) "
+        f"from {result['sessions_opened']} sessions; "
+        f"p50 {latency['p50']:.0f} ms, p90 {latency['p90']:.0f} ms, p99 {latency['p99']:.0f} ms, "
+        f"max {latency['max']:.0f} ms"
+    )
+    print(
+        f"RSS growth after ramp-up: {result['rss_growth_mb_per_min']:.2f} MB/min; "
+        f"{result['skipped']} events skipped, {result['errors']} errors"
+    )
+
+
+# -------------------------------------------------------------------
+# Recording
+# -------------------------------------------------------------------
+def run_record(args):
+    env = dict(os.environ, DIMEAL_TRACE=os.path.abspath(args.output))
+    port = args.port or free_port()
+    server = start_server(args.app, port, env)
+    print(f"Recording to {args.output}; open http://127.0.0.1:{port} and press Ctrl-C when done")
+    try:
+        server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="serve the app on localhost and record traces")
+    record.add_argument("-o", "--output", default="traces.jsonl")
+    record.add_argument("--app", default=APP)
+    record.add_argument("--port", type=int)
+    record.set_defaults(run=run_record)
+
+    replay_cmd = commands.add_parser("replay", help="replay traces across concurrent sessions")
+    replay_cmd.add_argument("--trace", default=SAMPLE_TRACE)
+    replay_cmd.add_argument("--app", default=APP)
+    replay_cmd.add_argument("--sessions", type=int, default=200, help="concurrent virtual users")
+    replay_cmd.add_argument("--duration", type=float, default=300.0, help="seconds")
+    replay_cmd.add_argument("--ramp", type=float, default=30.0, help="seconds to start every user")
+    replay_cmd.add_argument("--think", type=float, default=1.0, help="multiplier for recorded think times")
+    replay_cmd.add_argument("--max-think", type=float, default=30.0, help="longest pause, in seconds")
+    replay_cmd.add_argument("--interval", type=float, default=5.0, help="seconds between samples")
+    replay_cmd.add_argument("--port", type=int, help="replay against a running server instead")
+    replay_cmd.add_argument("--pid", type=int, help="that server's pid, for memory samples")
+    replay_cmd.add_argument("--json", action="store_true")
+    replay_cmd.set_defaults(run=run_replay)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Plan history questions over millions of recorded plans.
+
+Writes ``--plans`` random plans spread over ``--months`` into a scratch
+history through ``PlanHistoryWriter.write`` (what the background flush
+does), one compacted file per month and dataset. It then times a fresh
+``PlanHistory`` answering "pounds of Chicken Thighs per month" (the whole
+history and the last quarter) and "average scale factor per recipe",
+against loading the ingredient history into pandas and grouping it there.
+It also times ``record``, the only part that runs on a rerun.
+
+    $ python benchmarks/plan_history.py --plans 200000
+    $ python benchmarks/plan_history.py --plans 1000000 --months 24 --json
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dimeal.engine import default_book  # noqa: E402
+from dimeal.history import INGREDIENTS, PlanHistory, PlanHistoryWriter  # noqa: E402
+
+INGREDIENT = "Chicken Thighs"
+
+
+def seed(writer, plans, months, seed=0):
+    rng = np.random.default_rng(seed)
+    names = default_book().names
+    first = datetime.date.today().replace(day=1)
+    per_month = plans // months
+    plan_id = 0
+    for m in range(months):
+        year, month = divmod(first.year * 12 + first.month - 1 - (months - 1 - m), 12)
+        start = datetime.datetime(year, month + 1, 1)
+        recipes = rng.integers(len(names), size=per_month)
+        oz = rng.integers(10, 160, size=per_month) / 2
+        days = rng.integers(1, 31, size=per_month)
+        minutes = rng.integers(0, 28 * 24 * 60, size=per_month)
+        batch = []
+        for r, o, d, minute in zip(recipes.tolist(), oz.tolist(), days.tolist(), minutes.tolist()):
+            plan_id += 1
+            batch.append((plan_id, start + datetime.timedelta(minutes=minute), names[r], "Dexter, Indiana", o, d))
+        writer.write(batch)
+    return per_month * months
+
+
+def median_ms(run, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def pandas_by_month(root):
+    history = PlanHistory(root)
+    frame = history.dataset(INGREDIENTS).to_table().to_pandas()
+    picked = frame[frame["ingredient"] == INGREDIENT]
+    return picked.groupby(["month", "dimension"])["amount"].sum()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", type=int, default=200_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = PlanHistoryWriter(tmp, flush_interval=3600)
+        started = time.perf_counter()
+        plans = seed(writer, args.plans, args.months)
+        seed_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(10_000):
+            writer.record("Chicken", "Dexter, Indiana", 37.5, 7)
+        record_us = (time.perf_counter() - started) / 10_000 * 1e6
+        writer.close()
+
+        size_mb = sum(
+            os.path.getsize(os.path.join(folder, name)) for folder, _, names in os.walk(tmp) for name in names
+        ) / 1e6
+        months = sorted(name.split("=", 1)[1] for name in os.listdir(os.path.join(tmp, INGREDIENTS)))
+        quarter = months[-4] if len(months) >= 4 else months[0]
+
+        by_month_ms, by_month = median_ms(lambda: PlanHistory(tmp).ingredient_by_month(INGREDIENT), args.repeats)
+        quarter_ms, _ = median_ms(lambda: PlanHistory(tmp).ingredient_by_month(INGREDIENT, start=quarter), args.repeats)
+        summary_ms, _ = median_ms(lambda: PlanHistory(tmp).recipe_summary(), args.repeats)
+        pandas_ms, frame = median_ms(lambda: pandas_by_month(tmp), max(1, args.repeats // 2))
+        if any(abs(frame[month, dimension] - amount) > 1e-6 * amount for month, dimension, amount, _ in by_month):
+            raise SystemExit("pushdown and pandas totals disagree")
+
+    result = {
+        "plans": plans,
+        "seed_seconds": round(seed_seconds, 1),
+        "history_mb": round(size_mb, 1),
+        "record_us": round(record_us, 2),
+        "ingredient_by_month_ms": round(by_month_ms, 1),
+        "last_quarter_ms": round(quarter_ms, 1),
+        "recipe_summary_ms": round(summary_ms, 1),
+        "pandas_ms": round(pandas_ms, 1),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{plans} plans over {args.months} months ({result['history_mb']} MB, seeded in {result['seed_seconds']} s)")
+        print(f"record(): {result['record_us']} µs per plan")
+        print(
+            f"{INGREDIENT} per month: {result['ingredient_by_month_ms']} ms "
+            f"(since {quarter}: {result['last_quarter_ms']} ms); pandas: {result['pandas_ms']} ms"
+        )
+        print(f"scale factor per recipe: {result['recipe_summary_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
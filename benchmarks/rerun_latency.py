@@ -0,0 +1,254 @@
+"""Rerun latency of scripted interactions on both app versions (AppTest).
+
+Each scenario starts a fresh headless session on the "original" or "clean"
+route, runs any setup steps, then measures the rerun triggered by a single
+interaction. Only the public AppTest API is used. For every scenario it
+records the rerun's best time, the number of elements in the rendered tree
+and the peak Python memory allocated during the rerun (tracemalloc).
+
+The time comes from the app's own rerun profile (``DIMEAL_PROFILE=1``,
+read from the sidebar panel), so it leaves out AppTest compiling the script
+on every run. Timings and memory depend on the machine, so both are judged
+against a reference measured in the same run: a plain rerun of the clean
+calculator with nothing changed, measured alternately with each scenario.
+``wall_ratio`` is the scenario's best time over the reference's, and
+``peak_kb`` the memory it needs beyond the reference's.
+
+Results are compared against a JSON baseline and the run fails (exit code
+1) when any metric regresses beyond its threshold:
+
+    $ python benchmarks/rerun_latency.py                   # compare
+    $ python benchmarks/rerun_latency.py --update          # write baseline
+    $ python benchmarks/rerun_latency.py -k clean --repeats 9
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+BASELINE = os.path.join(ROOT, "benchmarks", "rerun_baseline.json")
+
+# Allowed increase over the baseline before a metric fails: (relative,
+# absolute). Rerun timings through AppTest are noisy, so wall time gets the
+# most room; memory beyond the reference is small, so it also gets a few KB.
+THRESHOLDS = {"wall_ratio": (0.50, 0.0), "elements": (0.0, 0.0), "peak_kb": (0.25, 64.0)}
+
+# The profile panel's caption: "12.3 ms total, 45 elements sent"
+PROFILE_CAPTION = re.compile(r"([\d.]+) ms total")
+
+
+# -------------------------------------------------------------------
+# Interactions
+# -------------------------------------------------------------------
+def set_widget(kind, key, value):
+    def step(at):
+        getattr(at, kind)(key=key).set_value(value)
+    return step
+
+
+def set_state(key, value):
+    def step(at):
+        at.session_state[key] = value
+    return step
+
+
+def in_profiles(step):
+    """``step`` with the Profiles tab kept open (AppTest does not carry tab selection over)."""
+    def in_tab(at):
+        at.session_state["clean_tab"] = PROFILES_TAB
+        step(at)
+    return in_tab
+
+
+def click(key):
+    def step(at):
+        at.button(key=key).click()
+    return step
+
+
+def rerun(at):
+    pass
+
+
+PROFILES_TAB = "🐶 Profiles"
+
+# Every scenario starts from Chicken, whatever the app defaults to
+START = {
+    "original": set_widget("selectbox", "orig_recipe_select", "Chicken"),
+    "clean": set_widget("selectbox", "clean_recipe_select", "Chicken"),
+}
+
+# name -> (app_version, setup steps, interaction)
+SCENARIOS = {
+    "original/switch_recipe": ("original", [], set_widget("selectbox", "orig_recipe_select", "Beef")),
+    "original/change_portions": ("original", [], set_widget("checkbox", "orig_change_portions", True)),
+    "original/edit_dex_portion": (
+        "original",
+        [set_widget("checkbox", "orig_change_portions", True)],
+        set_widget("number_input", "orig_dex", 30.0),
+    ),
+    "original/custom_days": ("original", [], set_widget("radio", "orig_days_choice", "Custom number of days")),
+    "original/print_view": ("original", [], set_widget("checkbox", "orig_show_print", True)),
+    "clean/switch_recipe": ("clean", [], set_widget("selectbox", "clean_recipe_select", "Beef")),
+    "clean/edit_dex_portion": ("clean", [], set_widget("number_input", "clean_portion_Dexter", 30.0)),
+    "clean/custom_days": ("clean", [], set_widget("radio", "clean_days_choice", "Custom days")),
+    "clean/print_view": ("clean", [], set_widget("checkbox", "clean_show_print", True)),
+    "clean/open_profiles": ("clean", [], set_state("clean_tab", PROFILES_TAB)),
+    # Saves the profiles and rebuilds the grid, as an edit in the grid does
+    # (AppTest cannot edit a data editor)
+    "clean/apply_calorie_targets": (
+        "clean",
+        [set_state("clean_tab", PROFILES_TAB), in_profiles(set_widget("toggle", "calorie_targets_open", True))],
+        in_profiles(click("calorie_apply")),
+    ),
+}
+
+# What every scenario is measured against
+REFERENCE = ("clean", [], rerun)
+
+
+# -------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------
+def count_elements(at):
+    """Leaf elements under the main area and the sidebar."""
+    count = 0
+    stack = [at.main, at.sidebar]
+    while stack:
+        node = stack.pop()
+        children = getattr(node, "children", None)
+        if children:
+            stack.extend(children.values())
+        elif node.type != "tab":
+            count += 1
+    return count
+
+
+def rerun_ms(at):
+    """The rerun's own time, from the profile panel in the sidebar."""
+    for caption in at.sidebar.caption:
+        match = PROFILE_CAPTION.match(caption.value)
+        if match:
+            return float(match.group(1))
+    raise RuntimeError("No rerun profile in the sidebar; the app must run with DIMEAL_PROFILE=1")
+
+
+def run_step(at, step):
+    step(at)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def measure(app, version, setup, interaction, timeout, trace=False):
+    """Run one session up to ``interaction``; returns ``(ms, elements, peak_kb)``.
+
+    Tracing slows the rerun down, so time and memory come from separate
+    samples.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app, default_timeout=timeout)
+    at.session_state.app_version = version
+    at.run()
+    for step in [START[version], *setup]:
+        run_step(at, step)
+
+    if trace:
+        tracemalloc.start()
+    run_step(at, interaction)
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return rerun_ms(at), count_elements(at), peak / 1024
+
+
+def run_scenarios(app, names, repeats, timeout):
+    results = {}
+    for name in names:
+        version, setup, interaction = SCENARIOS[name]
+        # Alternate with the reference so both see the same machine load
+        timed, reference = [], []
+        for _ in range(repeats):
+            reference.append(measure(app, *REFERENCE, timeout)[0])
+            timed.append(measure(app, version, setup, interaction, timeout))
+        traced = [measure(app, version, setup, interaction, timeout, trace=True) for _ in range(2)]
+        traced_reference = [measure(app, *REFERENCE, timeout, trace=True)[2] for _ in range(2)]
+        wall_ms = min(s[0] for s in timed)
+        results[name] = {
+            "wall_ms": round(wall_ms, 2),
+            "wall_ratio": round(wall_ms / min(reference), 3),
+            "elements": max(s[1] for s in timed),
+            "peak_kb": round(max(min(s[2] for s in traced) - min(traced_reference), 0.0), 1),
+        }
+        print(f"{name:30} {results[name]['wall_ms']:9.2f} ms ({results[name]['wall_ratio']:5.2f}x) "
+              f"{results[name]['elements']:5d} el {results[name]['peak_kb']:+9.1f} KB", file=sys.stderr)
+    return results
+
+
+def regressions(results, baseline, thresholds):
+    """``(scenario, metric, baseline, current)`` for each metric over its threshold."""
+    found = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, (relative, absolute) in thresholds.items():
+            if metric in base and metrics[metric] > base[metric] * (1 + relative) + absolute:
+                found.append((name, metric, base[metric], metrics[metric]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("-k", dest="pattern", default="", help="Only run scenarios containing this text.")
+    for metric, (relative, _) in THRESHOLDS.items():
+        parser.add_argument(f"--max-{metric.replace('_', '-')}", type=float, default=relative, dest=metric,
+                            help=f"Allowed relative increase in {metric} (default: {relative}).")
+    args = parser.parse_args()
+
+    # Each run gets its own state database, plan history and metrics file;
+    # profiling puts every rerun's time in the sidebar
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DIMEAL_DB"] = os.path.join(tmp.name, "dimeal.db")
+    os.environ["DIMEAL_HISTORY"] = os.path.join(tmp.name, "history")
+    os.environ["DIMEAL_METRICS"] = os.path.join(tmp.name, "dimeal_metrics.prom")
+    os.environ["DIMEAL_PROFILE"] = "1"
+
+    names = [name for name in SCENARIOS if args.pattern in name]
+    results = run_scenarios(os.path.abspath(args.app), names, args.repeats, args.timeout)
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps(results, indent=2))
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    thresholds = {metric: (getattr(args, metric), absolute) for metric, (_, absolute) in THRESHOLDS.items()}
+    found = regressions(results, baseline, thresholds)
+    for name, metric, base, current in found:
+        print(f"REGRESSION {name} {metric}: {base} -> {current}", file=sys.stderr)
+    print(json.dumps({"scenarios": len(results), "regressions": len(found)}))
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
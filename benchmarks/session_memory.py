@@ -0,0 +1,146 @@
+"""Server memory per concurrent session, measured against ``streamlit run``.
+
+Starts the app headlessly on localhost with a scratch database, then opens
+sessions one after another over the same websocket protocol the browser
+uses. Every session walks both screens the way a visitor would (each
+recipe on the original calculator with portions changed, then each recipe
+on the clean calculator, the Profiles and Shopping tabs) and stays
+connected. The server's resident set size is sampled as sessions
+accumulate; the slope is the memory each extra session costs.
+``--dogs`` saves that many dog profiles first, for a kennel-sized store.
+
+    $ python benchmarks/session_memory.py --sessions 40
+    $ python benchmarks/session_memory.py --sessions 40 --dogs 500
+    $ python benchmarks/session_memory.py --sessions 100 --step 20 --json
+
+Linux only (reads ``/proc/<pid>/status``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from streamlit_client import APP, ROOT, Session, free_port, rss_kb, start_server
+
+RECIPES = ("Chicken", "Turkey", "Beef", "Fish")
+
+
+def seed_profiles(db_path, dogs):
+    """Save ``dogs`` profiles (Dexter and Indiana first) into a fresh database."""
+    sys.path.insert(0, ROOT)
+    from dimeal.profiles import ProfileStore
+    from dimeal.storage import StateStore
+
+    names = ["Dexter", "Indiana"] + [f"Dog {i:04d}" for i in range(max(dogs - 2, 0))]
+    portions = [[8.0 + (i + j) % 24 for j in range(len(RECIPES))] for i in range(len(names))]
+    store = StateStore(db_path)
+    store.save_profiles(ProfileStore(names, portions, RECIPES))
+    store.close()
+
+
+# -------------------------------------------------------------------
+# Visitor
+# -------------------------------------------------------------------
+async def visit(session):
+    """What one visitor does before leaving the tab open."""
+    await session.rerun()
+
+    # Original calculator: every recipe with both portions changed
+    await session.set(True, key="orig_change_portions")
+    for i, recipe in enumerate(RECIPES):
+        await session.set(recipe, key="orig_recipe_select")
+        await session.set(20.0 + i, key="orig_dex")
+        await session.set(12.0 + i, key="orig_indy")
+
+    # Clean calculator, for Dexter and Indiana: every recipe with a changed
+    # portion, then other tabs
+    await session.set(True, label="✨ Try Mobile App UI")
+    await session.set(False, key="clean_all_dogs")
+    await session.set(["Dexter", "Indiana"], key="clean_dog_choice")
+    for i, recipe in enumerate(RECIPES):
+        await session.set(recipe, key="clean_recipe_select")
+        await session.set(22.0 + i, key="clean_portion_Dexter")
+    await session.set("🛒 Shopping", key="clean_tab")
+    await session.set(3, key="shop_days_Chicken")
+    await session.set("🐶 Profiles", key="clean_tab")
+    await session.set("⚖️ Calculator", key="clean_tab")
+
+
+# -------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------
+async def measure(port, pid, sessions, step, warmup):
+    open_sessions = []
+
+    async def add(count):
+        for _ in range(count):
+            session = await Session.connect(port)
+            await visit(session)
+            open_sessions.append(session)
+
+    # Warm-up sessions fill the process-wide caches before the first sample
+    await add(warmup)
+    await asyncio.sleep(1.0)
+    samples = [(len(open_sessions), rss_kb(pid))]
+    while len(open_sessions) < warmup + sessions:
+        await add(min(step, warmup + sessions - len(open_sessions)))
+        await asyncio.sleep(1.0)
+        samples.append((len(open_sessions), rss_kb(pid)))
+
+    for session in open_sessions:
+        await session.close()
+    return samples
+
+
+def slope(samples):
+    xs = [n for n, _ in samples]
+    ys = [kb for _, kb in samples]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var if var else float("nan")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--sessions", type=int, default=40, help="sessions opened after the warm-up")
+    parser.add_argument("--step", type=int, default=10, help="sessions between RSS samples")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--dogs", type=int, default=0, help="dog profiles to save before starting")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DIMEAL_DB=os.path.join(tmp, "sessions.db"), DIMEAL_HISTORY=os.path.join(tmp, "history"))
+        if args.dogs:
+            seed_profiles(env["DIMEAL_DB"], args.dogs)
+        port = free_port()
+        server = start_server(args.app, port, env)
+        try:
+            started = time.perf_counter()
+            samples = asyncio.run(measure(port, server.pid, args.sessions, args.step, args.warmup))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    result = {
+        "sessions": args.sessions,
+        "dogs": args.dogs,
+        "samples": [{"sessions": n, "rss_mb": round(kb / 1024, 1)} for n, kb in samples],
+        "kb_per_session": round(slope(samples), 1),
+        "seconds": round(elapsed, 1),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for sample in result["samples"]:
+            print(f"{sample['sessions']:>5} sessions  {sample['rss_mb']:>8.1f} MB")
+        print(f"≈ {result['kb_per_session']:.0f} KB per session ({result['seconds']:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
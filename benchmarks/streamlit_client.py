@@ -0,0 +1,176 @@
+"""A headless Streamlit server and a websocket client that acts like a browser tab.
+
+Shared by the session benchmarks: ``start_server`` runs ``streamlit run``
+on localhost, ``Session`` speaks the same protocol as the frontend
+(``BackMsg`` reruns with widget states, ``ForwardMsg`` deltas back) and
+``rss_kb`` samples the server's memory. Linux only for ``rss_kb``.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+
+
+# -------------------------------------------------------------------
+# Server
+# -------------------------------------------------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port, env, quiet=True):
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", app,
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(port),
+            "--browser.gatherUsageStats", "false",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL if quiet else None,
+        stderr=subprocess.DEVNULL if quiet else None,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("streamlit did not start within 60 s")
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not found")
+
+
+# -------------------------------------------------------------------
+# Websocket session
+# -------------------------------------------------------------------
+class Session:
+    """One browser tab: sends reruns with widget states and reads deltas until the run ends.
+
+    Like the frontend, it resends the last value of every widget it has
+    set, unless the script has since set the value itself; button clicks
+    are sent once. Widgets a rerun no longer draws are
+    forgotten. ``exceptions`` counts the exceptions the app displayed.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.elements = {}   # widget id -> (kind, proto, fragment id)
+        self.states = {}     # widget id -> WidgetState
+        self.exceptions = 0
+
+    @classmethod
+    async def connect(cls, port):
+        ws = await websockets.connect(
+            f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None
+        )
+        return cls(ws)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def rerun(self, fragment_id=""):
+        """Rerun the script (or one fragment); returns the seconds until it finished."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        self.states = {wid: state for wid, state in self.states.items() if not state.HasField("trigger_value")}
+
+        seen = set()
+        while True:
+            data = await self.ws.recv()
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                seen.add(self._record(forward.delta))
+            elif kind == "script_finished":
+                break
+        elapsed = time.perf_counter() - start
+
+        # A full run redraws the page; a fragment run redraws its fragment
+        self.elements = {
+            wid: element for wid, element in self.elements.items()
+            if wid in seen or (fragment_id and element[2] != fragment_id)
+        }
+        self.states = {wid: state for wid, state in self.states.items() if wid in self.elements}
+        return elapsed
+
+    def _record(self, delta):
+        if delta.WhichOneof("type") == "new_element":
+            kind = delta.new_element.WhichOneof("type")
+            proto = getattr(delta.new_element, kind)
+            if kind == "exception":
+                self.exceptions += 1
+        elif delta.WhichOneof("type") == "add_block" and delta.add_block.id:
+            kind, proto = "tabs", delta.add_block
+        else:
+            return None
+        if getattr(proto, "id", ""):
+            self.elements[proto.id] = (kind, proto, delta.fragment_id)
+            # The script set this widget's value; the frontend adopts it
+            if getattr(proto, "set_value", False):
+                self.states.pop(proto.id, None)
+            return proto.id
+        return None
+
+    def find(self, key=None, label=None):
+        for wid, (kind, proto, fragment_id) in reversed(self.elements.items()):
+            if (key is not None and wid.endswith(f"-{key}")) or (label is not None and getattr(proto, "label", None) == label):
+                return wid, kind, proto, fragment_id
+        raise LookupError(f"no widget with key={key!r} label={label!r}")
+
+    async def set(self, value, key=None, label=None):
+        """Set a widget's value (``True`` clicks a button) and rerun; returns the rerun's seconds.
+
+        Raises ``LookupError`` if no such widget is on the page.
+        """
+        wid, kind, proto, fragment_id = self.find(key, label)
+        state = WidgetState(id=wid)
+        if kind == "button":
+            state.trigger_value = True
+        elif kind == "checkbox":
+            state.bool_value = bool(value)
+        elif kind == "number_input":
+            if proto.data_type == NumberInput.INT:
+                state.int_value = int(value)
+            else:
+                state.double_value = float(value)
+        elif kind == "multiselect":
+            state.string_array_value.data[:] = list(value)
+        elif kind == "dataframe":  # data editor edits
+            state.string_value = json.dumps(value)
+        else:  # selectbox, radio, tabs
+            state.string_value = str(value)
+        self.states[wid] = state
+        return await self.rerun(fragment_id)
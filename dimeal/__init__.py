@@ -0,0 +1,55 @@
+"""DIMeal: JFFD DIY meal prep scaling, usable with or without Streamlit.
+
+Submodules are imported on first attribute access, so ``from dimeal import
+RECIPE_DATA`` does not pull in NumPy.
+"""
+import importlib
+
+_EXPORTS = {
+    "RECIPE_DATA": "dimeal.recipes",
+    "NutrientProfile": "dimeal.nutrition",
+    "PlanHistory": "dimeal.history",
+    "PlanHistoryWriter": "dimeal.history",
+    "PriceCatalog": "dimeal.purchasing",
+    "Kitchen": "dimeal.timeline",
+    "ProfileStore": "dimeal.profiles",
+    "RecipeBook": "dimeal.engine",
+    "RecipeCatalog": "dimeal.catalog",
+    "Rotation": "dimeal.rotation",
+    "ScaledBatch": "dimeal.engine",
+    "ShoppingIndex": "dimeal.shopping",
+    "best_split": "dimeal.pantry",
+    "build_offline_bundle": "dimeal.offline",
+    "compile_recipes": "dimeal.engine",
+    "default_book": "dimeal.engine",
+    "daily_calories": "dimeal.nutrition",
+    "default_catalog": "dimeal.catalog",
+    "default_nutrient_profile": "dimeal.nutrition",
+    "default_prices": "dimeal.purchasing",
+    "dog_meals": "dimeal.packing",
+    "offline_page": "dimeal.offline",
+    "optimize_purchases": "dimeal.purchasing",
+    "pack_meals": "dimeal.packing",
+    "pantry_limits": "dimeal.pantry",
+    "plan_cook_day": "dimeal.timeline",
+    "plan_rotation": "dimeal.rotation",
+    "scale_arrays": "dimeal.engine",
+    "scale_batch": "dimeal.engine",
+    "scale_recipe": "dimeal.engine",
+    "shopping_list": "dimeal.shopping",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'dimeal' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+import sys
+
+from dimeal.cli import main
+
+sys.exit(main())
@@ -0,0 +1,58 @@
+"""Size-bounded LRU cache shared across threads (API requests, app sessions)."""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(self, key, build):
+        """Return the cached value for ``key``, calling ``build()`` on a miss.
+
+        ``build`` runs outside the lock, so two threads missing the same key
+        at once may both build it; the last one stored wins.
+        """
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self.data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
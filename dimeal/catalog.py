@@ -0,0 +1,401 @@
+"""Recipe catalog loaded from a directory of versioned data files.
+
+Each ``*.toml`` or ``*.json`` file holds one recipe named after the file
+stem; a ``*.parquet`` file holds any number of recipes in long format (one
+row per ingredient, see ``PARQUET_COLUMNS``). Every file declares the
+format ``version`` it was written for. An optional ``catalog.toml``
+manifest lists ``order = [...]``; recipes it doesn't name follow in name
+order.
+
+Listing the catalog only stats the directory (and reads the ``recipe``
+column of Parquet files). A recipe is parsed, validated and compiled into
+a one-row ``RecipeBook`` the first time it is asked for, and kept until its
+file changes, so a catalog of hundreds of recipes costs nothing at startup.
+Recipes are read-only ``Recipe`` / ``Ingredient`` records (``__slots__``
+mappings), so one copy is safely shared by every session and thread.
+The directory is re-checked at most every ``check_interval`` seconds;
+changed files are reloaded on next use without restarting anything. An
+edit that fails to load keeps serving the last good version and is
+reported in ``errors``.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import tomllib
+from collections.abc import Mapping
+from functools import lru_cache
+
+FORMAT_VERSION = 1
+MANIFEST = "catalog.toml"
+SUFFIXES = (".toml", ".json", ".parquet")
+
+RECIPE_FIELDS = ("base_daily_oz", "dex_default", "indy_default", "base_days")
+INGREDIENT_FIELDS = ("name", "base_7day_amount", "unit")
+PARQUET_COLUMNS = ("recipe", "version") + RECIPE_FIELDS + ("ingredient", "base_7day_amount", "unit")
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recipes")
+
+
+class CatalogError(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Records
+# -------------------------------------------------------------------
+class _Record(Mapping):
+    """Read-only mapping over ``__slots__``: ``record["field"]`` and ``record.field`` both work."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    __delattr__ = __setattr__
+
+    def __getitem__(self, field):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class Ingredient(_Record):
+    __slots__ = INGREDIENT_FIELDS
+
+
+class Recipe(_Record):
+    """One recipe: the ``RECIPE_FIELDS`` numbers and a tuple of ``Ingredient``."""
+
+    __slots__ = RECIPE_FIELDS + ("ingredients",)
+
+
+# -------------------------------------------------------------------
+# Parsing
+# -------------------------------------------------------------------
+def _number(value, field, source, positive=True):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise CatalogError(f"{source}: {field} must be a number, got {value!r}")
+    if value < 0 or (positive and value == 0) or value != value:
+        raise CatalogError(f"{source}: {field} must be {'positive' if positive else 'non-negative'}")
+    return float(value)
+
+
+def validate_recipe(data, source):
+    """Check one recipe's fields and return it as a ``Recipe``."""
+    version = data.get("version", FORMAT_VERSION)
+    if not isinstance(version, int) or not 1 <= version <= FORMAT_VERSION:
+        raise CatalogError(f"{source}: unsupported format version {version!r}")
+
+    values = []
+    for field in RECIPE_FIELDS:
+        if field not in data:
+            raise CatalogError(f"{source}: missing field {field!r}")
+        values.append(_number(data[field], field, source, positive=field in ("base_daily_oz", "base_days")))
+
+    items = data.get("ingredients")
+    if not isinstance(items, list) or not items:
+        raise CatalogError(f"{source}: ingredients must be a non-empty list")
+    ingredients = []
+    for i, item in enumerate(items):
+        missing = [field for field in INGREDIENT_FIELDS if field not in item]
+        if missing:
+            raise CatalogError(f"{source}: ingredient {i} is missing {', '.join(missing)}")
+        # Names and units repeat across recipes; intern them so they are stored once
+        ingredients.append(Ingredient(
+            sys.intern(str(item["name"])),
+            _number(item["base_7day_amount"], f"ingredient {i} amount", source, positive=False),
+            sys.intern(str(item["unit"])),
+        ))
+    return Recipe(*values, tuple(ingredients))
+
+
+def _read_document(path):
+    try:
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+    except (OSError, ValueError) as exc:  # JSONDecodeError and TOMLDecodeError are ValueErrors
+        raise CatalogError(f"{path}: {exc}") from None
+    if not isinstance(data, dict):
+        raise CatalogError(f"{path}: expected a table of recipe fields")
+    return data
+
+
+def _parquet_names(path):
+    import pyarrow.parquet as pq
+
+    try:
+        column = pq.read_table(path, columns=["recipe"]).column("recipe")
+    except (OSError, KeyError, ValueError) as exc:
+        raise CatalogError(f"{path}: {exc}") from None
+    return [str(name) for name in column.unique().to_pylist() if name is not None]
+
+
+def _read_parquet_recipe(path, name):
+    import pyarrow.parquet as pq
+
+    try:
+        rows = pq.read_table(path, filters=[("recipe", "==", name)]).to_pylist()
+    except (OSError, KeyError, ValueError) as exc:
+        raise CatalogError(f"{path}: {exc}") from None
+    if not rows:
+        raise CatalogError(f"{path}: no rows for recipe {name!r}")
+
+    # Recipe-level columns repeat on every row; the first row is authoritative
+    data = {field: rows[0].get(field) for field in ("version",) + RECIPE_FIELDS if rows[0].get(field) is not None}
+    data["ingredients"] = [
+        {"name": row.get("ingredient"), "base_7day_amount": row.get("base_7day_amount"), "unit": row.get("unit")}
+        for row in rows
+    ]
+    return data
+
+
+# -------------------------------------------------------------------
+# Catalog
+# -------------------------------------------------------------------
+class RecipeCatalog:
+    """Lazily loaded, hot-reloaded recipes from ``directory``.
+
+    ``generation`` increases whenever a file is added, removed or changed,
+    so callers can key their own caches on it. Safe to share across
+    sessions and threads.
+    """
+
+    def __init__(self, directory, check_interval=1.0):
+        self.directory = str(directory)
+        self.check_interval = check_interval
+        self.errors = {}          # path -> message for files that failed to load
+
+        self._lock = threading.RLock()
+        self._checked = None
+        self._generation = 0
+        self._stamps = {}         # path -> (mtime_ns, size)
+        self._sources = {}        # recipe name -> path
+        self._names = ()
+        self._parquet = {}        # path -> (stamp, recipe names)
+        self._recipes = {}        # recipe name -> (stamp, Recipe, RecipeBook or None)
+        self._book = None         # (generation, RecipeBook)
+        self._ingredients = None  # (generation, {ingredient: recipe names})
+
+    # ---------------------------------------------------------------
+    # Directory scan
+    # ---------------------------------------------------------------
+    def _scan(self):
+        stamps = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(SUFFIXES) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def refresh(self, force=False):
+        """Re-stat the directory if ``check_interval`` has passed; returns ``generation``."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked is not None and now - self._checked < self.check_interval:
+                return self._generation
+            self._checked = now
+
+            stamps = self._scan()
+            if stamps != self._stamps:
+                self._index(stamps)
+            return self._generation
+
+    def _index(self, stamps):
+        manifest = os.path.join(self.directory, MANIFEST)
+        order = []
+        if manifest in stamps:
+            try:
+                order = [str(name) for name in _read_document(manifest).get("order", [])]
+                self.errors.pop(manifest, None)
+            except CatalogError as exc:
+                self.errors[manifest] = str(exc)
+
+        sources = {}
+        for path in sorted(stamps):
+            if path == manifest:
+                continue
+            stem, suffix = os.path.splitext(os.path.basename(path))
+            if suffix == ".parquet":
+                cached = self._parquet.get(path)
+                if cached is None or cached[0] != stamps[path]:
+                    try:
+                        cached = self._parquet[path] = (stamps[path], _parquet_names(path))
+                    except CatalogError as exc:
+                        self.errors[path] = str(exc)
+                        continue
+                names = cached[1]
+            else:
+                names = [stem]
+            for name in names:
+                if name in sources:
+                    self.errors[path] = f"{path}: recipe {name!r} is already defined in {sources[name]}"
+                    continue
+                sources[name] = path
+
+        # Forget state for files that have gone away
+        for path in set(self.errors) - set(stamps):
+            del self.errors[path]
+        for path in set(self._parquet) - set(stamps):
+            del self._parquet[path]
+        for name in set(self._recipes) - set(sources):
+            del self._recipes[name]
+
+        listed = [name for name in order if name in sources]
+        self._names = tuple(listed + sorted(set(sources) - set(listed)))
+        self._sources = sources
+        self._stamps = stamps
+        self._generation += 1
+
+    # ---------------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------------
+    @property
+    def generation(self):
+        return self.refresh()
+
+    def names(self):
+        self.refresh()
+        return self._names
+
+    def __contains__(self, name):
+        self.refresh()
+        return name in self._sources
+
+    def __len__(self):
+        return len(self.names())
+
+    def _entry(self, name):
+        with self._lock:
+            self.refresh()
+            path = self._sources.get(name)
+            if path is None:
+                raise KeyError(name)
+            stamp = self._stamps[path]
+            entry = self._recipes.get(name)
+            if entry is not None and entry[0] == stamp:
+                return entry
+
+            try:
+                if path.endswith(".parquet"):
+                    data = _read_parquet_recipe(path, name)
+                else:
+                    data = _read_document(path)
+                recipe = validate_recipe(data, path)
+            except CatalogError as exc:
+                self.errors[path] = str(exc)
+                if entry is None:
+                    raise
+                return entry  # keep serving the last good version
+            self.errors.pop(path, None)
+            entry = self._recipes[name] = (stamp, recipe, None)
+            return entry
+
+    def recipe(self, name):
+        """The ``Recipe`` for ``name`` (``KeyError`` if unknown, ``CatalogError`` if unreadable)."""
+        return self._entry(name)[1]
+
+    def recipe_book(self, name):
+        """A compiled one-recipe ``RecipeBook``, kept until the file changes."""
+        from dimeal.engine import compile_recipes
+
+        with self._lock:
+            stamp, recipe, book = self._entry(name)
+            if book is None:
+                book = compile_recipes({name: recipe})
+                self._recipes[name] = (stamp, recipe, book)
+            return book
+
+    def book(self):
+        """Every loadable recipe compiled into one ``RecipeBook``, rebuilt when the catalog changes.
+
+        A recipe that has never loaded is left out (see ``errors``) rather
+        than failing every plan.
+        """
+        from dimeal.engine import compile_recipes
+
+        with self._lock:
+            generation = self.refresh()
+            if self._book is None or self._book[0] != generation:
+                recipes = {}
+                for name in self._names:
+                    try:
+                        recipes[name] = self.recipe(name)
+                    except CatalogError:
+                        continue
+                self._book = (generation, compile_recipes(recipes))
+            return self._book[1]
+
+    def ingredient_index(self):
+        """``{ingredient name: recipe names}`` across the whole catalog."""
+        with self._lock:
+            generation = self.refresh()
+            if self._ingredients is None or self._ingredients[0] != generation:
+                index = {}
+                book = self.book()
+                for recipe_name, ingredient_names in zip(book.names, book.ingredient_names):
+                    for ingredient in ingredient_names:
+                        index.setdefault(ingredient, []).append(recipe_name)
+                self._ingredients = (generation, {k: tuple(v) for k, v in index.items()})
+            return self._ingredients[1]
+
+    def recipes_with(self, ingredient):
+        return self.ingredient_index().get(ingredient, ())
+
+
+class CatalogMapping(Mapping):
+    """Read-only ``{name: Recipe}`` view that always reflects the catalog."""
+
+    def __init__(self, catalog=None):
+        self._catalog = catalog
+
+    @property
+    def catalog(self):
+        return self._catalog if self._catalog is not None else default_catalog()
+
+    def __getitem__(self, name):
+        return self.catalog.recipe(name)
+
+    def __iter__(self):
+        return iter(self.catalog.names())
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def __contains__(self, name):
+        return name in self.catalog
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.catalog.directory!r})"
+
+
+@lru_cache(maxsize=1)
+def default_catalog():
+    """The catalog in ``$DIMEAL_RECIPES``, or the built-in recipes."""
+    return RecipeCatalog(os.environ.get("DIMEAL_RECIPES") or DEFAULT_DIRECTORY)
@@ -0,0 +1,363 @@
+"""Command-line entry points: ``python -m dimeal batch|sheets plans.csv``, ``offline`` and ``serve``.
+
+Plans are read from CSV in fixed-size chunks, each chunk is scaled with one
+``scale_batch`` call (optionally across a process pool) and written out
+before the next is read, so memory stays flat however large the input is.
+``sheets`` renders a printable prep sheet per plan the same way, in the
+workers too.
+
+Input columns: ``household``, ``recipe``, ``days`` and either ``portions``
+(per-dog oz/day separated by ``;``) or ``total_daily_oz``.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from dimeal.engine import default_book, scale_arrays
+
+OUTPUT_COLUMNS = [
+    "household", "recipe", "days", "total_daily_oz", "scale_factor",
+    "ingredient", "unit", "per_day", "total",
+]
+FORMATS = ("csv", "jsonl", "parquet")
+SHEET_FORMATS = ("html", "zip", "dir")
+
+
+class PlanError(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Parsing & Scaling
+# -------------------------------------------------------------------
+def parse_daily_oz(row):
+    portions = (row.get("portions") or "").strip()
+    if portions:
+        values = [float(oz) for oz in portions.replace(",", ";").split(";") if oz.strip()]
+        if any(oz < 0 for oz in values):
+            raise ValueError("portions cannot be negative")
+        return sum(values)
+    return float(row["total_daily_oz"])
+
+
+def scale_chunk(first_line, rows):
+    """Scale one chunk of CSV rows; returns columnar long-format output."""
+    book = default_book()
+    households, recipe_idx, total_daily_oz, days = [], [], [], []
+    for line, row in enumerate(rows, start=first_line):
+        # A short row leaves its trailing columns as None
+        for column in ("recipe", "days", "portions" if row.get("portions") else "total_daily_oz"):
+            if row.get(column) is None:
+                raise PlanError(f"line {line}: missing {column!r}")
+        try:
+            recipe = book.index[row["recipe"].strip()]
+            oz = parse_daily_oz(row)
+            n_days = float(row["days"])
+        except KeyError as exc:
+            raise PlanError(f"line {line}: unknown recipe or missing column {exc.args[0]!r}") from None
+        except (TypeError, ValueError) as exc:
+            raise PlanError(f"line {line}: {exc}") from None
+        if not (math.isfinite(oz) and math.isfinite(n_days)) or oz <= 0 or n_days <= 0:
+            raise PlanError(f"line {line}: oz/day and days must be positive numbers")
+        recipe_idx.append(recipe)
+        total_daily_oz.append(oz)
+        days.append(n_days)
+        households.append(row.get("household") or "")
+
+    batch = scale_arrays(recipe_idx, total_daily_oz, days, book)
+
+    # Expand to one row per (plan, ingredient), dropping padded slots
+    width = book.amounts.shape[1]
+    valid = np.arange(width) < book.counts[batch.recipe_idx][:, None]
+    plan_idx = np.nonzero(valid)[0]
+    slot_idx = np.nonzero(valid)[1]
+    recipe_of_row = batch.recipe_idx[plan_idx]
+
+    return {
+        "plan": plan_idx,
+        "household": [households[i] for i in plan_idx],
+        "recipe": [book.names[r] for r in recipe_of_row],
+        "days": batch.days[plan_idx],
+        "total_daily_oz": batch.total_daily_oz[plan_idx],
+        "scale_factor": batch.scale_factor[plan_idx],
+        "ingredient": [book.ingredient_names[r][k] for r, k in zip(recipe_of_row, slot_idx)],
+        "unit": [book.units[r][k] for r, k in zip(recipe_of_row, slot_idx)],
+        "per_day": batch.per_day[valid],
+        "total": batch.totals[valid],
+    }
+
+
+def read_chunks(stream, chunk_size):
+    """Yield ``(first_line, rows)`` chunks from a CSV stream."""
+    reader = csv.DictReader(stream)
+    line = 2  # header is line 1
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return
+        yield line, rows
+        line += len(rows)
+
+
+def sheet_chunk(first_line, rows):
+    """Scale one chunk and render a prep sheet per plan."""
+    from dimeal.sheets import chunk_sheets
+
+    return chunk_sheets(scale_chunk(first_line, rows))
+
+
+def scaled_chunks(chunks, workers, work=scale_chunk):
+    """Run ``work`` over chunks in order, keeping at most ``2 * workers`` in flight."""
+    if workers <= 1:
+        for first_line, rows in chunks:
+            yield work(first_line, rows)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first_line, rows in chunks:
+            pending.append(pool.submit(work, first_line, rows))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# -------------------------------------------------------------------
+# Writers
+# -------------------------------------------------------------------
+def chunk_table(chunk):
+    import pyarrow as pa
+
+    return pa.table({name: chunk[name] for name in OUTPUT_COLUMNS})
+
+
+class CsvWriter:
+    def __init__(self, sink):
+        self.sink = sink
+        self.writer = None
+
+    def write(self, chunk):
+        import pyarrow.csv as pcsv
+
+        table = chunk_table(chunk)
+        if self.writer is None:
+            self.writer = pcsv.CSVWriter(self.sink, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class JsonLinesWriter:
+    """One JSON object per plan with its ingredients nested."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, chunk):
+        plan = None
+        for i, plan_idx in enumerate(chunk["plan"]):
+            if plan is None or plan["_plan"] != plan_idx:
+                self._emit(plan)
+                plan = {
+                    "_plan": plan_idx,
+                    "household": chunk["household"][i],
+                    "recipe": chunk["recipe"][i],
+                    "days": float(chunk["days"][i]),
+                    "total_daily_oz": float(chunk["total_daily_oz"][i]),
+                    "scale_factor": float(chunk["scale_factor"][i]),
+                    "ingredients": [],
+                }
+            plan["ingredients"].append({
+                "name": chunk["ingredient"][i],
+                "unit": chunk["unit"][i],
+                "per_day": float(chunk["per_day"][i]),
+                "total": float(chunk["total"][i]),
+            })
+        self._emit(plan)
+
+    def _emit(self, plan):
+        if plan is not None:
+            del plan["_plan"]
+            self.stream.write(json.dumps(plan) + "\n")
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, chunk):
+        import pyarrow.parquet as pq
+
+        table = chunk_table(chunk)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(path, fmt):
+    """Return ``(writer, stream)``; ``stream`` is closed by the caller if set."""
+    if fmt == "parquet":
+        if path is None:
+            raise PlanError("parquet output needs --output")
+        return ParquetWriter(path), None
+    if fmt == "csv":
+        stream = sys.stdout.buffer if path is None else open(path, "wb")
+        return CsvWriter(stream), (None if path is None else stream)
+
+    stream = sys.stdout if path is None else open(path, "w", encoding="utf-8")
+    return JsonLinesWriter(stream), (None if path is None else stream)
+
+
+def open_sheet_writer(path, fmt):
+    """Return ``(writer, stream)`` for prep sheets; ``stream`` is closed by the caller if set."""
+    from dimeal.sheets import SheetBookWriter, SheetDirectoryWriter, SheetZipWriter
+
+    if fmt == "dir":
+        if path is None:
+            raise PlanError("dir output needs --output")
+        return SheetDirectoryWriter(path), None
+    if fmt == "zip":
+        stream = sys.stdout.buffer if path is None else open(path, "wb")
+        return SheetZipWriter(stream), (None if path is None else stream)
+
+    stream = sys.stdout if path is None else open(path, "w", encoding="utf-8")
+    return SheetBookWriter(stream), (None if path is None else stream)
+
+
+# -------------------------------------------------------------------
+# Commands
+# -------------------------------------------------------------------
+def run_batch(args):
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.output or "")[1].lstrip(".").lower()
+        fmt = {"json": "jsonl", "pq": "parquet"}.get(ext, ext) if ext in FORMATS + ("json", "pq") else "csv"
+
+    source = sys.stdin if args.plans == "-" else open(args.plans, newline="", encoding="utf-8")
+    writer, stream = open_writer(args.output, fmt)
+    try:
+        for chunk in scaled_chunks(read_chunks(source, args.chunk_size), args.workers):
+            writer.write(chunk)
+    finally:
+        writer.close()
+        if stream is not None:
+            stream.close()
+        if source is not sys.stdin:
+            source.close()
+
+
+def run_sheets(args):
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.output or "")[1].lstrip(".").lower()
+        fmt = {"htm": "html", "": "dir" if args.output else "html"}.get(ext, ext)
+        if fmt not in SHEET_FORMATS:
+            fmt = "html"
+
+    source = sys.stdin if args.plans == "-" else open(args.plans, newline="", encoding="utf-8")
+    writer, stream = open_sheet_writer(args.output, fmt)
+    try:
+        for sheets in scaled_chunks(read_chunks(source, args.chunk_size), args.workers, sheet_chunk):
+            for name, section in sheets:
+                writer.write(name, section)
+    finally:
+        writer.close()
+        if stream is not None:
+            stream.close()
+        if source is not sys.stdin:
+            source.close()
+
+
+def run_offline(args):
+    from dimeal.offline import build_offline_bundle, encode_bundle, write_offline_page
+
+    try:
+        bundle = build_offline_bundle(max_oz=args.max_oz, oz_step=args.oz_step, max_days=args.max_days)
+    except ValueError as exc:
+        raise PlanError(str(exc)) from None
+    write_offline_page(args.output, encode_bundle(bundle))
+
+
+def run_serve(args):
+    from dimeal.service import serve
+
+    serve(args.host, args.port, args.cache_size)
+
+
+def positive_int(text):
+    """argparse ``type`` for counts that must be at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m dimeal", description="JFFD DIY meal prep tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Scale a CSV of household plans into ingredient totals.")
+    batch.add_argument("plans", help="CSV with household, recipe, days and portions or total_daily_oz ('-' for stdin)")
+    batch.add_argument("-o", "--output", help="Output file (default: stdout). Format follows the extension.")
+    batch.add_argument("-f", "--format", choices=FORMATS, help="Output format (overrides the extension).")
+    batch.add_argument("-w", "--workers", type=positive_int, default=1, help="Worker processes (default: 1).")
+    batch.add_argument("--chunk-size", type=positive_int, default=10_000, help="Plans per chunk (default: 10000).")
+    batch.set_defaults(handler=run_batch)
+
+    sheets = commands.add_parser("sheets", help="Render a printable prep sheet for every plan in a CSV.")
+    sheets.add_argument("plans", help="Same CSV as 'batch' ('-' for stdin)")
+    sheets.add_argument("-o", "--output",
+                        help="A .html book (default: stdout), a .zip of sheets, or a directory (no extension).")
+    sheets.add_argument("-f", "--format", choices=SHEET_FORMATS, help="Output format (overrides the extension).")
+    sheets.add_argument("-w", "--workers", type=positive_int, default=1, help="Worker processes (default: 1).")
+    sheets.add_argument("--chunk-size", type=positive_int, default=500, help="Plans per chunk (default: 500).")
+    sheets.set_defaults(handler=run_sheets)
+
+    offline = commands.add_parser("offline", help="Export a static calculator page with every result precomputed.")
+    offline.add_argument("-o", "--output", default="dimeal-offline.html",
+                         help="Page to write (default: dimeal-offline.html); its service worker goes next to it.")
+    offline.add_argument("--max-oz", type=float, default=80.0, help="Largest total oz/day covered (default: 80).")
+    offline.add_argument("--oz-step", type=float, default=0.5, help="Oz/day step (default: 0.5).")
+    offline.add_argument("--max-days", type=int, default=30, help="Longest prep in days (default: 30).")
+    offline.set_defaults(handler=run_offline)
+
+    serve = commands.add_parser("serve", help="Run the local JSON scaling API.")
+    serve.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1).")
+    serve.add_argument("--port", type=int, default=8600, help="Port (default: 8600).")
+    serve.add_argument("--cache-size", type=int, default=65536, help="Cached scale results (default: 65536).")
+    serve.set_defaults(handler=run_serve)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        args.handler(args)
+    except PlanError as exc:
+        parser.exit(2, f"error: {exc}\n")
+    except BrokenPipeError:
+        sys.stderr.close()
+    return 0
@@ -0,0 +1,144 @@
+"""Headless scaling engine for the JFFD DIY recipes.
+
+A recipe dict is compiled into padded NumPy arrays so that any number of
+(recipe, daily oz, days) requests can be scaled in a single vectorized
+pass, without a Streamlit runtime. The default book comes from the recipe
+catalog (``dimeal.catalog``) and is recompiled when its files change.
+"""
+import numpy as np
+
+
+# -------------------------------------------------------------------
+# Compiled Recipe Book
+# -------------------------------------------------------------------
+class RecipeBook:
+    """Array form of a recipe dict.
+
+    ``amounts`` is a (recipes x max ingredients) matrix of 7-day batch
+    amounts, zero-padded past each recipe's ``counts`` entry.
+    """
+
+    def __init__(self, recipe_data):
+        self.names = tuple(recipe_data.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        recipes = [recipe_data[name] for name in self.names]
+        self.base_daily_oz = np.array([r["base_daily_oz"] for r in recipes], dtype=np.float64)
+        self.base_days = np.array([r["base_days"] for r in recipes], dtype=np.float64)
+        self.counts = np.array([len(r["ingredients"]) for r in recipes], dtype=np.intp)
+
+        width = int(self.counts.max()) if len(recipes) else 0
+        self.amounts = np.zeros((len(recipes), width), dtype=np.float64)
+        for i, r in enumerate(recipes):
+            self.amounts[i, : self.counts[i]] = [ing["base_7day_amount"] for ing in r["ingredients"]]
+
+        self.ingredient_names = tuple(tuple(ing["name"] for ing in r["ingredients"]) for r in recipes)
+        self.units = tuple(tuple(ing["unit"] for ing in r["ingredients"]) for r in recipes)
+
+    def __len__(self):
+        return len(self.names)
+
+    def recipe_indices(self, recipe_names):
+        """Map recipe names to row indices, raising ``KeyError`` on unknown names."""
+        try:
+            return np.fromiter((self.index[name] for name in recipe_names), dtype=np.intp)
+        except KeyError as exc:
+            raise KeyError(f"Unknown recipe: {exc.args[0]!r}") from None
+
+
+def compile_recipes(recipe_data):
+    return RecipeBook(recipe_data)
+
+
+def default_book():
+    """Every recipe in the default catalog, compiled on first use and after changes."""
+    from dimeal.catalog import default_catalog
+
+    return default_catalog().book()
+
+
+# -------------------------------------------------------------------
+# Scaling
+# -------------------------------------------------------------------
+class ScaledBatch:
+    """Result of scaling N requests against a ``RecipeBook``.
+
+    ``per_day`` and ``totals`` are (N x max ingredients) matrices aligned with
+    ``book.amounts``; use ``ingredients(i)`` to walk one request's rows.
+    """
+
+    def __init__(self, book, recipe_idx, total_daily_oz, days, scale_factor, per_day, totals):
+        self.book = book
+        self.recipe_idx = recipe_idx
+        self.total_daily_oz = total_daily_oz
+        self.days = days
+        self.scale_factor = scale_factor
+        self.per_day = per_day
+        self.totals = totals
+
+    def __len__(self):
+        return len(self.recipe_idx)
+
+    def recipe_name(self, i):
+        return self.book.names[self.recipe_idx[i]]
+
+    def ingredients(self, i):
+        """Yield ``(name, unit, per_day, total)`` for request ``i``."""
+        r = self.recipe_idx[i]
+        per_day = self.per_day[i].tolist()
+        totals = self.totals[i].tolist()
+        for k, (name, unit) in enumerate(zip(self.book.ingredient_names[r], self.book.units[r])):
+            yield name, unit, per_day[k], totals[k]
+
+
+def scale_arrays(recipe_idx, total_daily_oz, days, book=None):
+    """Scale requests given as parallel arrays of recipe index, oz/day and days."""
+    if book is None:
+        book = default_book()
+    recipe_idx = np.asarray(recipe_idx, dtype=np.intp)
+    total_daily_oz = np.asarray(total_daily_oz, dtype=np.float64)
+    days = np.asarray(days, dtype=np.float64)
+
+    base_daily_oz = book.base_daily_oz[recipe_idx]
+    base_days = book.base_days[recipe_idx]
+    amounts = book.amounts[recipe_idx]
+
+    # Same arithmetic as the calculator screens:
+    #   scale_factor = (total_daily_oz / base_daily_oz) * (days / base_days)
+    intake_ratio = total_daily_oz / base_daily_oz
+    scale_factor = intake_ratio * (days / base_days)
+    per_day = (amounts / base_days[:, None]) * intake_ratio[:, None]
+    totals = amounts * scale_factor[:, None]
+
+    return ScaledBatch(book, recipe_idx, total_daily_oz, days, scale_factor, per_day, totals)
+
+
+def scale_batch(requests, book=None):
+    """Scale an iterable of ``(recipe_name, total_daily_oz, days)`` requests.
+
+    All requests are scaled together in one vectorized pass; unknown recipe
+    names raise ``KeyError``.
+    """
+    if book is None:
+        book = default_book()
+    requests = list(requests)
+    if not requests:
+        return scale_arrays(np.empty(0, dtype=np.intp), (), (), book)
+
+    names, total_daily_oz, days = zip(*requests)
+    return scale_arrays(book.recipe_indices(names), total_daily_oz, days, book)
+
+
+def scale_recipe(recipe_name, total_daily_oz, days, book=None):
+    """Scale a single request; returns a one-row ``ScaledBatch``.
+
+    Without a ``book`` only this recipe is loaded from the catalog.
+    """
+    if book is None:
+        from dimeal.catalog import default_catalog
+
+        try:
+            book = default_catalog().recipe_book(recipe_name)
+        except KeyError:
+            raise KeyError(f"Unknown recipe: {recipe_name!r}") from None
+    return scale_batch([(recipe_name, total_daily_oz, days)], book)
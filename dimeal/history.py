@@ -0,0 +1,437 @@
+"""Plan history: every computed plan, appended to month-partitioned Parquet.
+
+Two datasets live under the history root, each partitioned Hive-style by
+calendar month (``month=2026-10/``):
+
+``plans``
+    One row per plan: ``plan_id``, ``recorded``, ``recipe``, ``dogs``,
+    ``total_daily_oz``, ``days`` and ``scale_factor``.
+``ingredients``
+    One row per plan and ingredient: ``plan_id``, ``recorded``,
+    ``recipe``, ``ingredient`` (canonical name), ``unit`` and ``total`` as
+    the recipe lists them, plus ``dimension`` and ``amount`` in the
+    dimension's base unit (oz for weights, tsp for volumes) so amounts
+    from different recipes add up.
+
+``PlanHistoryWriter.record`` only appends a tuple to an in-memory buffer,
+so neither PyArrow nor the scaling engine runs on the caller's thread. A
+background thread flushes the buffer every ``max_rows`` plans or
+``flush_interval`` seconds: it scales every buffered plan in one
+``scale_batch`` and writes one new file per month and dataset, sorted by
+recipe (plans) and ingredient (ingredients). Once a month has
+``compact_parts`` files they are merged into one, sorted again, so the
+row-group statistics of a busy month stay tight. The merged file names
+the parts it replaces in its metadata, and readers skip those parts, so a
+query that lists the folder mid-compaction counts every plan once.
+Compaction holds an ``flock`` on the month folder's ``.compact.lock``, so
+writers in other processes sharing the root never merge the same parts
+twice, and it merges only the live parts, so a merge interrupted before
+its old parts were removed is finished, not duplicated, by the next one.
+
+``PlanHistory`` answers questions over that history with
+``pyarrow.dataset``: filters are pushed down to the partition directories
+and the Parquet row-group statistics, only the columns a question needs
+are read, and aggregation runs in Arrow. Nothing is loaded into pandas.
+"""
+import contextlib
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from dimeal.engine import default_book, scale_batch
+from dimeal.shopping import index_for
+
+PLANS = "plans"
+INGREDIENTS = "ingredients"
+
+DEFAULT_MAX_ROWS = 500
+DEFAULT_FLUSH_INTERVAL = 30.0
+DEFAULT_COMPACT_PARTS = 32
+ROW_GROUP_SIZE = 16 * 1024
+
+# Metadata key on a compacted file listing the part files it replaces
+REPLACES_KEY = b"dimeal.replaces"
+# Times a query is rerun when compaction removes a file it had listed
+READ_ATTEMPTS = 3
+
+log = logging.getLogger(__name__)
+
+
+def _schemas():
+    import pyarrow as pa
+
+    plans = pa.schema([
+        ("plan_id", pa.int64()),
+        ("recorded", pa.timestamp("ms")),
+        ("recipe", pa.string()),
+        ("dogs", pa.string()),
+        ("total_daily_oz", pa.float64()),
+        ("days", pa.float64()),
+        ("scale_factor", pa.float64()),
+    ])
+    ingredients = pa.schema([
+        ("plan_id", pa.int64()),
+        ("recorded", pa.timestamp("ms")),
+        ("recipe", pa.string()),
+        ("ingredient", pa.string()),
+        ("unit", pa.string()),
+        ("total", pa.float64()),
+        ("dimension", pa.string()),
+        ("amount", pa.float64()),
+    ])
+    return {PLANS: (plans, ["recipe", "recorded"]), INGREDIENTS: (ingredients, ["ingredient", "recipe", "recorded"])}
+
+
+def month_of(moment):
+    return f"{moment.year:04d}-{moment.month:02d}"
+
+
+def plan_tables(plans, book=None):
+    """``{dataset: {month: pa.Table}}`` for ``[(plan_id, recorded, recipe, dogs, total_daily_oz, days)]``.
+
+    Plans whose recipe is no longer in ``book`` are dropped.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    if book is None:
+        book = default_book()
+    plans = [plan for plan in plans if plan[2] in book.index]
+    if not plans:
+        return {}
+    scaled = scale_batch([(recipe, oz, days) for _, _, recipe, _, oz, days in plans], book)
+    index = index_for(book)
+
+    # Every (plan, ingredient slot) pair the recipes fill in
+    slots = index.slot_ingredient[scaled.recipe_idx]
+    rows, cols = np.nonzero(slots >= 0)
+    recipe_idx = scaled.recipe_idx[rows]
+    key_ids = slots[rows, cols]
+    totals = scaled.totals[rows, cols]
+
+    names = [name for name, _ in index.keys]
+    dimensions = [dimension for _, dimension in index.keys]
+
+    plan_ids = np.array([plan[0] for plan in plans], dtype=np.int64)
+    recorded = [plan[1] for plan in plans]
+    months = np.array([month_of(moment) for moment in recorded])
+    schemas = _schemas()
+
+    tables = {PLANS: {}, INGREDIENTS: {}}
+    for month in sorted(set(months.tolist())):
+        picked = np.flatnonzero(months == month)
+        tables[PLANS][month] = pa.table({
+            "plan_id": plan_ids[picked],
+            "recorded": [recorded[i] for i in picked],
+            "recipe": [plans[i][2] for i in picked],
+            "dogs": [plans[i][3] for i in picked],
+            "total_daily_oz": scaled.total_daily_oz[picked],
+            "days": scaled.days[picked],
+            "scale_factor": scaled.scale_factor[picked],
+        }, schema=schemas[PLANS][0])
+
+        in_month = np.flatnonzero(months[rows] == month)
+        tables[INGREDIENTS][month] = pa.table({
+            "plan_id": plan_ids[rows[in_month]],
+            "recorded": [recorded[i] for i in rows[in_month]],
+            "recipe": [book.names[r] for r in recipe_idx[in_month]],
+            "ingredient": [names[k] for k in key_ids[in_month]],
+            "unit": [book.units[r][k] for r, k in zip(recipe_idx[in_month].tolist(), cols[in_month].tolist())],
+            "total": totals[in_month],
+            "dimension": [dimensions[k] for k in key_ids[in_month]],
+            "amount": totals[in_month] * index.slot_factor[recipe_idx[in_month], cols[in_month]],
+        }, schema=schemas[INGREDIENTS][0])
+    return tables
+
+
+def _sorted(table, dataset):
+    return table.sort_by([(column, "ascending") for column in _schemas()[dataset][1]])
+
+
+def _part_files(folder):
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.startswith("part-") and name.endswith(".parquet")
+    )
+
+
+def _live_parts(folder):
+    """Part files in ``folder``, less those a compacted file already replaces."""
+    import pyarrow.parquet as pq
+
+    parts = _part_files(folder)
+    replaced = set()
+    for part in parts:
+        if part.endswith("-c.parquet"):
+            try:
+                metadata = pq.read_schema(part).metadata or {}
+            except FileNotFoundError:
+                continue
+            replaced.update(json.loads(metadata.get(REPLACES_KEY, b"[]")))
+    return [part for part in parts if os.path.basename(part) not in replaced]
+
+
+@contextlib.contextmanager
+def _folder_lock(folder):
+    """Hold an exclusive lock on ``folder`` against other processes."""
+    try:
+        import fcntl
+    except ImportError:   # Windows: the writer's thread lock is all there is
+        yield
+        return
+    with open(os.path.join(folder, ".compact.lock"), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write(table, path):
+    import pyarrow.parquet as pq
+
+    # Written under a hidden name so readers never see a partial file
+    folder, name = os.path.split(path)
+    partial = os.path.join(folder, f".{name}.tmp")
+    pq.write_table(table, partial, row_group_size=ROW_GROUP_SIZE, compression="zstd")
+    os.replace(partial, path)
+
+
+class PlanHistoryWriter:
+    """Buffers plans and appends them to the history under ``root`` from a background thread.
+
+    Safe to share across sessions and threads: ``record`` takes a lock,
+    appends to a list and returns. ``flush`` blocks until everything
+    recorded so far is on disk; ``close`` flushes and stops the thread.
+    Plans in a flush that fails to write are counted in ``dropped``.
+    """
+
+    def __init__(self, root, max_rows=DEFAULT_MAX_ROWS, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 compact_parts=DEFAULT_COMPACT_PARTS):
+        self.root = str(root)
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.compact_parts = compact_parts
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._written = threading.Condition(self._lock)
+        self._buffer = []
+        self._pending = 0      # plans recorded but not yet written
+        self._flushing = False
+        self._stopping = False
+        self._next_id = time.time_ns()
+        self._file_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._flush_loop, name="dimeal-history-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, recipe, dogs, total_daily_oz, days, recorded=None):
+        """Buffer one plan; ``dogs`` is who it feeds, e.g. ``"Dexter, Indiana"``."""
+        if recorded is None:
+            recorded = datetime.datetime.now()
+        with self._lock:
+            self._next_id += 1
+            self._buffer.append((self._next_id, recorded, recipe, dogs, float(total_daily_oz), float(days)))
+            self._pending += 1
+            if len(self._buffer) >= self.max_rows:
+                self._wake.notify()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                self._wake.wait_for(
+                    lambda: len(self._buffer) >= self.max_rows or self._flushing or self._stopping,
+                    timeout=self.flush_interval,
+                )
+                plans, self._buffer = self._buffer, []
+                self._flushing = False
+                stopping = self._stopping
+            try:
+                if plans:
+                    self.write(plans)
+            except Exception:
+                # Whatever went wrong, the thread keeps going and flush() returns
+                log.exception("Dropped %d plans writing the history under %s", len(plans), self.root)
+                with self._lock:
+                    self.dropped += len(plans)
+            finally:
+                with self._lock:
+                    self._pending -= len(plans)
+                    self._written.notify_all()
+            if stopping:
+                return
+
+    def write(self, plans):
+        """Write ``[(plan_id, recorded, recipe, dogs, total_daily_oz, days)]`` as new part files."""
+        token = f"{time.time_ns()}-{os.getpid()}"
+        with self._file_lock:
+            for dataset, months in plan_tables(plans).items():
+                for month, table in months.items():
+                    folder = os.path.join(self.root, dataset, f"month={month}")
+                    os.makedirs(folder, exist_ok=True)
+                    _write(_sorted(table, dataset), os.path.join(folder, f"part-{token}.parquet"))
+                    if len(self._parts(folder)) >= self.compact_parts:
+                        with _folder_lock(folder):
+                            self._compact_folder(folder, dataset)
+
+    @staticmethod
+    def _parts(folder):
+        return _part_files(folder)
+
+    def _compact_folder(self, folder, dataset):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Listed again under the folder lock: another process may have
+        # compacted since the caller counted
+        parts = self._parts(folder)
+        live = _live_parts(folder)
+        if len(live) < 2:
+            # Only a merge whose old parts were never removed to finish
+            for part in set(parts) - set(live):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(part)
+            return
+        schema = _schemas()[dataset][0]
+        table = pa.concat_tables([pq.read_table(part, schema=schema) for part in live])
+        # The old parts go once the merged file is in place; until then
+        # readers skip the parts it names
+        replaces = json.dumps([os.path.basename(part) for part in parts]).encode()
+        table = _sorted(table, dataset).replace_schema_metadata({REPLACES_KEY: replaces})
+        _write(table, os.path.join(folder, f"part-{time.time_ns()}-{os.getpid()}-c.parquet"))
+        for part in parts:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(part)
+
+    def compact(self, month=None):
+        """Merge each month's part files (or just ``month``, ``"YYYY-MM"``) into one."""
+        self.flush()
+        with self._file_lock:
+            for dataset in (PLANS, INGREDIENTS):
+                base = os.path.join(self.root, dataset)
+                if not os.path.isdir(base):
+                    continue
+                for name in sorted(os.listdir(base)):
+                    if month is None or name == f"month={month}":
+                        folder = os.path.join(base, name)
+                        with _folder_lock(folder):
+                            self._compact_folder(folder, dataset)
+
+    def flush(self):
+        """Block until every plan recorded so far has been written."""
+        with self._lock:
+            if self._pending:
+                self._flushing = True
+                self._wake.notify()
+                self._written.wait_for(lambda: self._pending == 0)
+
+    def close(self):
+        """Write what is buffered and stop the background thread."""
+        with self._lock:
+            self._stopping = True
+            self._wake.notify()
+        self._writer.join()
+
+
+class PlanHistory:
+    """Read-only questions over the plan history under ``root``.
+
+    Months are ``"YYYY-MM"`` strings; ``start`` and ``end`` are inclusive
+    and either may be left out.
+    """
+
+    def __init__(self, root):
+        self.root = str(root)
+
+    def dataset(self, name):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(path):
+            return None
+        files = [
+            part
+            for month in sorted(os.listdir(path)) if month.startswith("month=")
+            for part in _live_parts(os.path.join(path, month))
+        ]
+        return ds.dataset(
+            files,
+            schema=_schemas()[name][0].append(pa.field("month", pa.string())),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+            partition_base_dir=path,
+        )
+
+    @staticmethod
+    def months(start=None, end=None):
+        import pyarrow.dataset as ds
+
+        condition = None
+        if start is not None:
+            condition = ds.field("month") >= start
+        if end is not None:
+            bound = ds.field("month") <= end
+            condition = bound if condition is None else condition & bound
+        return condition
+
+    def aggregate(self, name, group_by, aggregations, where=None, start=None, end=None):
+        """A ``pa.Table`` of ``aggregations`` (``[(column, function)]``) per ``group_by`` columns.
+
+        Only the grouped and aggregated columns are read; ``where`` (a
+        ``pyarrow.dataset`` expression) and the month range are pushed down
+        to the files.
+        """
+        import pyarrow as pa
+
+        data = self.dataset(name)
+        condition = self.months(start, end)
+        if where is not None:
+            condition = where if condition is None else condition & where
+        columns = list(dict.fromkeys(list(group_by) + [column for column, _ in aggregations]))
+        # A compaction can remove parts listed a moment ago; list again
+        for attempt in range(READ_ATTEMPTS):
+            if data is None:
+                return pa.table({column: pa.array([], pa.string()) for column in group_by})
+            try:
+                table = data.to_table(columns=columns, filter=condition)
+                break
+            except FileNotFoundError:
+                if attempt + 1 == READ_ATTEMPTS:
+                    raise
+                data = self.dataset(name)
+        result = table.group_by(list(group_by)).aggregate(list(aggregations))
+        return result.sort_by([(column, "ascending") for column in group_by])
+
+    def ingredient_by_month(self, ingredient, start=None, end=None):
+        """``[(month, dimension, amount, plans)]``: base-unit totals of ``ingredient`` per month."""
+        import pyarrow.dataset as ds
+
+        table = self.aggregate(
+            INGREDIENTS,
+            ["month", "dimension"],
+            [("amount", "sum"), ("plan_id", "count")],
+            where=ds.field("ingredient") == ingredient,
+            start=start,
+            end=end,
+        )
+        if table.num_rows == 0:
+            return []
+        return list(zip(*(table.column(column).to_pylist() for column in ("month", "dimension", "amount_sum", "plan_id_count"))))
+
+    def recipe_summary(self, start=None, end=None):
+        """``[(recipe, plans, mean scale factor, mean oz/day, mean days)]`` per recipe."""
+        table = self.aggregate(
+            PLANS,
+            ["recipe"],
+            [("plan_id", "count"), ("scale_factor", "mean"), ("total_daily_oz", "mean"), ("days", "mean")],
+            start=start,
+            end=end,
+        )
+        if table.num_rows == 0:
+            return []
+        columns = ("recipe", "plan_id_count", "scale_factor_mean", "total_daily_oz_mean", "days_mean")
+        return list(zip(*(table.column(column).to_pylist() for column in columns)))
@@ -0,0 +1,51 @@
+"""Freezer inventory: what is on hand per recipe and when it runs out.
+
+Batches cooked and portions eaten are appended to a ledger in the state
+database (``StateStore.record_batch`` and ``record_meals``). The database
+keeps each recipe's stock as a running total that every appended entry
+updates in the same transaction, and old entries are periodically folded
+into one carried-forward entry per recipe, so the freezer view costs the
+same after years of daily entries as on the first day. ``forecast`` turns
+that stock and the dogs' current portions into days left per recipe and
+the date the next batch is due.
+"""
+import datetime
+
+
+class FreezerForecast:
+    """Days of food left in the freezer at the dogs' current portions.
+
+    ``rows`` holds ``(recipe, on_hand_oz, daily_oz, days_left, runs_out)``
+    per recipe in the ledger; ``days_left`` and ``runs_out`` assume the
+    dogs eat only that recipe and are ``None`` when nobody eats it. Recipes
+    fed one after another last ``total_days``.
+    """
+
+    def __init__(self, rows, today):
+        self.rows = rows
+        self.today = today
+
+    @property
+    def total_days(self):
+        return sum(days for _, _, _, days, _ in self.rows if days is not None)
+
+    def next_prep(self, lead_days=0):
+        """The day to cook again, ``lead_days`` before the whole freezer runs out."""
+        return self.today + datetime.timedelta(days=max(int(self.total_days) - int(lead_days), 0))
+
+
+def forecast(stock, daily_oz, today=None):
+    """A ``FreezerForecast`` for ``{recipe: on_hand_oz}`` at ``{recipe: oz/day for all dogs}``."""
+    if today is None:
+        today = datetime.date.today()
+    rows = []
+    for recipe in stock:
+        on_hand = max(float(stock[recipe]), 0.0)
+        daily = float(daily_oz.get(recipe, 0.0))
+        if daily > 0:
+            days = on_hand / daily
+            runs_out = today + datetime.timedelta(days=int(days))
+        else:
+            days = runs_out = None
+        rows.append((recipe, on_hand, daily, days, runs_out))
+    return FreezerForecast(rows, today)
@@ -0,0 +1,178 @@
+"""Nutrient totals for scaled batches and portions solved from calorie targets.
+
+Each canonical shopping ingredient is linked to a nutrient vector per base
+unit (oz or tsp) from a local data file. Multiplying those vectors by the
+shopping index's (ingredients x recipes) matrix gives the nutrients in one
+oz of each recipe, so the totals for any batch of scale requests, or the
+portions that hit any set of per-dog targets, are a single matrix product.
+"""
+import os
+import re
+import tomllib
+from functools import lru_cache
+
+import numpy as np
+
+from dimeal.shopping import UNIT_CONVERSIONS, canonical_name, default_index
+
+FORMAT_VERSION = 1
+DEFAULT_NUTRIENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nutrients.toml")
+
+# Units a nutrient entry may be given "per", on top of the shopping units
+PER_UNITS = dict(UNIT_CONVERSIONS, g=("weight", 1 / 28.349523125), ml=("volume", 1 / 4.92892159375))
+
+# Maintenance energy as a multiple of resting energy (RER = 70 * kg ** 0.75)
+ACTIVITY_FACTORS = {
+    "weight loss": 1.0,
+    "inactive": 1.2,
+    "neutered adult": 1.6,
+    "intact adult": 1.8,
+    "active": 2.0,
+    "working": 3.0,
+}
+KG_PER_LB = 0.45359237
+
+
+class NutrientError(ValueError):
+    pass
+
+
+def _parse_per(text, source):
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)?\s*([A-Za-z]+)\s*", str(text))
+    if match is None or match.group(2) not in PER_UNITS:
+        raise NutrientError(f"{source}: can't read per {text!r}")
+    dimension, factor = PER_UNITS[match.group(2)]
+    return dimension, float(match.group(1) or 1.0) * factor
+
+
+class NutrientData:
+    """Nutrient vectors per ``(canonical ingredient, dimension)``, per base unit."""
+
+    def __init__(self, nutrients, foods, source="nutrients"):
+        self.nutrients = tuple(nutrients)
+        if not self.nutrients:
+            raise NutrientError(f"{source}: no nutrients listed")
+        self.values = {}
+        for i, food in enumerate(foods):
+            try:
+                name = canonical_name(str(food["name"]))
+                dimension, amount = _parse_per(food["per"], f"{source} food {i}")
+                vector = [float(food.get(nutrient, 0.0)) for nutrient in self.nutrients]
+            except KeyError as exc:
+                raise NutrientError(f"{source} food {i}: missing field {exc.args[0]!r}") from None
+            except (TypeError, ValueError) as exc:
+                raise NutrientError(f"{source} food {i}: {exc}") from None
+            self.values[(name, dimension)] = np.asarray(vector, dtype=np.float64) / amount
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        except (OSError, ValueError) as exc:
+            raise NutrientError(f"{path}: {exc}") from None
+        version = data.get("version", FORMAT_VERSION)
+        if version != FORMAT_VERSION:
+            raise NutrientError(f"{path}: unsupported format version {version!r}")
+        return cls(data.get("nutrients", []), data.get("foods", []), path)
+
+
+@lru_cache(maxsize=2)
+def _load_nutrients(path, stamp):
+    return NutrientData.from_file(path)
+
+
+def default_nutrients():
+    """Nutrients from ``$DIMEAL_NUTRIENTS`` (or the bundled file), reloaded when it changes."""
+    path = os.environ.get("DIMEAL_NUTRIENTS") or DEFAULT_NUTRIENTS
+    stat = os.stat(path)
+    return _load_nutrients(path, (stat.st_mtime_ns, stat.st_size))
+
+
+# -------------------------------------------------------------------
+# Per-recipe nutrient matrix
+# -------------------------------------------------------------------
+class NutrientProfile:
+    """Nutrients per oz of every recipe in a ``ShoppingIndex``'s book.
+
+    ``per_ingredient`` is (ingredients x nutrients) per base unit and
+    ``per_oz`` is (recipes x nutrients). ``missing`` lists the ingredients
+    with no data, which count as zero.
+    """
+
+    def __init__(self, index, data):
+        self.index = index
+        self.book = index.book
+        self.nutrients = data.nutrients
+        self.per_ingredient = np.zeros((len(index.keys), len(self.nutrients)), dtype=np.float64)
+        self.missing = []
+        for i, key in enumerate(index.keys):
+            vector = data.values.get(key)
+            if vector is None:
+                self.missing.append(key)
+            else:
+                self.per_ingredient[i] = vector
+
+        # One oz/day fed for one day is one oz of food
+        self.per_oz = index.matrix.T @ self.per_ingredient
+
+    def recipe(self, name):
+        """``{nutrient: amount per oz}`` for one recipe."""
+        return dict(zip(self.nutrients, self.per_oz[self.book.index[name]].tolist()))
+
+    def batch_totals(self, batch):
+        """(requests x nutrients) totals for a ``ScaledBatch`` scaled against this book."""
+        fed_oz = batch.total_daily_oz * batch.days
+        return fed_oz[:, None] * self.per_oz[batch.recipe_idx]
+
+    def batch_per_day(self, batch):
+        """(requests x nutrients) per day for a ``ScaledBatch``."""
+        return batch.total_daily_oz[:, None] * self.per_oz[batch.recipe_idx]
+
+    def solve_portions(self, targets, nutrients=("kcal",)):
+        """Daily oz of each recipe that best meets per-dog targets.
+
+        ``targets`` is (dogs x len(nutrients)) amounts per day. Each
+        (dog, recipe) pair is a one-unknown least-squares problem on the
+        relative error of every target, solved for all pairs at once.
+        Returns a (dogs x recipes) matrix aligned with ``book.names``;
+        recipes that supply none of the targeted nutrients get 0.
+        """
+        unknown = [nutrient for nutrient in nutrients if nutrient not in self.nutrients]
+        if unknown:
+            raise NutrientError(f"unknown nutrient {unknown[0]!r}; the data lists {', '.join(self.nutrients)}")
+        columns = [self.nutrients.index(nutrient) for nutrient in nutrients]
+        targets = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+        if targets.shape[1] != len(columns):
+            raise NutrientError(f"expected {len(columns)} targets per dog, got {targets.shape[1]}")
+
+        # Minimise sum_n ((oz * a_rn - t_dn) / t_dn)^2 over oz for every (d, r):
+        #   oz = sum_n (a_rn / t_dn) / sum_n (a_rn / t_dn)^2
+        per_oz = self.per_oz[:, columns]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(targets > 0, 1.0 / targets, 0.0)          # dogs x nutrients
+            numerator = scale @ per_oz.T                                 # dogs x recipes
+            denominator = (scale ** 2) @ (per_oz ** 2).T
+            oz = np.where(denominator > 0, numerator / denominator, 0.0)
+        return np.maximum(oz, 0.0)
+
+
+@lru_cache(maxsize=4)
+def nutrient_profile_for(index, data):
+    return NutrientProfile(index, data)
+
+
+def default_nutrient_profile():
+    """Profile over the default catalog and nutrient file; rebuilt when either changes."""
+    return nutrient_profile_for(default_index(), default_nutrients())
+
+
+def daily_calories(weight_lb, activity="neutered adult"):
+    """Maintenance kcal/day from body weight (lb): ``factor * 70 * kg ** 0.75``.
+
+    ``weight_lb`` may be an array; ``activity`` is a key of
+    ``ACTIVITY_FACTORS`` or a factor.
+    """
+    factor = ACTIVITY_FACTORS[activity] if isinstance(activity, str) else float(activity)
+    kg = np.asarray(weight_lb, dtype=np.float64) * KG_PER_LB
+    return factor * 70.0 * kg ** 0.75
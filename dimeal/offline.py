@@ -0,0 +1,278 @@
+"""Offline mode: every calculator result precomputed into one static page.
+
+The clean calculator only ever asks for a recipe, a total daily oz in
+0.5 oz steps and a whole number of days, so the answers for a bounded grid
+of those inputs fit in a small bundle. ``build_offline_bundle`` scales the
+whole grid in one ``scale_arrays`` call and stores each ingredient's
+totals as integer hundredths (what the app displays), delta-encoded along
+the days axis so gzip packs the runs tightly. ``offline_page`` embeds the
+compressed bundle in a self-contained HTML page that decodes it in the
+browser and answers every tap locally: it works from a saved file with no
+server at all, and when served from ``static/`` a service worker
+(``OFFLINE_SERVICE_WORKER``) keeps it available without signal.
+"""
+import base64
+import gzip
+import html
+import json
+import math
+import os
+import zlib
+
+import numpy as np
+
+from dimeal.engine import default_book, scale_arrays
+
+BUNDLE_VERSION = 1
+DEFAULT_MAX_OZ = 80.0
+DEFAULT_OZ_STEP = 0.5
+DEFAULT_MAX_DAYS = 30
+MAX_BUNDLE_VALUES = 5_000_000
+
+
+def build_offline_bundle(book=None, max_oz=DEFAULT_MAX_OZ, oz_step=DEFAULT_OZ_STEP, max_days=DEFAULT_MAX_DAYS):
+    """Every recipe scaled for ``oz_step``..``max_oz`` oz/day and 1..``max_days`` days.
+
+    Returns a JSON-ready dict. Per recipe, ``per_day`` holds the daily
+    amounts as (oz steps x ingredients) hundredths and ``totals`` the
+    (oz steps x ingredients x days) totals, each day stored as the
+    difference from the day before.
+    """
+    if book is None:
+        book = default_book()
+    if not all(math.isfinite(value) for value in (max_oz, oz_step, max_days)) or oz_step <= 0:
+        raise ValueError("The offline grid needs oz_step > 0, max_oz >= oz_step and max_days >= 1")
+    oz_steps = int(round(max_oz / oz_step))
+    max_days = int(max_days)
+    if oz_steps < 1 or max_days < 1:
+        raise ValueError("The offline grid needs oz_step > 0, max_oz >= oz_step and max_days >= 1")
+    if int(book.counts.sum()) * oz_steps * max_days > MAX_BUNDLE_VALUES:
+        raise ValueError(
+            f"{oz_steps} oz steps x {max_days} days is too large a grid for an offline page; "
+            "lower max_oz, raise oz_step or lower max_days"
+        )
+
+    oz = np.arange(1, oz_steps + 1) * float(oz_step)
+    days = np.arange(1, max_days + 1, dtype=np.float64)
+    recipes = []
+    for r, name in enumerate(book.names):
+        count = int(book.counts[r])
+        # One request per (oz, days) cell, oz-major
+        grid_oz = np.repeat(oz, max_days)
+        grid_days = np.tile(days, oz_steps)
+        batch = scale_arrays(np.full(grid_oz.size, r, dtype=np.intp), grid_oz, grid_days, book)
+
+        totals = np.rint(batch.totals[:, :count] * 100).astype(np.int64)
+        totals = totals.reshape(oz_steps, max_days, count).transpose(0, 2, 1)
+        per_day = np.rint(batch.per_day[::max_days, :count] * 100).astype(np.int64)
+        recipes.append({
+            "name": name,
+            "base_daily_oz": float(book.base_daily_oz[r]),
+            "base_days": float(book.base_days[r]),
+            "ingredients": [list(pair) for pair in zip(book.ingredient_names[r], book.units[r])],
+            "per_day": per_day.ravel().tolist(),
+            "totals": np.diff(totals, axis=2, prepend=0).ravel().tolist(),
+        })
+
+    return {
+        "version": BUNDLE_VERSION,
+        "oz_step": float(oz_step),
+        "oz_steps": oz_steps,
+        "max_days": max_days,
+        "recipes": recipes,
+    }
+
+
+def encode_bundle(bundle):
+    """Compact JSON, gzip-compressed."""
+    data = json.dumps(bundle, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def decode_bundle(data):
+    """The inverse of ``encode_bundle``, with ``totals`` expanded back to (oz, ingredient, day) lists."""
+    bundle = json.loads(gzip.decompress(data))
+    for recipe in bundle["recipes"]:
+        count = len(recipe["ingredients"])
+        deltas = np.array(recipe["totals"], dtype=np.int64).reshape(bundle["oz_steps"], count, bundle["max_days"])
+        recipe["totals"] = np.cumsum(deltas, axis=2).tolist()
+    return bundle
+
+
+# -------------------------------------------------------------------
+# Page
+# -------------------------------------------------------------------
+OFFLINE_CSS = """
+* { box-sizing: border-box; }
+body { font-family: system-ui, sans-serif; font-size: 18px; color: #1e3f20; background: #fff; margin: 0 auto; max-width: 440px; padding: 16px; }
+h1 { font-size: 1.6rem; text-align: center; margin: 8px 0 4px; }
+.subtitle { text-align: center; color: #556b2f; font-size: 0.95rem; margin: 0 0 16px; }
+.mobile-card { background: #f8faf7; border-radius: 16px; padding: 16px; border: 1px solid #e6ede8; margin-bottom: 16px; }
+.card-header { font-size: 1.15rem; font-weight: 600; margin-bottom: 12px; border-bottom: 1px solid #e1e9e3; padding-bottom: 6px; }
+label { display: block; font-size: 0.95rem; margin: 8px 0 4px; }
+select, input { width: 100%; font-size: 1.1rem; padding: 10px; border: 1px solid #c9d6cc; border-radius: 10px; background: #fff; }
+.days { display: flex; gap: 8px; }
+.days button { flex: 1; font-size: 1rem; padding: 10px 0; border: 1px solid #4a7c59; border-radius: 10px; background: #fff; color: #1e3f20; }
+.days button.on { background: #4a7c59; color: #fff; }
+.mobile-metrics { display: flex; justify-content: space-between; text-align: center; }
+.metric-val { font-size: 1.4rem; font-weight: 700; }
+.metric-lbl { font-size: 0.8rem; color: #556b2f; }
+.ingredient-plate { display: flex; justify-content: space-between; align-items: center; padding: 12px; border-radius: 12px; margin-bottom: 8px; }
+.plate-name { font-weight: 600; }
+.plate-subtext { font-size: 0.85rem; color: #556b2f; }
+.plate-val { font-weight: 700; white-space: nowrap; margin-left: 8px; }
+.note { color: #8a5a00; font-size: 0.95rem; }
+"""
+
+OFFLINE_SCRIPT = r"""
+const PLATES = [["#edf2ed", "#4a7c59"], ["#faf5ec", "#d4af37"]];
+const $ = (id) => document.getElementById(id);
+let bundle = null;
+
+async function loadBundle() {
+  const bytes = Uint8Array.from(atob($("bundle").textContent.trim()), (c) => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+  const data = JSON.parse(await new Response(stream).text());
+  // Undo the delta encoding: each (oz, ingredient) run of days is a running sum
+  for (const recipe of data.recipes) {
+    const totals = Int32Array.from(recipe.totals);
+    for (let start = 0; start < totals.length; start += data.max_days) {
+      for (let d = start + 1; d < start + data.max_days; d++) totals[d] += totals[d - 1];
+    }
+    recipe.totals = totals;
+  }
+  return data;
+}
+
+function escapeHtml(text) {
+  return text.replace(/[&<>"']/g, (c) => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c]));
+}
+
+function render() {
+  const recipe = bundle.recipes[$("recipe").selectedIndex];
+  const oz = parseFloat($("oz").value);
+  const days = parseInt($("days").value, 10);
+  const step = Math.round(oz / bundle.oz_step);
+  localStorage.setItem("dimeal-offline", JSON.stringify({recipe: recipe.name, oz: $("oz").value, days: $("days").value}));
+  for (const button of document.querySelectorAll(".days button")) {
+    button.classList.toggle("on", parseInt(button.dataset.days, 10) === days);
+  }
+
+  if (!(step >= 1 && step <= bundle.oz_steps && Math.abs(step * bundle.oz_step - oz) < 1e-9 && days >= 1 && days <= bundle.max_days)) {
+    $("results").innerHTML = `<p class="note">Offline answers cover ${bundle.oz_step}–${bundle.oz_steps * bundle.oz_step} oz/day ` +
+      `in ${bundle.oz_step} oz steps and 1–${bundle.max_days} days. Use the online calculator for anything else.</p>`;
+    return;
+  }
+
+  const count = recipe.ingredients.length;
+  const scale = (oz / recipe.base_daily_oz) * (days / recipe.base_days);
+  const plates = recipe.ingredients.map(([name, unit], k) => {
+    const perDay = recipe.per_day[(step - 1) * count + k] / 100;
+    const total = recipe.totals[((step - 1) * count + k) * bundle.max_days + days - 1] / 100;
+    const [bg, border] = PLATES[k % 2];
+    return `<div class="ingredient-plate" style="background-color: ${bg}; border-left: 5px solid ${border};">` +
+      `<div><div class="plate-name">${escapeHtml(name)}</div>` +
+      `<div class="plate-subtext">Daily: ${perDay.toFixed(2)} ${escapeHtml(unit)}</div></div>` +
+      `<div class="plate-val">${total.toFixed(2)} ${escapeHtml(unit)}</div></div>`;
+  }).join("");
+  $("results").innerHTML =
+    `<div class="mobile-card"><div class="mobile-metrics">` +
+    `<div><div class="metric-val">${oz.toFixed(1)}</div><div class="metric-lbl">Oz / Day</div></div>` +
+    `<div><div class="metric-val">${days}</div><div class="metric-lbl">Days</div></div>` +
+    `<div><div class="metric-val">${scale.toFixed(2)}x</div><div class="metric-lbl">Scale</div></div></div></div>` +
+    `<div class="mobile-card"><div class="card-header">🛒 Scaled Ingredients</div>${plates}</div>`;
+}
+
+loadBundle().then((data) => {
+  bundle = data;
+  $("recipe").innerHTML = bundle.recipes.map((r) => `<option>${escapeHtml(r.name)}</option>`).join("");
+  $("oz").step = bundle.oz_step;
+  $("oz").max = bundle.oz_steps * bundle.oz_step;
+  $("days").max = bundle.max_days;
+  const saved = JSON.parse(localStorage.getItem("dimeal-offline") || "{}");
+  const index = bundle.recipes.findIndex((r) => r.name === saved.recipe);
+  if (index >= 0) $("recipe").selectedIndex = index;
+  if (saved.oz) $("oz").value = saved.oz;
+  if (saved.days) $("days").value = saved.days;
+  for (const id of ["recipe", "oz", "days"]) $(id).addEventListener("input", render);
+  for (const button of document.querySelectorAll(".days button")) {
+    button.addEventListener("click", () => { $("days").value = button.dataset.days; render(); });
+  }
+  render();
+}).catch((error) => {
+  $("results").innerHTML = `<p class="note">This browser cannot open the offline data (${escapeHtml(String(error))}).</p>`;
+});
+
+if ("serviceWorker" in navigator && location.protocol !== "file:" && document.body.dataset.worker) {
+  navigator.serviceWorker.register(document.body.dataset.worker).catch(() => {});
+}
+"""
+
+# Cache-first so a weak signal never delays the page; each visit refreshes
+# the cached copy in the background
+OFFLINE_SERVICE_WORKER = """const CACHE = "dimeal-offline-%(version)s";
+self.addEventListener("install", (event) => {
+  event.waitUntil(caches.open(CACHE).then((cache) => cache.add(%(page)s)).then(() => self.skipWaiting()));
+});
+self.addEventListener("activate", (event) => {
+  event.waitUntil(caches.keys().then((keys) => Promise.all(keys.filter((k) => k !== CACHE).map((k) => caches.delete(k)))));
+});
+self.addEventListener("fetch", (event) => {
+  if (event.request.method !== "GET") return;
+  const fresh = fetch(event.request).then((response) => {
+    if (response.ok) {
+      const copy = response.clone();
+      caches.open(CACHE).then((cache) => cache.put(event.request, copy));
+    }
+    return response;
+  });
+  event.waitUntil(fresh.catch(() => {}));
+  event.respondWith(caches.match(event.request).then((cached) => cached || fresh));
+});
+"""
+
+
+def offline_page(data=None, title="DIMeal offline calculator", worker=None):
+    """A self-contained HTML calculator over an ``encode_bundle`` payload.
+
+    ``worker`` is the URL of a service worker to register when the page is
+    served over HTTP(S), relative to the page.
+    """
+    if data is None:
+        data = encode_bundle(build_offline_bundle())
+    esc = html.escape
+    worker_attr = f" data-worker='{esc(worker)}'" if worker else ""
+    return (
+        "<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'>"
+        "<meta name='viewport' content='width=device-width, initial-scale=1'>"
+        f"<title>{esc(title)}</title><style>{OFFLINE_CSS}</style></head>"
+        f"<body{worker_attr}><h1>{esc(title)}</h1>"
+        "<p class='subtitle'>Works without signal: every answer is already on this page.</p>"
+        "<div class='mobile-card'><div class='card-header'>🍳 Recipe &amp; Portions</div>"
+        "<label for='recipe'>Which recipe are you cooking?</label><select id='recipe'></select>"
+        "<label for='oz'>All dogs together (oz/day):</label>"
+        "<input id='oz' type='number' inputmode='decimal' min='0' value='37.5'>"
+        "<label for='days'>Prep duration (days):</label>"
+        "<div class='days'><button type='button' data-days='3'>3 days</button>"
+        "<button type='button' data-days='7'>7 days</button>"
+        "<input id='days' type='number' inputmode='numeric' min='1' value='7'></div></div>"
+        "<div id='results'></div>"
+        f"<script id='bundle' type='application/octet-stream'>{base64.b64encode(data).decode('ascii')}</script>"
+        f"<script>{OFFLINE_SCRIPT}</script></body></html>"
+    )
+
+
+def write_offline_page(path, data=None, title="DIMeal offline calculator"):
+    """Write the page to ``path`` and its service worker next to it; returns the worker's path."""
+    directory, page = os.path.split(os.path.abspath(path))
+    worker = os.path.splitext(page)[0] + "-sw.js"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(offline_page(data, title, worker))
+
+    # The cache name follows the page, so a re-export replaces the old copy
+    with open(path, "rb") as f:
+        version = format(zlib.crc32(f.read()), "08x")
+    worker_path = os.path.join(directory, worker)
+    with open(worker_path, "w", encoding="utf-8") as f:
+        f.write(OFFLINE_SERVICE_WORKER % {"version": version, "page": json.dumps(page)})
+    return worker_path
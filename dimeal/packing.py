@@ -0,0 +1,218 @@
+"""Portioning a batch into freezer containers.
+
+Each dog's portion is split into meals, and every meal of the batch is one
+item to pack. A container only ever holds one dog's meals (optionally at
+most ``max_meals`` of them), so whatever is thawed feeds one dog. The
+containers are several sizes, each with a count on hand (``None`` for
+as many as needed), and the freezer shelf holds so many oz of containers.
+
+Packing is first-fit decreasing: meals are taken largest first and each
+goes into the first open container of its dog with room; a new container
+is the largest size left. A dog's meals come in a few sizes, and a run of
+identical meals fills the open containers in order and then new ones, so
+each run is placed with a few NumPy operations and thousands of meals
+pack in milliseconds. Each container is then swapped for the smallest size still on hand that
+holds its meals, which removes most of the wasted space. ``bound`` is the
+fewest containers any packing could use (each dog's oz over the largest
+size, or its meals over the most that fit in one), so ``count - bound``
+is how far from the best the plan can be.
+
+The shelf limit is the total oz of containers the freezer takes. Big
+containers mean fewer of them but can leave more empty space, so when the
+plan overflows the shelf it is packed again opening, for each meal size,
+the container it fills most tightly. The plan with the fewest containers
+that fits is kept, and ``PackingError`` says how much shelf the best plan
+found needs when none does.
+"""
+import math
+
+import numpy as np
+
+# (label, capacity in oz, count on hand or None for unlimited)
+DEFAULT_CONTAINERS = (
+    ("8 oz", 8.0, None),
+    ("16 oz", 16.0, None),
+    ("32 oz", 32.0, None),
+)
+DEFAULT_MEALS_PER_DAY = 2
+
+# Meals are weighed to a hundredth of an oz; anything closer fits
+FIT_TOLERANCE = 1e-6
+
+
+class PackingError(ValueError):
+    pass
+
+
+def dog_meals(portions, days, meals_per_day=DEFAULT_MEALS_PER_DAY):
+    """``[(dog, meal oz, meals)]`` for ``[(dog, oz/day)]`` over ``days``."""
+    meals = int(round(days * meals_per_day))
+    return [(dog, float(oz) / meals_per_day, meals) for dog, oz in portions if oz and oz > 0 and meals > 0]
+
+
+class PackingPlan:
+    """Containers for every meal: ``kind[c]`` indexes ``containers``, ``dog[c]`` the dog list.
+
+    ``load[c]`` is the oz and ``meals[c]`` the number of meals in
+    container ``c``; ``unpacked`` counts meals left over when the
+    containers on hand ran out.
+    """
+
+    def __init__(self, containers, dogs, kind, dog, load, meals, unpacked, bound, shelf_oz):
+        self.containers = containers
+        self.dogs = dogs
+        self.kind = kind
+        self.dog = dog
+        self.load = load
+        self.meals = meals
+        self.unpacked = unpacked
+        self.bound = bound
+        self.shelf_oz = shelf_oz
+
+    @property
+    def count(self):
+        return len(self.kind)
+
+    @property
+    def capacity(self):
+        return np.array([size for _, size, _ in self.containers], dtype=np.float64)[self.kind]
+
+    @property
+    def volume(self):
+        return float(self.capacity.sum())
+
+    @property
+    def waste(self):
+        return float((self.capacity - self.load).sum())
+
+    def used(self):
+        """Containers used per size, in ``containers`` order."""
+        return np.bincount(self.kind, minlength=len(self.containers))
+
+    def rows(self):
+        """``(dog, container label, containers, meals each, oz each)``, grouped and in dog order."""
+        groups = {}
+        for key in zip(self.dog.tolist(), self.kind.tolist(), self.meals.tolist(), np.round(self.load, 2).tolist()):
+            groups[key] = groups.get(key, 0) + 1
+        return [
+            (self.dogs[d], self.containers[k][0], containers, meals, oz)
+            for (d, k, meals, oz), containers in sorted(groups.items(), key=lambda item: (item[0][0], -item[0][3], item[0][1]))
+        ]
+
+
+def pack_meals(meals, containers=DEFAULT_CONTAINERS, shelf_oz=None, max_meals=None):
+    """A ``PackingPlan`` for ``[(dog, meal oz, meals)]`` (see ``dog_meals``) that fits ``shelf_oz``."""
+    containers = tuple(containers)
+    sizes = np.array([size for _, size, _ in containers], dtype=np.float64)
+    if not len(sizes) or not np.isfinite(sizes).all() or (sizes <= 0).any():
+        raise PackingError("Container sizes must be positive")
+    on_hand = np.array([np.inf if count is None else count for _, _, count in containers], dtype=np.float64)
+    if (on_hand < 0).any():
+        raise PackingError("Container counts cannot be negative")
+    if max_meals is not None and int(max_meals) < 1:
+        raise PackingError("Containers must hold at least one meal")
+    if shelf_oz is not None and not (math.isfinite(shelf_oz) and shelf_oz > 0):
+        raise PackingError("The freezer shelf must hold a positive number of oz")
+    most = math.inf if max_meals is None else int(max_meals)
+
+    # {dog: {meal oz: meals}}
+    by_dog = {}
+    for dog, oz, n in meals:
+        if not (math.isfinite(oz) and oz > 0) or int(n) < 0:
+            raise PackingError(f"Meals for {dog} must be a positive number of oz")
+        runs = by_dog.setdefault(dog, {})
+        runs[float(oz)] = runs.get(float(oz), 0) + int(n)
+
+    bound = 0
+    for dog, runs in by_dog.items():
+        largest, smallest = max(runs), min(runs)
+        if largest > sizes.max() + FIT_TOLERANCE:
+            raise PackingError(f"A {largest:.2f} oz meal for {dog} does not fit the largest container")
+        per_container = min(math.floor(sizes.max() / smallest + FIT_TOLERANCE), most)
+        bound += max(
+            math.ceil(sum(oz * n for oz, n in runs.items()) / sizes.max() - FIT_TOLERANCE),
+            math.ceil(sum(runs.values()) / per_container),
+        )
+
+    best = None
+    for tight in (False, True):
+        plan = _pack(by_dog, containers, sizes, on_hand.copy(), most, tight, bound, shelf_oz)
+        if shelf_oz is None:
+            return plan
+        # Any plan that fits beats one that does not; among those that do
+        # not, the smallest is kept to report
+        fits = plan.volume <= shelf_oz + FIT_TOLERANCE
+        rank = (0, plan.unpacked, plan.count, plan.volume) if fits else (1, plan.volume)
+        if best is None or rank < best[0]:
+            best = (rank, plan)
+    best = best[1]
+    if best.volume > shelf_oz + FIT_TOLERANCE:
+        raise PackingError(
+            f"The best packing found needs {best.volume:.0f} oz of containers; the shelf holds {shelf_oz:.0f} oz"
+        )
+    return best
+
+
+def _pack(by_dog, containers, sizes, left, most, tight, bound, shelf_oz):
+    """First fit decreasing; new containers are the largest size, or with ``tight`` the best filled."""
+    dogs = list(by_dog)
+    kind, owner, load, count = [], [], [], []
+    unpacked = 0
+
+    for d, runs in enumerate(by_dog.values()):
+        # First fit, largest meals first. Identical meals fill the open
+        # containers in order, then new ones, so each size is placed at once
+        room = np.zeros(0)
+        held = np.zeros(0, dtype=np.int64)
+        opened = np.zeros(0, dtype=np.intp)
+        for oz in sorted(runs, reverse=True):
+            n = runs[oz]
+            fits = np.minimum(np.floor(room / oz + FIT_TOLERANCE), most - held).astype(np.int64)
+            take = np.minimum(fits, np.maximum(n - (np.cumsum(fits) - fits), 0))
+            room -= take * oz
+            held += take
+            n -= int(take.sum())
+
+            while n > 0:
+                usable = np.flatnonzero((left > 0) & (sizes >= oz - FIT_TOLERANCE))
+                if not usable.size:
+                    unpacked += n
+                    break
+                if tight:
+                    # Fullest when filled with this meal, the larger size on a tie
+                    filled = np.minimum(np.floor(sizes[usable] / oz + FIT_TOLERANCE), most) * oz / sizes[usable]
+                    k = usable[np.lexsort((-sizes[usable], -np.round(filled, 9)))[0]]
+                else:
+                    k = usable[np.argmax(sizes[usable])]
+                each = int(min(math.floor(sizes[k] / oz + FIT_TOLERANCE), most))
+                new = int(min(math.ceil(n / each), left[k]))
+                counts = np.full(new, each, dtype=np.int64)
+                counts[-1] = min(each, n - each * (new - 1))
+                left[k] -= new
+                opened = np.concatenate((opened, np.full(new, k, dtype=np.intp)))
+                room = np.concatenate((room, sizes[k] - counts * oz))
+                held = np.concatenate((held, counts))
+                n -= int(counts.sum())
+
+        kind.extend(opened.tolist())
+        owner.extend([d] * len(opened))
+        load.extend((sizes[opened] - room).tolist())
+        count.extend(held.tolist())
+
+    kind = np.array(kind, dtype=np.intp)
+    load = np.array(load, dtype=np.float64)
+
+    # Right-size, smallest size first: move every container that fits into
+    # it, those in the biggest containers first while any are on hand
+    for k in np.argsort(sizes, kind="stable"):
+        movable = np.flatnonzero((load <= sizes[k] + FIT_TOLERANCE) & (sizes[kind] > sizes[k]))
+        if movable.size > left[k]:
+            movable = movable[np.argsort(-sizes[kind[movable]], kind="stable")][:int(left[k])]
+        np.add.at(left, kind[movable], 1)
+        left[k] -= movable.size
+        kind[movable] = k
+
+    return PackingPlan(
+        containers, dogs, kind, np.array(owner, dtype=np.intp), load, np.array(count, dtype=np.int64),
+        unpacked, bound, shelf_oz,
+    )
@@ -0,0 +1,256 @@
+"""Cooking from the pantry: how many days of food the ingredients on hand make.
+
+The forward calculation turns oz/day and days into ingredient totals; this
+runs it backwards. ``ShoppingIndex.matrix`` holds the base units of every
+ingredient per oz/day fed for one day, so a recipe's days from the pantry
+are the smallest ``stock / (matrix * oz/day)`` over its ingredients, and
+the ingredient reaching it is the one that runs out first. Stock only
+divides the matrix once; every dog configuration (any number of rows of
+oz/day per recipe) then costs one division, so the whole catalog is
+answered in one pass.
+
+By default only the ingredients listed in the pantry limit a recipe (the
+rest are bought); with ``strict`` anything not listed counts as none on
+hand. ``best_split`` shares the stock between several recipes so that it
+feeds the most days in total.
+"""
+import numpy as np
+
+from dimeal.shopping import DISPLAY_UNITS, UNIT_CONVERSIONS, canonical_name, default_index, display_amount
+
+# Simplex tolerances: pivots below this are treated as zero
+EPSILON = 1e-9
+MAX_PIVOTS = 10_000
+
+
+class PantryError(ValueError):
+    pass
+
+
+def pantry_entries(pantry):
+    """``(name, amount, unit)`` entries from ``{name: (amount, unit)}`` or an iterable of entries."""
+    if hasattr(pantry, "items"):
+        return [(name, amount, unit) for name, (amount, unit) in pantry.items()]
+    return list(pantry)
+
+
+def pantry_stock(pantry, index):
+    """Base-unit amounts per ``index`` ingredient, and which were listed.
+
+    ``pantry`` is ``{name: (amount, unit)}`` or ``[(name, amount, unit)]``;
+    entries for the same ingredient and measure (weight or volume) add up,
+    so one ingredient can be listed by weight and by volume.
+    """
+    key_index = {key: i for i, key in enumerate(index.keys)}
+    stock = np.zeros(len(index.keys), dtype=np.float64)
+    listed = np.zeros(len(index.keys), dtype=bool)
+    for name, amount, unit in pantry_entries(pantry):
+        try:
+            dimension, factor = UNIT_CONVERSIONS[unit]
+        except KeyError:
+            raise PantryError(f"Unknown unit {unit!r} for {name}") from None
+        i = key_index.get((canonical_name(name), dimension))
+        if i is None:
+            measured = sorted(d for n, d in index.keys if n == canonical_name(name))
+            if measured:
+                raise PantryError(f"No recipe measures {name} by {dimension}; list it by {' or '.join(measured)}")
+            raise PantryError(f"No recipe uses {name}")
+        if amount is None or amount < 0:
+            raise PantryError(f"{name}: amount must be zero or more")
+        stock[i] += float(amount) * factor
+        listed[i] = True
+    return stock, listed
+
+
+def group_daily_oz(profiles, groups, book):
+    """(groups x recipes) oz/day in ``book`` order; each group is a list of dogs fed together."""
+    src = [j for j, name in enumerate(profiles.recipe_names) if name in book.index]
+    dst = [book.index[profiles.recipe_names[j]] for j in src]
+    daily = np.zeros((len(groups), len(book)), dtype=np.float64)
+    for g, dogs in enumerate(groups):
+        rows = [profiles.index[dog] for dog in dogs if dog in profiles]
+        daily[g, dst] = profiles.portions[np.ix_(rows, src)].sum(axis=0)
+    return daily
+
+
+def whole_days(days):
+    return np.floor(days + EPSILON)
+
+
+class PantryLimits:
+    """Days of food per (configuration, recipe) from one pantry.
+
+    ``days`` is fractional; ``inf`` where nothing in the pantry limits the
+    recipe and ``nan`` where the configuration does not eat it.
+    ``limiting`` is each recipe's ingredient (``index.keys`` position) that
+    runs out first, or -1. ``listed`` marks the ingredients named in the
+    pantry and ``constraining`` those that can limit a recipe.
+    """
+
+    def __init__(self, index, stock, listed, constraining, daily_oz, days, limiting):
+        self.index = index
+        self.stock = stock
+        self.listed = listed
+        self.constraining = constraining
+        self.daily_oz = daily_oz
+        self.days = days
+        self.limiting = limiting
+
+    def __len__(self):
+        return self.days.shape[0]
+
+    def rows(self, config=0):
+        """``(recipe, whole days, limiting ingredient)``.
+
+        Days is ``inf`` when nothing in the pantry limits the recipe and
+        ``None`` when the configuration does not eat it.
+        """
+        rows = []
+        for r, name in enumerate(self.index.book.names):
+            days = self.days[config, r]
+            limit = self.index.keys[self.limiting[r]][0] if self.limiting[r] >= 0 else None
+            if np.isnan(days):
+                days = None
+            elif np.isfinite(days):
+                days = int(whole_days(days))
+            else:
+                days = float(days)
+            rows.append((name, days, limit))
+        return rows
+
+
+def pantry_limits(pantry, daily_oz, index=None, strict=False):
+    """A ``PantryLimits`` for a pantry (see ``pantry_stock``) and oz/day per recipe in ``index.book`` order.
+
+    ``daily_oz`` is one row per dog configuration, or a single row.
+    """
+    if index is None:
+        index = default_index()
+    stock, listed = pantry_stock(pantry, index)
+    daily_oz = np.atleast_2d(np.asarray(daily_oz, dtype=np.float64))
+
+    # Days per oz/day fed: the first ingredient to run out, per recipe
+    constraining = np.ones_like(listed) if strict else listed
+    limited = (index.matrix > 0) & constraining[:, None]
+    with np.errstate(divide="ignore"):
+        ratio = np.where(limited, stock[:, None] / np.where(limited, index.matrix, 1.0), np.inf)
+    limiting = np.where(limited.any(axis=0), ratio.argmin(axis=0), -1)
+    oz_days = ratio.min(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.where(daily_oz > 0, oz_days / daily_oz, np.nan)
+    return PantryLimits(index, stock, listed, constraining, daily_oz, days, limiting)
+
+
+# -------------------------------------------------------------------
+# Sharing the pantry between recipes
+# -------------------------------------------------------------------
+def maximize_total(A, b):
+    """Largest ``x.sum()`` with ``A @ x <= b`` and ``x >= 0``, by the simplex method.
+
+    ``A`` and ``b`` are non-negative and every column of ``A`` has a
+    positive entry, so the origin is a starting vertex and the optimum is
+    bounded. Bland's rule keeps degenerate pivots from cycling.
+    """
+    m, n = A.shape
+    tableau = np.zeros((m + 1, n + m + 1), dtype=np.float64)
+    tableau[:m, :n] = A
+    tableau[:m, n:n + m] = np.eye(m)
+    tableau[:m, -1] = b
+    tableau[m, :n] = -1.0
+    basis = list(range(n, n + m))
+
+    for _ in range(MAX_PIVOTS):
+        entering = np.flatnonzero(tableau[m, :-1] < -EPSILON)
+        if entering.size == 0:
+            break
+        col = entering[0]
+        column = tableau[:m, col]
+        ratios = np.full(m, np.inf)
+        positive = column > EPSILON
+        ratios[positive] = tableau[:m, -1][positive] / column[positive]
+        ties = np.flatnonzero(ratios <= ratios.min() + EPSILON)
+        row = min(ties, key=lambda r: basis[r])
+
+        tableau[row] /= tableau[row, col]
+        others = np.arange(m + 1) != row
+        tableau[others] -= np.outer(tableau[others, col], tableau[row])
+        basis[row] = col
+
+    x = np.zeros(n, dtype=np.float64)
+    for row, var in enumerate(basis):
+        if var < n:
+            x[var] = tableau[row, -1]
+    return x
+
+
+class PantrySplit:
+    """Whole days of each recipe that together feed the most days from the pantry."""
+
+    def __init__(self, index, stock, listed, days, used):
+        self.index = index
+        self.stock = stock
+        self.listed = listed
+        self.days = days
+        self.used = used
+
+    @property
+    def total_days(self):
+        return int(self.days.sum())
+
+    def rows(self):
+        """``(recipe, days)`` for every recipe in the split."""
+        return [(self.index.book.names[r], int(self.days[r])) for r in np.flatnonzero(self.days)]
+
+    def stock_rows(self):
+        """``(ingredient, have, used, left, unit)`` for each pantry item, in one unit per row."""
+        rows = []
+        for i in np.flatnonzero(self.listed):
+            name, dimension = self.index.keys[i]
+            _, unit = display_amount(float(max(self.stock[i], self.used[i])), dimension)
+            factor = dict(DISPLAY_UNITS[dimension])[unit]
+            have, used = self.stock[i] / factor, self.used[i] / factor
+            rows.append((name, have, used, max(have - used, 0.0), unit))
+        return rows
+
+
+def best_split(pantry, daily_oz, index=None, strict=False, recipes=None):
+    """Share ``pantry`` between ``recipes`` (default: every recipe fed) to feed the most days.
+
+    ``daily_oz`` is one configuration's oz/day per recipe in ``index.book``
+    order. Only recipes the pantry limits take part. The best fractional
+    split is rounded down to whole days, then whole days are added back
+    while the stock lasts.
+    """
+    if index is None:
+        index = default_index()
+    limits = pantry_limits(pantry, daily_oz, index, strict)
+    stock, listed = limits.stock, limits.listed
+    daily_oz = limits.daily_oz[0]
+
+    candidates = np.isfinite(limits.days[0])
+    if recipes is not None:
+        candidates &= np.isin(np.arange(len(index.book)), index.book.recipe_indices(recipes))
+    chosen = np.flatnonzero(candidates)
+    days = np.zeros(len(index.book), dtype=np.float64)
+    if chosen.size == 0:
+        return PantrySplit(index, stock, listed, days, np.zeros_like(stock))
+
+    # Stock each chosen recipe uses per day, for the ingredients it can run out of
+    rows = np.flatnonzero(limits.constraining & (index.matrix[:, chosen] > 0).any(axis=1))
+    per_day = index.matrix[np.ix_(rows, chosen)] * daily_oz[chosen]
+    split = whole_days(maximize_total(per_day, stock[rows]))
+
+    # Rounding down leaves stock over; top up a day at a time where it fits
+    left = stock[rows] - per_day @ split
+    added = True
+    while added:
+        added = False
+        for j in np.argsort(-split, kind="stable"):
+            if (per_day[:, j] <= left + EPSILON).all():
+                split[j] += 1
+                left -= per_day[:, j]
+                added = True
+    days[chosen] = split
+    used = index.matrix @ (days * daily_oz)
+    return PantrySplit(index, stock, listed, days, used)
@@ -0,0 +1,195 @@
+"""Columnar dog profile store: one row per dog, one column per recipe (oz/day).
+
+Portions live in a single NumPy float matrix; pandas is only imported when
+a caller asks for a ``DataFrame`` view (e.g. the grid editor).
+"""
+import numpy as np
+
+from dimeal.recipes import RECIPE_DATA
+
+DOG_COLUMN = "Dog"
+
+# The two dogs the built-in recipes were calibrated for
+DEFAULT_DOGS = {"Dexter": "dex_default", "Indiana": "indy_default"}
+
+
+def _clean_portion(value):
+    try:
+        oz = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return oz if oz > 0 else 0.0  # also maps NaN to 0
+
+
+class ProfileStore:
+    """Daily portions for any number of dogs, held as a (dogs x recipes) matrix.
+
+    Combining portions for any subset of dogs is a single vectorized sum.
+    A ``freeze()``-ed store can be shared between sessions: edits raise
+    ``ValueError``, so change a ``copy()`` instead.
+    """
+
+    def __init__(self, dogs, portions, recipe_names):
+        self.frozen = False
+        self.recipe_names = tuple(recipe_names)
+        self._set(dogs, portions)
+
+    def _check_writable(self):
+        if self.frozen:
+            raise ValueError("This ProfileStore is shared and read-only; edit a copy()")
+
+    def _set(self, dogs, portions):
+        self._check_writable()
+        # Drop blank names and keep the last row for duplicated names
+        portions = np.asarray(portions, dtype=np.float64).reshape(len(dogs), len(self.recipe_names))
+        rows = {}
+        for i, dog in enumerate(dogs):
+            if dog is None or dog != dog:  # None or NaN
+                continue
+            name = str(dog).strip()
+            if name:
+                rows.pop(name, None)
+                rows[name] = i
+
+        self.dogs = list(rows)
+        self.index = {dog: i for i, dog in enumerate(self.dogs)}
+        matrix = portions[list(rows.values())] if rows else np.zeros((0, len(self.recipe_names)))
+        self.portions = np.where(matrix > 0, matrix, 0.0)  # NaN and negatives -> 0
+
+    @classmethod
+    def from_recipe_defaults(cls, recipe_data=RECIPE_DATA):
+        """Dexter and Indiana at the portions each recipe was calibrated for."""
+        portions = [[recipe[field] for recipe in recipe_data.values()] for field in DEFAULT_DOGS.values()]
+        return cls(list(DEFAULT_DOGS), portions, recipe_data.keys())
+
+    @classmethod
+    def from_records(cls, records, recipe_names):
+        """Build from ``{"Dog": name, recipe: oz, ...}`` dicts."""
+        records = list(records)
+        portions = [[_clean_portion(r.get(name)) for name in recipe_names] for r in records]
+        return cls([r.get(DOG_COLUMN) for r in records], portions, recipe_names)
+
+    # ---------------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------------
+    def __len__(self):
+        return len(self.dogs)
+
+    def __contains__(self, dog):
+        return dog in self.index
+
+    def portion(self, dog, recipe_name, default=0.0):
+        """``dog``'s oz/day for ``recipe_name``; ``default`` for an unknown dog or recipe."""
+        i = self.index.get(dog)
+        if i is None or recipe_name not in self.recipe_names:
+            return default
+        return float(self.portions[i, self.recipe_names.index(recipe_name)])
+
+    def combined_daily_oz(self, dogs=None):
+        """Combined oz/day per recipe for ``dogs`` (all dogs when ``None``)."""
+        if dogs is None:
+            totals = self.portions.sum(axis=0)
+        else:
+            rows = [self.index[dog] for dog in dogs if dog in self.index]
+            totals = self.portions[rows].sum(axis=0)
+        return dict(zip(self.recipe_names, totals.tolist()))
+
+    # ---------------------------------------------------------------
+    # Edits
+    # ---------------------------------------------------------------
+    def copy(self):
+        """An editable copy."""
+        return type(self)(self.dogs, self.portions, self.recipe_names)
+
+    def freeze(self):
+        """Make the store read-only (so it can be shared) and return it."""
+        self.frozen = True
+        self.portions.flags.writeable = False
+        return self
+
+    def set_portion(self, dog, recipe_name, oz):
+        self._check_writable()
+        if recipe_name not in self.recipe_names:
+            raise KeyError(f"Unknown recipe: {recipe_name!r}")
+        if dog not in self.index:
+            self.add_dog(dog)
+        self.portions[self.index[dog], self.recipe_names.index(recipe_name)] = _clean_portion(oz)
+
+    def assign(self, dogs, recipe_names, portions):
+        """Overwrite a (dogs x recipes) block at once; unknown dogs and recipes are skipped."""
+        self._check_writable()
+        portions = np.asarray(portions, dtype=np.float64)
+        rows = [(i, self.index[dog]) for i, dog in enumerate(dogs) if dog in self.index]
+        cols = [(j, self.recipe_names.index(name)) for j, name in enumerate(recipe_names) if name in self.recipe_names]
+        if not rows or not cols:
+            return
+        src_rows, dst_rows = zip(*rows)
+        src_cols, dst_cols = zip(*cols)
+        block = portions[np.ix_(src_rows, src_cols)]
+        self.portions[np.ix_(dst_rows, dst_cols)] = np.where(block > 0, block, 0.0)
+
+    def add_dog(self, dog, portions=None):
+        portions = portions or {}
+        row = [[_clean_portion(portions.get(name)) for name in self.recipe_names]]
+        self._set(self.dogs + [dog], np.vstack([self.portions, row]))
+
+    def align(self, recipe_data):
+        """Match the columns to ``recipe_data``'s recipes, e.g. after a catalog reload.
+
+        Kept recipes keep their portions; a new recipe starts Dexter and
+        Indiana at its calibrated defaults and everyone else at 0. Returns
+        whether anything changed.
+        """
+        names = tuple(recipe_data.keys())
+        if names == self.recipe_names:
+            return False
+        self._check_writable()
+
+        columns = []
+        for name in names:
+            if name in self.recipe_names:
+                columns.append(self.portions[:, self.recipe_names.index(name)])
+            else:
+                recipe = recipe_data[name]
+                columns.append([_clean_portion(recipe[DEFAULT_DOGS[dog]]) if dog in DEFAULT_DOGS else 0.0
+                                for dog in self.dogs])
+        self.recipe_names = names
+        self._set(self.dogs, np.column_stack(columns) if columns else np.zeros((len(self.dogs), 0)))
+        return True
+
+    def remove_dogs(self, dogs):
+        keep = [i for i, dog in enumerate(self.dogs) if dog not in set(dogs)]
+        self._set([self.dogs[i] for i in keep], self.portions[keep])
+
+    def replace(self, frame):
+        """Swap in an edited ``DataFrame`` indexed by dog (e.g. from a grid editor)."""
+        import pandas as pd
+
+        frame = frame.reindex(columns=list(self.recipe_names))
+        frame = frame.apply(pd.to_numeric, errors="coerce")
+        self._set(frame.index.tolist(), frame.to_numpy(dtype=np.float64, na_value=0.0))
+
+    # ---------------------------------------------------------------
+    # Export
+    # ---------------------------------------------------------------
+    @property
+    def frame(self):
+        """A ``DataFrame`` indexed by dog name (imports pandas)."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.portions.copy(),
+            index=pd.Index(self.dogs, name=DOG_COLUMN),
+            columns=list(self.recipe_names),
+        )
+
+    def to_frame(self):
+        """A copy with the dog name as a regular first column."""
+        return self.frame.reset_index()
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        columns = {DOG_COLUMN: self.dogs}
+        columns.update((name, self.portions[:, j]) for j, name in enumerate(self.recipe_names))
+        return pa.table(columns)
@@ -0,0 +1,197 @@
+"""Opt-in per-rerun timers with a Prometheus text-format export.
+
+A ``RerunProfile`` is started at the top of a script run (or a fragment
+rerun) and made current for that thread. Code along the rerun path wraps
+its steps in ``section(name)``; with no current profile that returns a
+shared no-op context manager, so the disabled path costs one ContextVar
+lookup.
+
+``MetricsExporter`` keeps process-wide totals and periodically rewrites a
+``.prom`` file for node_exporter's textfile collector.
+"""
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+_current = ContextVar("dimeal_rerun_profile", default=None)
+
+# Upper bounds (seconds) of the rerun duration histogram
+RERUN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.profile.sections.setdefault(self.name, (0.0, 0))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RerunProfile:
+    """Wall time per named section for one script or fragment rerun.
+
+    Sections may nest; each records its own inclusive time. Repeated
+    sections accumulate and count their calls.
+    """
+
+    def __init__(self, kind="full"):
+        self.kind = kind
+        self.sections = {}
+        self.elements = None  # counted only when the caller hooks the send path
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def section(self, name):
+        return _Section(self, name)
+
+    def add(self, name, seconds):
+        total, calls = self.sections.get(name, (0.0, 0))
+        self.sections[name] = (total + seconds, calls + 1)
+
+    def finish(self):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.started
+        return self
+
+    def rows(self):
+        """``(section, ms, calls)`` in the order sections were first entered."""
+        return [(name, total * 1000, calls) for name, (total, calls) in self.sections.items()]
+
+
+# -------------------------------------------------------------------
+# Current profile
+# -------------------------------------------------------------------
+def start(kind="full"):
+    profile = RerunProfile(kind)
+    _current.set(profile)
+    return profile
+
+
+def stop(profile):
+    if _current.get() is profile:
+        _current.set(None)
+    return profile.finish()
+
+
+def current():
+    return _current.get()
+
+
+def section(name):
+    """Time ``name`` on the current profile (a no-op when profiling is off)."""
+    profile = _current.get()
+    if profile is None:
+        return NULL_SECTION
+    return profile.section(name)
+
+
+# -------------------------------------------------------------------
+# Prometheus export
+# -------------------------------------------------------------------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsExporter:
+    """Process-wide rerun totals, rewritten to ``path`` at most every ``interval`` seconds.
+
+    The file is replaced atomically so a scraper never reads a partial
+    snapshot; counters are cumulative for the life of the process.
+    """
+
+    def __init__(self, path, interval=10.0):
+        self.path = str(path)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self._reruns = {}     # kind -> [bucket counts..., sum, count]
+        self._sections = {}   # section -> [sum, count]
+        self._elements = {}   # kind -> total
+
+    def record(self, profile):
+        with self._lock:
+            stats = self._reruns.setdefault(profile.kind, [0] * len(RERUN_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(RERUN_BUCKETS):
+                if profile.seconds <= bound:
+                    stats[i] += 1
+            stats[-2] += profile.seconds
+            stats[-1] += 1
+            for name, (total, calls) in profile.sections.items():
+                totals = self._sections.setdefault(name, [0.0, 0])
+                totals[0] += total
+                totals[1] += calls
+            if profile.elements is not None:
+                self._elements[profile.kind] = self._elements.get(profile.kind, 0) + profile.elements
+
+            due = time.monotonic() - self._last_write >= self.interval
+            if due:
+                self._last_write = time.monotonic()
+        if due:
+            self.write()
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP dimeal_rerun_seconds Wall time of app script and fragment reruns.",
+                "# TYPE dimeal_rerun_seconds histogram",
+            ]
+            for kind, stats in sorted(self._reruns.items()):
+                for bound, count in zip(RERUN_BUCKETS, stats):
+                    lines.append(f'dimeal_rerun_seconds_bucket{{kind="{_label(kind)}",le="{bound}"}} {count}')
+                lines.append(f'dimeal_rerun_seconds_bucket{{kind="{_label(kind)}",le="+Inf"}} {stats[-1]}')
+                lines.append(f'dimeal_rerun_seconds_sum{{kind="{_label(kind)}"}} {stats[-2]:.6f}')
+                lines.append(f'dimeal_rerun_seconds_count{{kind="{_label(kind)}"}} {stats[-1]}')
+
+            lines += [
+                "# HELP dimeal_section_seconds Wall time spent in each profiled section.",
+                "# TYPE dimeal_section_seconds summary",
+            ]
+            for name, (total, calls) in sorted(self._sections.items()):
+                lines.append(f'dimeal_section_seconds_sum{{section="{_label(name)}"}} {total:.6f}')
+                lines.append(f'dimeal_section_seconds_count{{section="{_label(name)}"}} {calls}')
+
+            lines += [
+                "# HELP dimeal_rerun_elements_total Elements sent to the browser by profiled reruns.",
+                "# TYPE dimeal_rerun_elements_total counter",
+            ]
+            for kind, total in sorted(self._elements.items()):
+                lines.append(f'dimeal_rerun_elements_total{{kind="{_label(kind)}"}} {total}')
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        text = self.render()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".dimeal-metrics-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
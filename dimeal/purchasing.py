@@ -0,0 +1,248 @@
+"""Round scaled ingredient amounts up to real store packages at minimum cost.
+
+A price catalog lists the packages (size, unit, price) each ingredient is
+sold in. For every ingredient the cheapest way to cover an amount is an
+unbounded covering knapsack over its packages; it is solved once per
+catalog by dynamic programming into a lookup table and then answered for
+any number of amounts at once with array indexing.
+
+Package sizes are put on a grid (the GCD of the sizes), so the table stays
+small. Some optimal basket holds fewer than ``best`` (the size in grid
+units of the package with the best price per unit) packages of any other
+kind: any ``best`` of them contain a group whose total is a multiple of
+``best`` and can be swapped for best-value packages at no extra cost.
+Amounts past ``best * (largest + 1)`` are therefore covered with best-value
+packages first and the table never grows with the plan.
+"""
+import json
+import math
+import os
+import tomllib
+from functools import lru_cache
+
+import numpy as np
+
+from dimeal.engine import scale_batch
+from dimeal.shopping import UNIT_CONVERSIONS, default_index, display_amount
+
+FORMAT_VERSION = 1
+DEFAULT_PRICES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices.toml")
+
+# Sizes are compared in hundredths of the base unit (oz / tsp)
+SIZE_RESOLUTION = 100
+# Coarsen the grid (rounding package sizes down, which only ever buys a
+# little extra) if a table would grow past this many entries
+MAX_TABLE = 1 << 20
+
+
+class PriceError(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Per-ingredient tables
+# -------------------------------------------------------------------
+class PackageTable:
+    """Minimum-cost package counts for one ingredient, for every amount up to a bound.
+
+    ``cost[a]`` and ``counts[a]`` cover at least ``a`` grid units; past the
+    table, whole packages of ``best`` are added first.
+    """
+
+    def __init__(self, labels, sizes, prices):
+        self.labels = tuple(labels)
+        self.sizes = np.asarray(sizes, dtype=np.float64)   # base units
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+        ticks = np.rint(self.sizes * SIZE_RESOLUTION).astype(np.int64)
+        if (ticks <= 0).any():
+            raise PriceError("Package sizes must be positive")
+        self.grid = math.gcd(*ticks.tolist()) / SIZE_RESOLUTION
+        units = np.rint(self.sizes / self.grid).astype(np.intp)
+        while int(units.max()) * (int(units.max()) + 1) > MAX_TABLE:
+            self.grid *= 2
+            units = np.maximum(np.floor(self.sizes / self.grid), 1).astype(np.intp)
+        self.units = units
+        self.best = int(np.argmin(self.prices / self.units))
+        self.bound = int(units[self.best]) * (int(units.max()) + 1)
+        self.cost, self.counts = self._solve()
+
+    def _solve(self):
+        n = self.bound + 1
+        cost = np.zeros(n, dtype=np.float64)
+        counts = np.zeros((n, len(self.units)), dtype=np.int64)
+
+        # cost[a] = min over packages of price + cost[a - size]. Every size is
+        # at least the smallest one, so a block that wide only reads entries
+        # already filled and can be computed in one step.
+        width = int(self.units.min())
+        for start in range(1, n, width):
+            amounts = np.arange(start, min(start + width, n))
+            prev = np.maximum(amounts[None, :] - self.units[:, None], 0)
+            candidates = self.prices[:, None] + cost[prev]
+            choice = np.argmin(candidates, axis=0)
+            column = np.arange(len(amounts))
+            cost[amounts] = candidates[choice, column]
+            counts[amounts] = counts[prev[choice, column]]
+            counts[amounts, choice] += 1
+        return cost, counts
+
+    def solve(self, amounts):
+        """``(counts, cost)`` covering each base-unit amount in ``amounts``.
+
+        ``counts`` is (amounts x packages), aligned with ``labels``.
+        """
+        amounts = np.atleast_1d(np.asarray(amounts, dtype=np.float64))
+        need = np.ceil(np.maximum(amounts, 0.0) / self.grid - 1e-9).astype(np.int64)
+
+        # Whole packages of the best-value size until the rest fits the table
+        best_units = int(self.units[self.best])
+        extra = np.maximum(0, -(-(need - self.bound) // best_units))
+        rest = need - extra * best_units
+
+        counts = self.counts[rest].copy()
+        counts[:, self.best] += extra
+        cost = self.cost[rest] + extra * self.prices[self.best]
+        return counts, cost
+
+
+# -------------------------------------------------------------------
+# Price catalog
+# -------------------------------------------------------------------
+class PriceCatalog:
+    """Store packages per ``(ingredient, dimension)``, matching ``ShoppingIndex.keys``.
+
+    ``packages`` is an iterable of ``{ingredient, size, unit, price}``
+    dicts with an optional ``label``. Tables are built on first use.
+    """
+
+    def __init__(self, packages):
+        self.packages = {}
+        for i, package in enumerate(packages):
+            try:
+                name = str(package["ingredient"])
+                unit = str(package["unit"])
+                size = float(package["size"])
+                price = float(package["price"])
+            except KeyError as exc:
+                raise PriceError(f"package {i}: missing field {exc.args[0]!r}") from None
+            except (TypeError, ValueError) as exc:
+                raise PriceError(f"package {i}: {exc}") from None
+            if unit not in UNIT_CONVERSIONS:
+                raise PriceError(f"package {i}: no conversion for unit {unit!r}")
+            if not size > 0 or not price >= 0:
+                raise PriceError(f"package {i}: size must be positive and price non-negative")
+
+            dimension, factor = UNIT_CONVERSIONS[unit]
+            label = str(package.get("label") or f"{size:g} {unit}")
+            self.packages.setdefault((name, dimension), []).append((label, size * factor, price))
+        self._tables = {}
+
+    def __contains__(self, key):
+        return key in self.packages
+
+    def table(self, key):
+        """The ``PackageTable`` for an ``(ingredient, dimension)`` key, or ``None`` if it isn't sold."""
+        if key not in self.packages:
+            return None
+        table = self._tables.get(key)
+        if table is None:
+            labels, sizes, prices = zip(*self.packages[key])
+            table = self._tables[key] = PackageTable(labels, sizes, prices)
+        return table
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            if str(path).endswith(".json"):
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            else:
+                with open(path, "rb") as f:
+                    data = tomllib.load(f)
+        except (OSError, ValueError) as exc:
+            raise PriceError(f"{path}: {exc}") from None
+        version = data.get("version", FORMAT_VERSION)
+        if version != FORMAT_VERSION:
+            raise PriceError(f"{path}: unsupported format version {version!r}")
+        return cls(data.get("packages", []))
+
+
+@lru_cache(maxsize=2)
+def _load_prices(path, stamp):
+    return PriceCatalog.from_file(path)
+
+
+def default_prices():
+    """Prices from ``$DIMEAL_PRICES`` (or the bundled example), reloaded when the file changes."""
+    path = os.environ.get("DIMEAL_PRICES") or DEFAULT_PRICES
+    stat = os.stat(path)
+    return _load_prices(path, (stat.st_mtime_ns, stat.st_size))
+
+
+# -------------------------------------------------------------------
+# Optimization
+# -------------------------------------------------------------------
+class PurchasePlan:
+    """Cheapest packages for each row of a (rows x ingredients) requirement matrix.
+
+    Rows are whatever the caller planned (one shopping trip, each week of a
+    rotation, ...); ``cost`` is the total per row.
+    """
+
+    def __init__(self, keys, needed, baskets, cost):
+        self.keys = keys
+        self.needed = needed
+        self.baskets = baskets  # ingredient -> (table, counts (rows x packages), cost (rows))
+        self.cost = cost
+
+    def __len__(self):
+        return self.needed.shape[0]
+
+    def rows(self, row=0):
+        """``(ingredient, needed, unit, [(label, count), ...], bought, bought unit, cost)`` per ingredient.
+
+        Ingredients missing from the price catalog have no packages and no cost.
+        """
+        rows = []
+        for i in np.flatnonzero(self.needed[row] > 0):
+            name, dimension = self.keys[i]
+            needed, unit = display_amount(float(self.needed[row, i]), dimension)
+            basket = self.baskets.get(i)
+            if basket is None:
+                rows.append((name, needed, unit, [], None, None, None))
+                continue
+            table, counts, cost = basket
+            picks = [(label, int(n)) for label, n in zip(table.labels, counts[row]) if n]
+            bought, bought_unit = display_amount(float(counts[row] @ table.sizes), dimension)
+            rows.append((name, needed, unit, picks, bought, bought_unit, float(cost[row])))
+        return rows
+
+
+def optimize_requirements(requirements, keys, prices):
+    """Solve every ingredient column of ``requirements`` (base units) against ``prices``.
+
+    Each ingredient is solved for all rows at once with its precomputed
+    table, so the cost grows with the number of ingredients, not rows.
+    """
+    needed = np.atleast_2d(np.asarray(requirements, dtype=np.float64))
+    baskets = {}
+    cost = np.zeros(needed.shape[0], dtype=np.float64)
+    for i, key in enumerate(keys):
+        table = prices.table(key)
+        if table is None or not (needed[:, i] > 0).any():
+            continue
+        counts, ingredient_cost = table.solve(needed[:, i])
+        baskets[i] = (table, counts, ingredient_cost)
+        cost += ingredient_cost
+    return PurchasePlan(list(keys), needed, baskets, cost)
+
+
+def optimize_purchases(plan, prices=None, index=None):
+    """Cheapest packages for a ``(recipe_name, total_daily_oz, days)`` plan, as one trip."""
+    if prices is None:
+        prices = default_prices()
+    if index is None:
+        index = default_index()
+    totals, _ = index.aggregate(scale_batch(plan, index.book))
+    return optimize_requirements(totals, index.keys, prices)
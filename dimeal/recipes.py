@@ -0,0 +1,13 @@
+"""Recipe data as a plain mapping: ``{name: {base_daily_oz, ..., ingredients}}``.
+
+The recipes live in versioned data files (``dimeal/data/recipes`` unless
+``$DIMEAL_RECIPES`` points elsewhere); see ``dimeal.catalog``.
+"""
+from dimeal.catalog import CatalogMapping
+
+# -------------------------------------------------------------------
+# Recipe Data
+# -------------------------------------------------------------------
+# Live view of the default catalog: lookups load recipes on first use and
+# pick up edited files without a restart.
+RECIPE_DATA = CatalogMapping()
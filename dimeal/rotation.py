@@ -0,0 +1,134 @@
+"""Multi-week rotation plans: which recipe each dog eats each week, and what to buy.
+
+``ShoppingIndex.matrix`` holds, for every (ingredient, recipe) pair, the
+base-unit amount needed per oz/day fed for one day. A plan is reduced to a
+(weeks x recipes) matrix of oz-days fed and multiplied by it once, so a
+year for a whole kennel is a single matrix product.
+"""
+import numpy as np
+
+from dimeal.shopping import default_index, display_amount
+
+DAYS_PER_WEEK = 7
+
+
+class Rotation:
+    """Cycle through ``recipes``, ``weeks_per_recipe`` weeks each.
+
+    ``stagger`` starts each dog one step further along the cycle, so a
+    kennel cooks several smaller batches every week instead of one recipe
+    for everybody. ``avoid`` maps a dog to recipes it must not be fed; that
+    dog cycles through the rest in the same order.
+    """
+
+    def __init__(self, recipes, weeks_per_recipe=1, stagger=False, avoid=None):
+        self.recipes = tuple(recipes)
+        if not self.recipes:
+            raise ValueError("A rotation needs at least one recipe")
+        if int(weeks_per_recipe) < 1:
+            raise ValueError("weeks_per_recipe must be at least 1")
+        self.weeks_per_recipe = int(weeks_per_recipe)
+        self.stagger = bool(stagger)
+        self.avoid = {dog: frozenset(names) for dog, names in (avoid or {}).items()}
+
+    def schedule(self, dogs, weeks, book):
+        """(dogs x weeks) matrix of ``book`` recipe indices; -1 where a dog has nothing it may eat."""
+        cycle = book.recipe_indices(self.recipes)
+        cycles = np.tile(cycle, (len(dogs), 1))
+        lengths = np.full(len(dogs), len(cycle), dtype=np.intp)
+
+        row = {dog: d for d, dog in enumerate(dogs)}
+        for dog, avoid in self.avoid.items():
+            d = row.get(dog)
+            if d is None:
+                continue
+            allowed = [r for r, name in zip(cycle, self.recipes) if name not in avoid]
+            cycles[d, : len(allowed)] = allowed
+            lengths[d] = len(allowed)
+
+        step = np.arange(weeks, dtype=np.intp) // self.weeks_per_recipe
+        offset = np.arange(len(dogs), dtype=np.intp) if self.stagger else np.zeros(len(dogs), dtype=np.intp)
+        position = (step[None, :] + offset[:, None]) % np.maximum(lengths, 1)[:, None]
+        schedule = np.take_along_axis(cycles, position, axis=1)
+        schedule[lengths == 0] = -1
+        return schedule
+
+
+class RotationPlan:
+    """Result of ``plan_rotation``.
+
+    ``oz_days`` is (weeks x recipes) and ``requirements`` is
+    (weeks x ingredients) in base units, aligned with ``index.keys``.
+    """
+
+    def __init__(self, index, dogs, schedule, oz_days, requirements):
+        self.index = index
+        self.book = index.book
+        self.dogs = dogs
+        self.schedule = schedule
+        self.oz_days = oz_days
+        self.requirements = requirements
+
+    @property
+    def weeks(self):
+        return self.oz_days.shape[0]
+
+    def recipe_for(self, dog, week):
+        r = self.schedule[self.dogs.index(dog), week]
+        return self.book.names[r] if r >= 0 else None
+
+    def batches(self, week):
+        """``(recipe_name, total_daily_oz, days)`` requests to cook for ``week``."""
+        return [
+            (self.book.names[r], self.oz_days[week, r] / DAYS_PER_WEEK, DAYS_PER_WEEK)
+            for r in np.flatnonzero(self.oz_days[week] > 0)
+        ]
+
+    def shopping_list(self, week=None):
+        """Rows of ``(ingredient, amount, unit, recipes)`` for one week, or the whole plan."""
+        if week is None:
+            totals = self.requirements.sum(axis=0)
+            fed = self.oz_days.sum(axis=0) > 0
+        else:
+            totals = self.requirements[week]
+            fed = self.oz_days[week] > 0
+        used_by = (self.index.matrix > 0) & fed[None, :]
+
+        rows = []
+        for i in np.flatnonzero(totals > 0):
+            name, dimension = self.index.keys[i]
+            amount, unit = display_amount(float(totals[i]), dimension)
+            recipes = tuple(self.book.names[r] for r in np.flatnonzero(used_by[i]))
+            rows.append((name, amount, unit, recipes))
+        return rows
+
+
+def plan_rotation(profiles, weeks, rotation, dogs=None, index=None):
+    """Plan ``weeks`` of ``rotation`` for ``dogs`` (all dogs in ``profiles`` when ``None``).
+
+    Each dog eats its ``ProfileStore`` portion of whichever recipe it is on
+    that week.
+    """
+    if index is None:
+        index = default_index()
+    book = index.book
+    dogs = list(profiles.dogs if dogs is None else [dog for dog in dogs if dog in profiles])
+    schedule = rotation.schedule(dogs, weeks, book)
+
+    # Each dog's oz/day, re-ordered into the book's recipe columns
+    src = [j for j, name in enumerate(profiles.recipe_names) if name in book.index]
+    dst = [book.index[profiles.recipe_names[j]] for j in src]
+    portions = np.zeros((len(dogs), len(book)), dtype=np.float64)
+    portions[:, dst] = profiles.portions[np.ix_([profiles.index[dog] for dog in dogs], src)]
+
+    fed = schedule >= 0
+    dog_idx, week_idx = np.nonzero(fed)
+    recipe_idx = schedule[fed]
+    oz_days = np.bincount(
+        week_idx * len(book) + recipe_idx,
+        weights=portions[dog_idx, recipe_idx] * DAYS_PER_WEEK,
+        minlength=weeks * len(book),
+    ).reshape(weeks, len(book))
+
+    requirements = oz_days @ index.matrix.T
+    return RotationPlan(index, dogs, schedule, oz_days, requirements)
@@ -0,0 +1,247 @@
+"""Local JSON HTTP API over the recipe model, as a plain ASGI app.
+
+Routes:
+    GET  /recipes                  the recipe catalog
+    GET  /recipes?ingredient=      names of the recipes that use an ingredient
+    GET  /scale?recipe=&total_daily_oz=&days=
+    POST /scale                    {"recipe", "total_daily_oz", "days"} or {"requests": [...]}
+    POST /shopping-list            {"plan": [{"recipe", "total_daily_oz", "days"}, ...]}
+    GET  /stats                    scale cache counters
+
+Scale requests that arrive in the same event-loop tick are computed
+together in one ``scale_batch`` call, and JSON-encoded results are kept in
+a bounded LRU cache keyed on ``(recipe, total_daily_oz, days)``. The cache
+and the ``/recipes`` body are dropped whenever the recipe catalog changes.
+
+Run with ``python -m dimeal serve`` (needs ``uvicorn``, listed in
+``requirements.txt``).
+"""
+import asyncio
+import json
+import math
+from urllib.parse import parse_qsl
+
+from dimeal.cache import LRUCache
+from dimeal.catalog import default_catalog
+from dimeal.engine import scale_batch
+from dimeal.recipes import RECIPE_DATA
+from dimeal.shopping import shopping_list
+
+MAX_BODY_BYTES = 1 << 20
+
+
+class RequestError(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Cache & Batching
+# -------------------------------------------------------------------
+def scale_result(batch, i):
+    return {
+        "recipe": batch.recipe_name(i),
+        "total_daily_oz": float(batch.total_daily_oz[i]),
+        "days": float(batch.days[i]),
+        "scale_factor": float(batch.scale_factor[i]),
+        "ingredients": [
+            {"name": name, "unit": unit, "per_day": per_day, "total": total}
+            for name, unit, per_day, total in batch.ingredients(i)
+        ],
+    }
+
+
+class ScaleBatcher:
+    """Coalesces concurrent scale lookups into one vectorized call per tick.
+
+    Results are JSON-encoded bytes so cache hits skip serialization.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.pending = {}
+        self.scheduled = False
+
+    async def scale(self, key):
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        future = self.pending.get(key)
+        if future is None:
+            future = self.pending[key] = asyncio.get_running_loop().create_future()
+            if not self.scheduled:
+                self.scheduled = True
+                asyncio.get_running_loop().call_soon(self.flush)
+        return await future
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        self.scheduled = False
+
+        keys = list(pending)
+        try:
+            batch = scale_batch(keys)
+        except Exception as exc:
+            for future in pending.values():
+                future.set_exception(exc)
+            return
+
+        for i, key in enumerate(keys):
+            result = json.dumps(scale_result(batch, i)).encode()
+            self.cache.put(key, result)
+            pending[key].set_result(result)
+
+
+# -------------------------------------------------------------------
+# Request parsing
+# -------------------------------------------------------------------
+def scale_key(item):
+    """Validate one scale request into a ``(recipe, total_daily_oz, days)`` key."""
+    if not isinstance(item, dict):
+        raise RequestError("expected a JSON object per request")
+    try:
+        recipe = item["recipe"]
+        total_daily_oz = float(item["total_daily_oz"])
+        days = float(item["days"])
+    except KeyError as exc:
+        raise RequestError(f"missing field {exc.args[0]!r}") from None
+    except (TypeError, ValueError) as exc:
+        raise RequestError(str(exc)) from None
+    if not isinstance(recipe, str):
+        raise RequestError("recipe must be a string")
+    if recipe not in default_catalog():
+        raise RequestError(f"unknown recipe {recipe!r}")
+    if not (math.isfinite(total_daily_oz) and math.isfinite(days)) or total_daily_oz <= 0 or days <= 0:
+        raise RequestError("total_daily_oz and days must be positive numbers")
+    return recipe, total_daily_oz, days
+
+
+def scale_keys(payload, field):
+    """Keys for every request in ``payload[field]``, which must be a list of objects."""
+    items = payload.get(field, [])
+    if not isinstance(items, list):
+        raise RequestError(f"{field} must be a list of objects")
+    return [scale_key(item) for item in items]
+
+
+def recipes_payload():
+    return {
+        name: {
+            "base_daily_oz": recipe["base_daily_oz"],
+            "base_days": recipe["base_days"],
+            "ingredients": [dict(ingredient) for ingredient in recipe["ingredients"]],
+        }
+        for name, recipe in RECIPE_DATA.items()
+    }
+
+
+# -------------------------------------------------------------------
+# ASGI app
+# -------------------------------------------------------------------
+class ScaleService:
+    def __init__(self, cache_size=65536):
+        self.cache = LRUCache(cache_size)
+        self.batcher = None
+        self.generation = None
+        self.recipes_body = None
+
+    def _sync_catalog(self):
+        generation = default_catalog().generation
+        if generation != self.generation:
+            self.cache.clear()
+            self.recipes_body = json.dumps(recipes_payload()).encode()
+            self.generation = generation
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if self.batcher is None:
+            self.batcher = ScaleBatcher(self.cache)
+        self._sync_catalog()
+
+        try:
+            status, body = await self._route(scope, receive)
+        except RequestError as exc:
+            status, body = 400, json.dumps({"error": str(exc)}).encode()
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _route(self, scope, receive):
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+
+        if path == "/recipes" and method == "GET":
+            query = dict(parse_qsl(scope.get("query_string", b"").decode()))
+            if "ingredient" in query:
+                names = default_catalog().recipes_with(query["ingredient"])
+                return 200, json.dumps({"recipes": list(names)}).encode()
+            return 200, self.recipes_body
+        if path == "/stats" and method == "GET":
+            return 200, json.dumps(self.cache.stats()).encode()
+
+        if path == "/scale" and method == "GET":
+            query = dict(parse_qsl(scope.get("query_string", b"").decode()))
+            return 200, await self.batcher.scale(scale_key(query))
+        if path == "/scale" and method == "POST":
+            payload = await read_json(receive)
+            if "requests" in payload:
+                keys = scale_keys(payload, "requests")
+                results = await asyncio.gather(*(self.batcher.scale(key) for key in keys))
+                return 200, b'{"results": [' + b", ".join(results) + b"]}"
+            return 200, await self.batcher.scale(scale_key(payload))
+
+        if path == "/shopping-list" and method == "POST":
+            payload = await read_json(receive)
+            plan = scale_keys(payload, "plan")
+            rows = [
+                {"ingredient": name, "amount": amount, "unit": unit, "recipes": list(recipes)}
+                for name, amount, unit, recipes in shopping_list(plan)
+            ]
+            return 200, json.dumps({"items": rows}).encode()
+
+        if path in ("/recipes", "/stats", "/scale", "/shopping-list"):
+            return 405, json.dumps({"error": "method not allowed"}).encode()
+        return 404, json.dumps({"error": "not found"}).encode()
+
+
+async def read_json(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise RequestError("request body too large")
+        if not message.get("more_body"):
+            break
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        raise RequestError("invalid JSON body") from None
+    if not isinstance(payload, dict):
+        raise RequestError("expected a JSON object")
+    return payload
+
+
+app = ScaleService()
+
+
+def serve(host="127.0.0.1", port=8600, cache_size=65536):
+    import uvicorn
+
+    uvicorn.run(ScaleService(cache_size), host=host, port=port, log_level="warning", access_log=False)
@@ -0,0 +1,164 @@
+"""Printable prep sheets: one HTML page per (household, recipe) plan.
+
+Sheets are rendered one at a time from scaled chunks and handed to a
+writer straight away, so memory stays flat however many are produced.
+Writers put each sheet in its own file in a directory, in a zip archive
+(which can be streamed to stdout or a download), or one after another in a
+single HTML "book" with a page break between sheets. Print any of them
+from a browser, or "Save as PDF".
+"""
+import html
+import os
+import re
+import zipfile
+
+# Prep Guide steps, shared with the app's checklist widgets
+PREP_CHECKLIST = (
+    ("ch_shop", "🛒 1. Shop for ingredients (proteins, veggies, starch, oils, nutrients)"),
+    ("ch_cook", "🍗 2. Weigh & cook protein (e.g. Ground Turkey, Chicken Thighs)"),
+    ("ch_carbs", "🍚 3. Steam/boil carbohydrates (Rice, Sweet Potatoes, or Pasta)"),
+    ("ch_veggies", "🥦 4. Puree or steam vegetables (Carrots, Broccoli, Zucchini, etc.)"),
+    ("ch_mix", "🥣 5. Mix all cooked ingredients, oils, and nutrients thoroughly in a large bowl"),
+    ("ch_freeze", "📦 6. Portion out daily/weekly amounts into containers and freeze"),
+)
+
+SHEET_CSS = """
+body { font-family: system-ui, sans-serif; color: #222; margin: 0; }
+.sheet { padding: 24px 32px; page-break-after: always; break-after: page; }
+.sheet:last-child { page-break-after: auto; break-after: auto; }
+h1 { font-size: 20px; margin: 0 0 4px; }
+.meta { color: #555; margin: 0 0 16px; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 16px; }
+th, td { border: 1px solid #bbb; padding: 4px 8px; text-align: left; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+ul.checklist { list-style: none; padding: 0; }
+ul.checklist li::before { content: "\\2610  "; }
+@media print { .sheet { padding: 0; } }
+"""
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "-", str(text)).strip("-")[:40] or "plan"
+
+
+def render_sheet(household, recipe, days, total_daily_oz, scale_factor, ingredients):
+    """One ``<section>`` for a plan; ``ingredients`` yields ``(name, unit, per_day, total)``."""
+    esc = html.escape
+    title = f"{esc(household)} – {esc(recipe)}" if household else esc(recipe)
+    rows = "".join(
+        f"<tr><td>{esc(name)}</td><td class='num'>{per_day:.3f} {esc(unit)}</td>"
+        f"<td class='num'>{total:.2f} {esc(unit)}</td></tr>"
+        for name, unit, per_day, total in ingredients
+    )
+    steps = "".join(f"<li>{esc(label)}</li>" for _, label in PREP_CHECKLIST)
+    return (
+        f"<section class='sheet'><h1>{title}</h1>"
+        f"<p class='meta'>{days:g} days · {total_daily_oz:.1f} oz/day · scale ×{scale_factor:.3f}</p>"
+        f"<table><thead><tr><th>Ingredient</th><th>Per day</th><th>Total for {days:g} days</th></tr></thead>"
+        f"<tbody>{rows}</tbody></table>"
+        f"<h2>Prep checklist</h2><ul class='checklist'>{steps}</ul></section>"
+    )
+
+
+def document(sections, title="DIMeal prep sheets"):
+    """Wrap rendered sections in a standalone HTML page."""
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        f"<style>{SHEET_CSS}</style></head><body>{''.join(sections)}</body></html>"
+    )
+
+
+def batch_sheets(batch, households=None):
+    """Yield ``(name, section)`` for each request in a ``ScaledBatch``."""
+    for i in range(len(batch)):
+        household = households[i] if households is not None else ""
+        recipe = batch.recipe_name(i)
+        section = render_sheet(
+            household, recipe, float(batch.days[i]), float(batch.total_daily_oz[i]),
+            float(batch.scale_factor[i]), batch.ingredients(i),
+        )
+        yield f"{_slug(household)}-{_slug(recipe)}" if household else _slug(recipe), section
+
+
+def plan_document(plan, title="DIMeal prep sheets"):
+    """One printable document for ``(recipe_name, total_daily_oz, days)`` plan items."""
+    from dimeal.engine import scale_batch
+
+    return document([section for _, section in batch_sheets(scale_batch(plan))], title)
+
+
+def chunk_sheets(chunk):
+    """``[(name, section), ...]`` for one long-format chunk from ``cli.scale_chunk``."""
+    sheets = []
+    n = len(chunk["plan"])
+    start = 0
+    while start < n:
+        plan = chunk["plan"][start]
+        end = start
+        while end < n and chunk["plan"][end] == plan:
+            end += 1
+        ingredients = (
+            (chunk["ingredient"][i], chunk["unit"][i], float(chunk["per_day"][i]), float(chunk["total"][i]))
+            for i in range(start, end)
+        )
+        household, recipe = chunk["household"][start], chunk["recipe"][start]
+        section = render_sheet(
+            household, recipe, float(chunk["days"][start]), float(chunk["total_daily_oz"][start]),
+            float(chunk["scale_factor"][start]), ingredients,
+        )
+        sheets.append((f"{_slug(household)}-{_slug(recipe)}", section))
+        start = end
+    return sheets
+
+
+# -------------------------------------------------------------------
+# Writers
+# -------------------------------------------------------------------
+class SheetDirectoryWriter:
+    """One standalone HTML file per sheet."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, name, section):
+        self.count += 1
+        with open(os.path.join(self.path, f"{self.count:06d}-{name}.html"), "w", encoding="utf-8") as f:
+            f.write(document([section], name))
+
+    def close(self):
+        pass
+
+
+class SheetZipWriter:
+    """One HTML file per sheet in a zip archive; ``sink`` may be a path or an unseekable stream."""
+
+    def __init__(self, sink):
+        self.zip = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+        self.count = 0
+
+    def write(self, name, section):
+        self.count += 1
+        self.zip.writestr(f"{self.count:06d}-{name}.html", document([section], name))
+
+    def close(self):
+        self.zip.close()
+
+
+class SheetBookWriter:
+    """All sheets in one HTML document, one printed page (or more) each."""
+
+    def __init__(self, stream, title="DIMeal prep sheets"):
+        self.stream = stream
+        self.count = 0
+        head, self.tail = document(["\0"], title).split("\0")
+        stream.write(head)
+
+    def write(self, name, section):
+        self.count += 1
+        self.stream.write(section)
+
+    def close(self):
+        self.stream.write(self.tail)
+
@@ -0,0 +1,130 @@
+"""Consolidated shopping lists across several scaled recipes.
+
+Every ingredient slot in the compiled ``RecipeBook`` is mapped once to a
+canonical ingredient and a factor into that ingredient's base unit (oz for
+weights, tsp for volumes). Aggregating any plan is then a weighted
+``np.bincount`` over the scaled totals.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from dimeal.engine import default_book, scale_batch
+
+# Ingredients that are the same purchase under a different recipe label
+CANONICAL_NAMES = {
+    "Sweet Potatoes (with skin)": "Sweet Potatoes",
+    "Russet Potatoes (with skin)": "Russet Potatoes",
+}
+
+# unit -> (dimension, factor into the dimension's base unit)
+UNIT_CONVERSIONS = {
+    "oz": ("weight", 1.0),
+    "lbs": ("weight", 16.0),
+    "lb": ("weight", 16.0),
+    "tsp": ("volume", 1.0),
+    "tbsp": ("volume", 3.0),
+}
+
+# Base units are displayed in the larger unit once they reach one of it
+DISPLAY_UNITS = {
+    "weight": (("lbs", 16.0), ("oz", 1.0)),
+    "volume": (("tbsp", 3.0), ("tsp", 1.0)),
+}
+
+
+def canonical_name(name):
+    return CANONICAL_NAMES.get(name, name)
+
+
+def display_amount(amount, dimension):
+    """Convert a base-unit amount to ``(value, unit)`` for display."""
+    for unit, factor in DISPLAY_UNITS[dimension]:
+        if amount >= factor:
+            return amount / factor, unit
+    return amount, DISPLAY_UNITS[dimension][-1][0]
+
+
+class ShoppingIndex:
+    """Precomputed slot -> canonical ingredient mapping for a ``RecipeBook``.
+
+    Ingredients are keyed on ``(canonical name, dimension)``; an item bought
+    by both weight and volume (e.g. Sunflower Oil) gets one entry per
+    dimension since the two cannot be added without a density.
+    """
+
+    def __init__(self, book):
+        self.book = book
+        self.keys = []
+        key_index = {}
+
+        shape = book.amounts.shape
+        self.slot_ingredient = np.full(shape, -1, dtype=np.intp)
+        self.slot_factor = np.zeros(shape, dtype=np.float64)
+
+        for r, (names, units) in enumerate(zip(book.ingredient_names, book.units)):
+            for k, (name, unit) in enumerate(zip(names, units)):
+                try:
+                    dimension, factor = UNIT_CONVERSIONS[unit]
+                except KeyError:
+                    raise ValueError(f"No conversion for unit {unit!r} ({name} in {book.names[r]})") from None
+                key = (canonical_name(name), dimension)
+                if key not in key_index:
+                    key_index[key] = len(self.keys)
+                    self.keys.append(key)
+                self.slot_ingredient[r, k] = key_index[key]
+                self.slot_factor[r, k] = factor
+
+        # Dense (ingredients x recipes) matrix: base units of each ingredient
+        # per oz/day fed for one day, so (oz-days fed per recipe) @ matrix.T
+        # is a shopping list
+        valid = self.slot_ingredient >= 0
+        per_oz_day = book.amounts * self.slot_factor / (book.base_daily_oz * book.base_days)[:, None]
+        self.matrix = np.zeros((len(self.keys), len(book)), dtype=np.float64)
+        np.add.at(self.matrix, (self.slot_ingredient[valid], np.nonzero(valid)[0]), per_oz_day[valid])
+
+    def aggregate(self, batch):
+        """Sum a ``ScaledBatch`` into base-unit totals per canonical ingredient.
+
+        Returns ``(totals, used_by)`` where ``used_by`` is a (ingredients x
+        recipes) boolean matrix of which recipes contributed.
+        """
+        slot_ingredient = self.slot_ingredient[batch.recipe_idx]
+        valid = slot_ingredient >= 0
+        ingredient_ids = slot_ingredient[valid]
+
+        amounts = (batch.totals * self.slot_factor[batch.recipe_idx])[valid]
+        totals = np.bincount(ingredient_ids, weights=amounts, minlength=len(self.keys))
+
+        used_by = np.zeros((len(self.keys), len(self.book)), dtype=bool)
+        recipe_ids = np.broadcast_to(batch.recipe_idx[:, None], slot_ingredient.shape)[valid]
+        used_by[ingredient_ids, recipe_ids] = True
+        return totals, used_by
+
+    def shopping_list(self, batch):
+        """Rows of ``(ingredient, amount, unit, recipes)`` in first-seen order."""
+        totals, used_by = self.aggregate(batch)
+        rows = []
+        for i in np.flatnonzero(totals > 0):
+            name, dimension = self.keys[i]
+            amount, unit = display_amount(float(totals[i]), dimension)
+            recipes = tuple(self.book.names[r] for r in np.flatnonzero(used_by[i]))
+            rows.append((name, amount, unit, recipes))
+        return rows
+
+
+@lru_cache(maxsize=4)
+def index_for(book):
+    return ShoppingIndex(book)
+
+
+def default_index():
+    """Index over the default catalog's book; rebuilt when the catalog changes."""
+    return index_for(default_book())
+
+
+def shopping_list(plan, index=None):
+    """Consolidated list for ``(recipe_name, total_daily_oz, days)`` plan items."""
+    if index is None:
+        index = default_index()
+    return index.shopping_list(scale_batch(plan, index.book))
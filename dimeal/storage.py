@@ -0,0 +1,348 @@
+"""SQLite persistence for dog profiles, plans, checklist state and the freezer ledger.
+
+One ``StateStore`` is meant to be shared by every session in a process
+(the app keeps it in ``st.cache_resource``). Reads are served from an
+in-process cache; writes are queued to a single background writer thread so
+saving never blocks a rerun. The database runs in WAL mode, so several
+server processes can share one file: each store notices commits from other
+processes through ``PRAGMA data_version`` and drops its cache.
+
+The freezer ledger is append-only. A trigger adds every entry to its
+recipe's row in ``freezer_stock`` as it is inserted, so stock is read
+without summing the history. Once ``FREEZER_COMPACT_EVERY`` entries are
+older than ``FREEZER_KEEP_DAYS``, they are folded into one carried-forward
+entry per recipe. The count is read from the ledger itself, so restarts
+do not put compaction off.
+"""
+import datetime
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+from dimeal.profiles import ProfileStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    dog     TEXT NOT NULL,
+    recipe  TEXT NOT NULL,
+    oz      REAL NOT NULL,
+    PRIMARY KEY (dog, recipe)
+);
+CREATE TABLE IF NOT EXISTS state (
+    scope   TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    value   TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE TABLE IF NOT EXISTS freezer_ledger (
+    id      INTEGER PRIMARY KEY,
+    day     TEXT NOT NULL,          -- ISO date
+    kind    TEXT NOT NULL,          -- 'cooked', 'eaten' or 'carried'
+    recipe  TEXT NOT NULL,
+    dog     TEXT,                   -- 'eaten' only
+    oz      REAL NOT NULL,          -- change in stock: + cooked, - eaten
+    scale   REAL                    -- 'cooked' only
+);
+CREATE INDEX IF NOT EXISTS freezer_ledger_day ON freezer_ledger (day);
+CREATE TABLE IF NOT EXISTS freezer_stock (
+    recipe      TEXT PRIMARY KEY,
+    on_hand     REAL NOT NULL,
+    last_cooked TEXT
+);
+-- Carried-forward entries stand for history already counted in the stock
+CREATE TRIGGER IF NOT EXISTS freezer_stock_add AFTER INSERT ON freezer_ledger
+WHEN NEW.kind != 'carried'
+BEGIN
+    INSERT INTO freezer_stock (recipe, on_hand, last_cooked)
+    VALUES (NEW.recipe, NEW.oz, CASE WHEN NEW.kind = 'cooked' THEN NEW.day END)
+    ON CONFLICT (recipe) DO UPDATE SET
+        on_hand = on_hand + excluded.on_hand,
+        last_cooked = max(coalesce(last_cooked, ''), coalesce(excluded.last_cooked, ''));
+END;
+"""
+
+FREEZER_KEEP_DAYS = 365
+FREEZER_COMPACT_EVERY = 1000
+
+# Times a queued transaction is tried while another process holds the lock
+WRITE_ATTEMPTS = 5
+
+_STOP = object()
+
+log = logging.getLogger(__name__)
+
+
+class StateStore:
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = str(path)
+        self.busy_timeout = busy_timeout
+
+        # One shared read connection guarded by the cache lock (reads are
+        # mostly cache hits); the writer thread owns its own connection.
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._data_version = None
+        self._shared_profiles = None  # (saved rows, recipe names, frozen ProfileStore)
+        self._compacted_before = None  # cutoff of the last compaction this store queued
+
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="dimeal-state-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---------------------------------------------------------------
+    # Read cache
+    # ---------------------------------------------------------------
+    def _cached(self, name, load):
+        conn = self._conn
+        with self._lock:
+            # data_version moves when another connection commits. Queued local
+            # writes are already reflected in the cache, so only drop it once
+            # they have landed.
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version and self._queue.unfinished_tasks == 0:
+                self._cache.clear()
+                self._data_version = version
+            if name not in self._cache:
+                self._cache[name] = load(conn)
+            return self._cache[name]
+
+    @staticmethod
+    def _load_scope(conn, scope):
+        rows = conn.execute("SELECT key, value FROM state WHERE scope = ?", (scope,))
+        return {key: json.loads(value) for key, value in rows}
+
+    def get_scope(self, scope):
+        """All ``key -> value`` pairs stored under ``scope``."""
+        return self._cached(("state", scope), lambda conn: self._load_scope(conn, scope))
+
+    def get(self, scope, key, default=None):
+        return self.get_scope(scope).get(key, default)
+
+    def _profile_rows(self):
+        def load(conn):
+            return conn.execute("SELECT dog, recipe, oz FROM profiles ORDER BY rowid").fetchall()
+
+        return self._cached(("profiles",), load)
+
+    def load_profiles(self, recipe_names):
+        """The saved ``ProfileStore``, or ``None`` if nothing has been saved yet."""
+        return self._build_profiles(self._profile_rows(), recipe_names)
+
+    def shared_profiles(self, recipe_data):
+        """One read-only ``ProfileStore`` for every caller, aligned with ``recipe_data``.
+
+        Falls back to the recipes' calibrated portions when nothing has been
+        saved, and a recipe added since the last save starts at them too.
+        Rebuilt only when the saved profiles or the recipes change; edit a
+        ``copy()`` and pass it to ``save_profiles``.
+        """
+        names = tuple(recipe_data.keys())
+        rows = self._profile_rows()
+        shared = self._shared_profiles
+        if shared is not None and shared[0] is rows and shared[1] == names:
+            return shared[2]
+
+        profiles = self._build_profiles(rows, dict.fromkeys(recipe for _, recipe, _ in rows))
+        if profiles is None:
+            profiles = ProfileStore.from_recipe_defaults(recipe_data)
+        else:
+            profiles.align(recipe_data)
+        profiles.freeze()
+        self._shared_profiles = (rows, names, profiles)
+        return profiles
+
+    def freezer_stock(self):
+        """``{recipe: (on_hand_oz, last_cooked)}``, read from the running totals."""
+        def load(conn):
+            rows = conn.execute("SELECT recipe, on_hand, last_cooked FROM freezer_stock ORDER BY recipe")
+            return {recipe: (on_hand, last_cooked or None) for recipe, on_hand, last_cooked in rows}
+
+        return self._cached(("freezer",), load)
+
+    def freezer_ledger(self, limit=20):
+        """The latest ``limit`` entries, newest first, as ``(day, kind, recipe, dog, oz, scale)``."""
+        def load(conn):
+            return conn.execute(
+                "SELECT day, kind, recipe, dog, oz, scale FROM freezer_ledger ORDER BY day DESC, id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+        return self._cached(("freezer_ledger", limit), load)
+
+    @staticmethod
+    def _build_profiles(rows, recipe_names):
+        if not rows:
+            return None
+
+        records = {}
+        for dog, recipe, oz in rows:
+            records.setdefault(dog, {"Dog": dog})[recipe] = oz
+        return ProfileStore.from_records(records.values(), recipe_names)
+
+    # ---------------------------------------------------------------
+    # Queued writes
+    # ---------------------------------------------------------------
+    # Each queued item is a tuple of ``(sql, params)`` statements that
+    # commit together.
+    def set(self, scope, key, value):
+        encoded = json.dumps(value)
+        with self._lock:
+            # Load the rest of the scope first so the cached copy stays whole
+            if ("state", scope) not in self._cache:
+                self._cache[("state", scope)] = self._load_scope(self._conn, scope)
+            self._cache[("state", scope)][key] = value
+            self._queue.put(((
+                "INSERT INTO state (scope, key, value, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (scope, key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                [(scope, key, encoded, time.time())],
+            ),))
+
+    def save_profiles(self, profiles):
+        rows = [
+            (dog, recipe, oz)
+            for dog, portions in zip(profiles.dogs, profiles.portions.tolist())
+            for recipe, oz in zip(profiles.recipe_names, portions)
+        ]
+        with self._lock:
+            self._cache[("profiles",)] = rows
+            self._queue.put((
+                ("DELETE FROM profiles", [()]),
+                ("INSERT INTO profiles (dog, recipe, oz) VALUES (?, ?, ?)", rows),
+            ))
+
+    def record_batch(self, recipe, oz, scale, day=None):
+        """Append a cooked batch of ``oz`` to the freezer ledger."""
+        self._append_ledger([((day or datetime.date.today()).isoformat(), "cooked", recipe, None, float(oz), float(scale))])
+
+    def record_meals(self, recipe, portions, day=None):
+        """Append what each dog ate of ``recipe``: ``portions`` is ``[(dog, oz), ...]``."""
+        day = (day or datetime.date.today()).isoformat()
+        self._append_ledger([(day, "eaten", recipe, dog, -float(oz), None) for dog, oz in portions if oz])
+
+    def _append_ledger(self, entries):
+        if not entries:
+            return
+        stock = dict(self.freezer_stock())
+        self.freezer_ledger()
+        with self._lock:
+            # Keep the cached totals and latest entries in step with the
+            # queued insert, the same way the trigger updates the table
+            for day, kind, recipe, _, oz, _ in entries:
+                on_hand, last_cooked = stock.get(recipe, (0.0, None))
+                if kind == "cooked":
+                    last_cooked = max(last_cooked or "", day)
+                stock[recipe] = (on_hand + oz, last_cooked)
+            self._cache[("freezer",)] = stock
+            # Newest day first and, within a day, newest entry first; a
+            # back-dated entry goes in among the older days
+            for key in [key for key in self._cache if key[0] == "freezer_ledger"]:
+                latest = sorted(entries[::-1] + self._cache[key], key=lambda entry: entry[0], reverse=True)
+                self._cache[key] = latest[: key[1]]
+
+            self._queue.put(((
+                "INSERT INTO freezer_ledger (day, kind, recipe, dog, oz, scale) VALUES (?, ?, ?, ?, ?, ?)",
+                entries,
+            ),))
+
+            before = (datetime.date.today() - datetime.timedelta(days=FREEZER_KEEP_DAYS)).isoformat()
+            compact = before != self._compacted_before and self._conn.execute(
+                "SELECT count(*) FROM (SELECT 1 FROM freezer_ledger WHERE day < ? LIMIT ?)",
+                (before, FREEZER_COMPACT_EVERY),
+            ).fetchone()[0] >= FREEZER_COMPACT_EVERY
+            if compact:
+                self._compacted_before = before
+        if compact:
+            self.compact_freezer_ledger(datetime.date.fromisoformat(before))
+
+    def compact_freezer_ledger(self, before):
+        """Fold entries dated before ``before`` into one carried-forward entry per recipe.
+
+        Stock is unchanged: the trigger skips carried entries, and deleting
+        entries does not touch the totals.
+        """
+        before = before.isoformat()
+        with self._lock:
+            self._queue.put((
+                (
+                    "INSERT INTO freezer_ledger (day, kind, recipe, oz) "
+                    "SELECT ?, 'carried', recipe, sum(oz) FROM freezer_ledger WHERE day < ? GROUP BY recipe",
+                    [(before, before)],
+                ),
+                ("DELETE FROM freezer_ledger WHERE day < ?", [(before,)]),
+            ))
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            # Group everything already queued into a single transaction
+            batch = [item]
+            stop = False
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._commit(conn, batch)
+            except sqlite3.Error as exc:
+                log.error("Dropped %d queued writes to %s: %s", len(batch), self.path, exc)
+                # Reload from disk on the next read rather than serve writes
+                # that never landed.
+                with self._lock:
+                    self._cache.clear()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                break
+        conn.close()
+
+    def _commit(self, conn, batch):
+        # The connection already waits ``busy_timeout`` for a lock; try again
+        # a few times before giving up on a busy database
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                with conn:
+                    for statements in batch:
+                        for sql, params in statements:
+                            conn.executemany(sql, params)
+                return
+            except sqlite3.OperationalError as exc:
+                code = getattr(exc, "sqlite_errorcode", 0) & 0xFF
+                if code not in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED) or attempt + 1 == WRITE_ATTEMPTS:
+                    raise
+                log.warning("%s is busy, retrying write (%d/%d)", self.path, attempt + 1, WRITE_ATTEMPTS)
+                time.sleep(0.1 * 2 ** attempt)
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._conn.close()
@@ -0,0 +1,106 @@
+"""Opt-in interaction traces for replaying real sessions in load tests.
+
+A trace is a JSON-lines file with one line per widget change a visitor
+made: ``{"session", "t", "key", "value"}``, where ``t`` is seconds since
+the session's first recorded run. The app compares its traced widget
+values with how the previous run left them, so only the visitor's own
+changes are written, not values the script set itself. ``load_traces``
+groups the lines back into one event list per session for
+``benchmarks/load_sessions.py``.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Sessions not seen for this long, or beyond this many, are forgotten
+IDLE_TIMEOUT = 3600.0
+MAX_SESSIONS = 10_000
+
+
+class TraceWriter:
+    """Appends trace lines to ``path``; safe to share across sessions and threads.
+
+    Keeps each session's start time and its last snapshot (see
+    ``snapshot``) so that ``record`` writes only what changed since.
+    Streamlit does not say when a session ends, so a session idle for
+    ``idle_timeout`` seconds, or the least recently seen one beyond
+    ``max_sessions``, is forgotten. If it comes back it is traced afresh
+    under a new id, so its events never mix with the earlier ones.
+    """
+
+    def __init__(self, path, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+        self.path = str(path)
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()   # session -> (trace id, started, last seen, last snapshot), oldest first
+        self._traced = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _take(self, session, now):
+        """Pop ``session``'s entry (or start one) and forget sessions gone idle; hold the lock."""
+        entry = self._sessions.pop(session, None)
+        if entry is None:
+            self._traced += 1
+            entry = (f"{session}.{self._traced}", now, now, None)
+        while self._sessions:
+            _, _, seen, _ = next(iter(self._sessions.values()))
+            if now - seen < self.idle_timeout and len(self._sessions) < self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+        return entry
+
+    def record(self, session, values):
+        """Write the values that changed since the session's last snapshot, then keep ``values``."""
+        now = time.monotonic()
+        with self._lock:
+            trace_id, started, _, last = self._take(session, now)
+            self._sessions[session] = (trace_id, started, now, values)
+            if last is None:
+                return
+            lines = [
+                json.dumps({"session": trace_id, "t": round(now - started, 3), "key": key, "value": value}, default=str)
+                for key, value in changes(last, values)
+            ]
+            if lines:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in lines))
+
+    def settle(self, session, values):
+        """Keep ``values`` as the session's last snapshot without writing anything."""
+        now = time.monotonic()
+        with self._lock:
+            trace_id, started, _, _ = self._take(session, now)
+            self._sessions[session] = (trace_id, started, now, values)
+
+
+def snapshot(values):
+    """A comparable copy of ``{key: value}``: each value JSON-encoded."""
+    return {key: json.dumps(value, sort_keys=True, default=str) for key, value in values.items()}
+
+
+def changes(before, after):
+    """``(key, value)`` for every key of snapshot ``before`` whose value differs in ``after``."""
+    return [
+        (key, json.loads(encoded))
+        for key, encoded in after.items()
+        if key in before and before[key] != encoded
+    ]
+
+
+def load_traces(path):
+    """``[[(t, key, value), ...], ...]``: each recorded session's events in time order."""
+    sessions = {}
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+                sessions.setdefault(event["session"], []).append((float(event["t"]), str(event["key"]), event["value"]))
+            except (ValueError, KeyError, TypeError) as exc:
+                raise ValueError(f"{path}:{number}: not a trace event ({exc})") from None
+    return [sorted(events, key=lambda event: event[0]) for events in sessions.values()]
@@ -1,112 +1,428 @@
+import atexit
+import contextlib
+import datetime
+import functools
+import math
+import os
+import re
+import threading
+import time
+import uuid
+
 import streamlit as st
-import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from dimeal import RECIPE_DATA, profiling, scale_recipe, shopping_list, traces
+from dimeal.cache import LRUCache
+from dimeal.catalog import default_catalog
+from dimeal.history import PlanHistory, PlanHistoryWriter
+from dimeal.inventory import forecast
+from dimeal.nutrition import ACTIVITY_FACTORS, NutrientError, daily_calories, default_nutrient_profile
+from dimeal.offline import DEFAULT_MAX_DAYS, DEFAULT_MAX_OZ, DEFAULT_OZ_STEP, offline_page
+from dimeal.packing import DEFAULT_CONTAINERS, DEFAULT_MEALS_PER_DAY, PackingError, dog_meals, pack_meals
+from dimeal.pantry import PantryError, best_split, group_daily_oz, pantry_limits
+from dimeal.profiles import DOG_COLUMN
+from dimeal.purchasing import PriceError, default_prices, optimize_purchases
+from dimeal.rotation import Rotation, plan_rotation
+from dimeal.sheets import PREP_CHECKLIST, plan_document
+from dimeal.shopping import DISPLAY_UNITS, default_index
+from dimeal.storage import StateStore
+from dimeal.timeline import Kitchen, KitchenError, plan_cook_day
 
 st.set_page_config(page_title="JFFD DIY Meal Prep Calculator", layout="centered")
 
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# -------------------------------------------------------------------
+# Rerun Profiling (opt-in)
+# -------------------------------------------------------------------
+# With DIMEAL_PROFILE=1 (or ?profile=1 in the URL) each rerun is timed by
+# section, a panel is shown in the sidebar and totals are kept in a
+# Prometheus textfile for node_exporter. Counting the elements a rerun
+# sends hooks Streamlit's internal send path, so it needs
+# DIMEAL_PROFILE_ELEMENTS=1 as well and is skipped where that path is gone.
+PROFILING = os.environ.get("DIMEAL_PROFILE") == "1" or st.query_params.get("profile") == "1"
+COUNT_ELEMENTS = PROFILING and os.environ.get("DIMEAL_PROFILE_ELEMENTS") == "1"
+METRICS_PATH = os.environ.get("DIMEAL_METRICS", os.path.join(APP_DIR, "dimeal_metrics.prom"))
+
+
+@st.cache_resource
+def get_metrics_exporter():
+    return profiling.MetricsExporter(METRICS_PATH)
+
+
+def begin_profile(kind):
+    """Make a profile current for this rerun and, if asked to, count the deltas it sends.
+
+    Returns ``(profile, restore)``; call ``end_profile`` with both.
+    """
+    profile = profiling.start(kind)
+    ctx = get_script_run_ctx()
+    send = getattr(ctx, "_enqueue", None)
+    if not COUNT_ELEMENTS or not callable(send):
+        return profile, lambda: None
+
+    profile.elements = 0
+
+    def counted_send(msg):
+        if msg.HasField("delta"):
+            profile.elements += 1
+        send(msg)
+
+    ctx._enqueue = counted_send
+    return profile, lambda: setattr(ctx, "_enqueue", send)
+
+
+def end_profile(profile, restore):
+    restore()
+    profiling.stop(profile)
+    get_metrics_exporter().record(profile)
+
+
+def profiled_fragment(name):
+    """Time (and trace) a fragment body; a rerun of just the fragment gets a profile of its own."""
+    def decorate(render):
+        # Every run defines the fragments afresh and each session keeps its
+        # last ones, so only wrap them when this run is profiled or traced
+        if not PROFILING and not TRACE_PATH:
+            return render
+
+        @functools.wraps(render)
+        def wrapper(*args, **kwargs):
+            with traced_run():
+                if not PROFILING:
+                    return render(*args, **kwargs)
+                if profiling.current() is not None:
+                    with profiling.section(name):
+                        return render(*args, **kwargs)
+                profile, restore = begin_profile("fragment")
+                try:
+                    with profile.section(name):
+                        return render(*args, **kwargs)
+                finally:
+                    end_profile(profile, restore)
+        return wrapper
+    return decorate
+
+
+def show_profile_panel(profile):
+    with st.sidebar:
+        st.markdown("### ⏱️ Rerun profile")
+        sent = f", {profile.elements} elements sent" if profile.elements is not None else ""
+        st.caption(f"{profile.seconds * 1000:.1f} ms total{sent}")
+        rows = profile.rows()
+        render_table({
+            "Section": [name for name, _, _ in rows],
+            "ms": [f"{ms:.2f}" for _, ms, _ in rows],
+            "Calls": [calls for _, _, calls in rows],
+        })
+        st.caption(f"Fragment reruns are recorded in `{os.path.basename(METRICS_PATH)}`.")
+
+
+rerun_profile = begin_profile("full") if PROFILING else None
+
+# -------------------------------------------------------------------
+# Interaction Traces (opt-in)
+# -------------------------------------------------------------------
+# With DIMEAL_TRACE=path each change a visitor makes on the calculators or
+# the Profiles tab is appended to a JSON-lines trace, which
+# benchmarks/load_sessions.py replays across many simulated sessions.
+TRACE_PATH = os.environ.get("DIMEAL_TRACE")
+TRACED_KEYS = ("app_version", "orig_", "clean_", "profile_grid_", "calorie_", "kcal_")
+# Kept out of session state: a run that is stopped early does not keep its writes
+trace_local = threading.local()
+
+
+@st.cache_resource
+def get_trace_writer():
+    return traces.TraceWriter(TRACE_PATH)
+
+
+def traced_values():
+    return traces.snapshot({
+        key: value for key, value in st.session_state.to_dict().items()
+        if key.startswith(TRACED_KEYS) and key != "profile_grid_version"
+    })
+
+
+@contextlib.contextmanager
+def traced_run():
+    """Write the traced widgets changed since the last run (or fragment run) ended."""
+    # Fragments drawn by a full run are part of that run
+    if not TRACE_PATH or getattr(trace_local, "running", False):
+        yield
+        return
+
+    session_id = get_script_run_ctx().session_id
+    get_trace_writer().record(session_id, traced_values())
+    trace_local.running = True
+    try:
+        yield
+    finally:
+        trace_local.running = False
+        get_trace_writer().settle(session_id, traced_values())
+
+
 # -------------------------------------------------------------------
 # Persistent State Initialization
 # -------------------------------------------------------------------
 if "app_version" not in st.session_state:
     st.session_state.app_version = "original"
 
-# Initialize default portion sizes for Dexter and Indiana
-if "dex_portions" not in st.session_state:
-    st.session_state.dex_portions = {
-        "Chicken": 22.0,
-        "Turkey": 19.0,
-        "Beef": 20.0,
-        "Fish": 23.5
-    }
-if "indy_portions" not in st.session_state:
-    st.session_state.indy_portions = {
-        "Chicken": 14.0,
-        "Turkey": 11.0,
-        "Beef": 12.0,
-        "Fish": 14.0
-    }
+# Shared SQLite store for profiles, plans and checklist progress
+DB_PATH = os.environ.get("DIMEAL_DB", os.path.join(APP_DIR, "dimeal.db"))
+
+# Widgets whose values outlive the session, grouped by storage scope and
+# stored per visitor (see visitor_scope). Dog profiles, calorie targets and
+# the freezer belong to the kennel and are shared by everyone.
+PERSISTED_WIDGETS = {
+    "checklist": [key for key, _ in PREP_CHECKLIST],
+    "plan": ["orig_recipe_select", "clean_recipe_select"] + [f"shop_days_{r_name}" for r_name in RECIPE_DATA]
+            + ["shop_packages", "rot_weeks", "rot_recipes", "rot_weeks_per_recipe", "rot_stagger"],
+}
+
+
+@st.cache_resource
+def get_state_store():
+    return StateStore(DB_PATH)
+
+
+# A visitor is the signed-in user, or else a random id kept in the URL
+# (?visitor=...) so a reload or a bookmark finds their state again
+VISITOR_ID = re.compile(r"[0-9a-f]{16}")
+
+
+def current_visitor():
+    if st.user.get("is_logged_in"):
+        return f"user:{st.user.get('email') or st.user.get('sub')}"
+    visitor = st.query_params.get("visitor")
+    if not visitor or not VISITOR_ID.fullmatch(visitor):
+        visitor = uuid.uuid4().hex[:16]
+        st.query_params["visitor"] = visitor
+    return visitor
+
+
+def visitor_scope(scope):
+    return f"{scope}:{st.session_state.visitor}"
+
+
+# Callback to save a persisted widget's new value
+def save_widget(scope, key):
+    get_state_store().set(visitor_scope(scope), key, st.session_state[key])
+
+
+# A saved recipe that has since left the catalog is dropped, so the
+# selectbox falls back to its first option
+def drop_unknown_recipe(key):
+    if key in st.session_state and st.session_state[key] not in RECIPE_DATA:
+        del st.session_state[key]
+
+
+# Every computed plan is appended to month-partitioned Parquet files in
+# the background, for the Plan History view
+HISTORY_PATH = os.environ.get("DIMEAL_HISTORY", os.path.join(APP_DIR, "dimeal_history"))
+
+
+@st.cache_resource
+def get_history_writer():
+    writer = PlanHistoryWriter(HISTORY_PATH)
+    atexit.register(writer.close)
+    return writer
+
+
+# A rerun that shows the same plan again is not a new plan
+def record_plan(recipe_name, dogs, total_daily_oz, days):
+    plan = (recipe_name, dogs, float(total_daily_oz), int(days))
+    if st.session_state.get("last_recorded_plan") != plan:
+        st.session_state.last_recorded_plan = plan
+        get_history_writer().record(*plan)
+
+
+# Dog profiles are shared by every session: one read-only store, rebuilt
+# when anyone saves an edit or the recipe catalog changes. Falls back to
+# the portions each recipe was calibrated for.
+def get_profiles():
+    return get_state_store().shared_profiles(RECIPE_DATA)
+
+
+def save_profiles(profiles):
+    get_state_store().save_profiles(profiles)
+    st.session_state.profile_grid_version = st.session_state.get("profile_grid_version", 0) + 1
+
+
+with profiling.section("init_state"):
+    state_store = get_state_store()
+
+    # A session only keeps the portions it changed on a calculator, as
+    # {(dog, recipe): oz}; everything else is read from the shared profiles
+    if "portion_overrides" not in st.session_state:
+        st.session_state.portion_overrides = {}
+
+    # Restore this visitor's saved widget values once per session
+    if "widgets_restored" not in st.session_state:
+        st.session_state.visitor = current_visitor()
+        for scope, keys in PERSISTED_WIDGETS.items():
+            saved = state_store.get_scope(visitor_scope(scope))
+            for key in keys:
+                if key in saved:
+                    st.session_state[key] = saved[key]
+        st.session_state.widgets_restored = True
+
+# Above this many selected dogs the calculator sums portions from the
+# profile store instead of showing one input per dog
+MAX_PORTION_INPUTS = 4
 
 # Callback to switch app versions
 def set_version(version_name):
     st.session_state.app_version = version_name
 
+
 # -------------------------------------------------------------------
-# Embedded Recipe Data
+# Portion Inputs
 # -------------------------------------------------------------------
-RECIPE_DATA = {
-    "Chicken": {
-        "base_daily_oz": 36.0,   # Dex 22 + Indy 14
-        "dex_default": 22.0,
-        "indy_default": 14.0,
-        "base_days": 7.0,
-        "ingredients": [
-            {"name": "Chicken Thighs",     "base_7day_amount": 4.703125, "unit": "lbs"},
-            {"name": "Chicken Liver",      "base_7day_amount": 24.5,     "unit": "oz"},
-            {"name": "Apple",              "base_7day_amount": 8.4,      "unit": "oz"},
-            {"name": "Carrots",            "base_7day_amount": 14.0,     "unit": "oz"},
-            {"name": "Kale",               "base_7day_amount": 14.0,     "unit": "oz"},
-            {"name": "White Rice (Dry)",   "base_7day_amount": 19.25,    "unit": "oz"},
-            {"name": "Brown Rice (Dry)",   "base_7day_amount": 11.2,     "unit": "oz"},
-            {"name": "Sunflower Oil",      "base_7day_amount": 2.625,    "unit": "tsp"},
-            {"name": "Omega",              "base_7day_amount": 0.875,    "unit": "tsp"},
-            {"name": "Flaxseed Oil",       "base_7day_amount": 0.875,    "unit": "tsp"},
-            {"name": "Nutrient",           "base_7day_amount": 13.125,   "unit": "tbsp"},
-        ],
-    },
-    "Turkey": {
-        "base_daily_oz": 30.0,   # Dex 19 + Indy 11
-        "dex_default": 19.0,
-        "indy_default": 11.0,
-        "base_days": 7.0,
-        "ingredients": [
-            {"name": "Ground Turkey",      "base_7day_amount": 6.0,   "unit": "lbs"},
-            {"name": "Turkey Liver",       "base_7day_amount": 3.0,   "unit": "oz"},
-            {"name": "Whole Wheat Pasta",  "base_7day_amount": 48.0,  "unit": "oz"},
-            {"name": "Carrots",            "base_7day_amount": 6.0,   "unit": "oz"},
-            {"name": "Zucchini",           "base_7day_amount": 6.0,   "unit": "oz"},
-            {"name": "Broccoli",           "base_7day_amount": 6.0,   "unit": "oz"},
-            {"name": "Cranberries",        "base_7day_amount": 3.0,   "unit": "oz"},
-            {"name": "Omega",              "base_7day_amount": 6.0,   "unit": "tsp"},
-            {"name": "Nutrient",           "base_7day_amount": 3.0,   "unit": "tbsp"},
-        ],
-    },
-    "Beef": {
-        "base_daily_oz": 32.0,   # Dex 20 + Indy 12
-        "dex_default": 20.0,
-        "indy_default": 12.0,
-        "base_days": 7.0,
-        "ingredients": [
-            {"name": "Ground Beef",        "base_7day_amount": 6.25,   "unit": "lbs"},
-            {"name": "Beef Liver",         "base_7day_amount": 3.125,  "unit": "oz"},
-            {"name": "Russet Potatoes",    "base_7day_amount": 71.25,  "unit": "oz"},
-            {"name": "Sweet Potatoes",     "base_7day_amount": 37.5,   "unit": "oz"},
-            {"name": "Carrots",            "base_7day_amount": 6.25,   "unit": "oz"},
-            {"name": "Green Beans",        "base_7day_amount": 6.25,   "unit": "oz"},
-            {"name": "Green Peas",         "base_7day_amount": 3.125,  "unit": "oz"},
-            {"name": "Apple",              "base_7day_amount": 3.125,  "unit": "oz"},
-            {"name": "Sunflower Oil",      "base_7day_amount": 4.6875, "unit": "oz"},
-            {"name": "Omega",              "base_7day_amount": 1.25,   "unit": "tbsp"},
-            {"name": "Nutrient",           "base_7day_amount": 3.75,   "unit": "tbsp"},
-        ],
-    },
-    "Fish": {
-        "base_daily_oz": 37.5,   # Dex 23.5 + Indy 14
-        "dex_default": 23.5,
-        "indy_default": 14.0,
-        "base_days": 7.0,
-        "ingredients": [
-            {"name": "Whitefish (Cod/Pollock/Haddock)", "base_7day_amount": 7.20, "unit": "lbs"},
-            {"name": "Sweet Potatoes (with skin)",      "base_7day_amount": 4.96, "unit": "lbs"},
-            {"name": "Russet Potatoes (with skin)",     "base_7day_amount": 4.96, "unit": "lbs"},
-            {"name": "Green Beans",                     "base_7day_amount": 9.34, "unit": "oz"},
-            {"name": "Broccoli",                        "base_7day_amount": 9.34, "unit": "oz"},
-            {"name": "Sunflower Oil",                   "base_7day_amount": 6.23, "unit": "oz"},
-            {"name": "Lemon Juice",                     "base_7day_amount": 3.11, "unit": "oz"},
-            {"name": "Flaxseed (ground)",               "base_7day_amount": 2.33, "unit": "oz"},
-            {"name": "Dried Seaweed (unseasoned Nori)", "base_7day_amount": 0.78, "unit": "oz"},
-            {"name": "Fish & Sweet Potatoes DIY Nutrient Blend", "base_7day_amount": 3.11, "unit": "tbsp"},
-        ],
-    },
-}
+# One input per dog, whatever the recipe: its value is loaded from the
+# session's overrides (or the profile) before it renders, and a change is
+# only recorded when it differs from the profile.
+def save_override(key, dog, recipe_name, default):
+    value = st.session_state[key]
+    if value is None or value == default:
+        st.session_state.portion_overrides.pop((dog, recipe_name), None)
+    else:
+        st.session_state.portion_overrides[(dog, recipe_name)] = value
+
+
+def portion_input(label, key, dog, recipe_name, default):
+    st.session_state[key] = st.session_state.portion_overrides.get((dog, recipe_name), float(default))
+    return st.number_input(
+        label,
+        min_value=0.0,
+        step=0.5,
+        key=key,
+        on_change=save_override,
+        args=(key, dog, recipe_name, float(default)),
+    )
+
+# -------------------------------------------------------------------
+# Table Rendering
+# -------------------------------------------------------------------
+# Ingredient tables are small {column: [cells]} dicts rendered as static
+# Markdown, so the calculator never needs pandas. Heavier views (the
+# Profiles grid) import it when they are opened.
+def render_table(columns):
+    def cell(value):
+        return str(value).replace("|", "\\|")
+
+    lines = [
+        "| " + " | ".join(cell(header) for header in columns) + " |",
+        "|" + " --- |" * len(columns),
+    ]
+    lines.extend("| " + " | ".join(cell(value) for value in row) + " |" for row in zip(*columns.values()))
+    st.markdown("\n".join(lines))
+
+
+# -------------------------------------------------------------------
+# Mobile Stylesheet & Cards
+# -------------------------------------------------------------------
+# The clean screen's CSS lives in static/mobile.css. With static serving
+# on (.streamlit/config.toml) a rerun only sends a one-line @import and the
+# browser fetches and caches the file once; otherwise it is inlined.
+MOBILE_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "mobile.css")
+MOBILE_CSS_URL = "app/static/mobile.css"
+
+
+@st.cache_resource
+def mobile_stylesheet():
+    if st.get_option("server.enableStaticServing"):
+        return f"<style>@import url('{MOBILE_CSS_URL}');</style>"
+    with open(MOBILE_CSS_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+def mobile_card(header, body=""):
+    # Each card is one element: Streamlit can't nest widgets inside raw HTML
+    st.markdown(f"<div class='mobile-card'><div class='card-header'>{header}</div>{body}</div>", unsafe_allow_html=True)
+
+
+# -------------------------------------------------------------------
+# Shared View Cache
+# -------------------------------------------------------------------
+# Computed tables and plate markup are shared by every session, keyed on
+# (recipe, total daily oz, days, view) and the catalog generation, so an
+# edited recipe file never serves stale tables
+VIEW_CACHE_SIZE = 1024
+
+
+@st.cache_resource
+def get_view_cache():
+    return LRUCache(VIEW_CACHE_SIZE)
+
+
+def cached_view(view, recipe_name, total_daily_oz, days):
+    key = (recipe_name, float(total_daily_oz), int(days), view, default_catalog().generation)
+    with profiling.section("view_cache"):
+        return get_view_cache().get_or_build(key, lambda: VIEW_BUILDERS[view](recipe_name, total_daily_oz, days))
+
+
+def build_original_view(recipe_name, total_daily_oz, days):
+    with profiling.section("scale"):
+        scaled = scale_recipe(recipe_name, total_daily_oz, days)
+
+    with profiling.section("tables"):
+        total_col = f"Total for {int(days)} days"
+        table = {"Ingredient": [], "Per Day": [], total_col: []}
+
+        for name, unit, per_day_yours, total_period in scaled.ingredients(0):
+            table["Ingredient"].append(name)
+            table["Per Day"].append(f"{per_day_yours:.3f} {unit}".strip())
+            table[total_col].append(f"{total_period:.3f} {unit}".strip())
+
+        print_table = {"Ingredient": table["Ingredient"], total_col: table[total_col]}
+    return float(scaled.scale_factor[0]), table, print_table
+
+
+def build_clean_view(recipe_name, total_daily_oz, days):
+    with profiling.section("scale"):
+        scaled = scale_recipe(recipe_name, total_daily_oz, days)
+
+    with profiling.section("tables"):
+        plates = []
+        total_col = f"Total ({int(days)}d)"
+        print_table = {"Ingredient": [], total_col: []}
+        for idx, (name, unit, per_day_yours, total_period) in enumerate(scaled.ingredients(0)):
+            # Alternating styles (soft green / soft warm gold)
+            if idx % 2 == 0:
+                plate_bg = "#edf2ed"      # Soft Green
+                plate_border = "#4a7c59"  # Olive Green
+            else:
+                plate_bg = "#faf5ec"      # Soft Warm Gold
+                plate_border = "#d4af37"  # Warm Gold
+
+            # Custom UI plates matching the metric theme
+            plates.append(
+                f'<div class="ingredient-plate" style="background-color: {plate_bg}; border-left: 5px solid {plate_border};">'
+                f'<div><div class="plate-name">{name}</div>'
+                f'<div class="plate-subtext">Daily: {per_day_yours:.2f} {unit}</div></div>'
+                f'<div class="plate-val">{total_period:.2f} {unit}</div>'
+                f'</div>'
+            )
+
+            print_table["Ingredient"].append(name)
+            print_table[total_col].append(f"{total_period:.2f} {unit}")
+
+    return float(scaled.scale_factor[0]), "".join(plates), print_table
+
+
+VIEW_BUILDERS = {"original": build_original_view, "clean": build_clean_view}
+
+
+# The offline page is built once per catalog generation, when first downloaded
+@st.cache_resource(max_entries=1)
+def cached_offline_page(generation):
+    return offline_page()
+
+
+def offline_calculator_page():
+    return cached_offline_page(default_catalog().generation)
 
 # -------------------------------------------------------------------
 # ORIGINAL VERSION SCREEN
@@ -138,20 +454,23 @@ Main proteins are shown in **pounds**, other ingredients keep their original uni
 
     st.subheader("1. Choose Recipe")
 
+    drop_unknown_recipe("orig_recipe_select")
     selected_recipe_name = st.selectbox(
         "Select which meal you are prepping:",
         list(RECIPE_DATA.keys()),
-        key="orig_recipe_select"
+        key="orig_recipe_select",
+        on_change=save_widget,
+        args=("plan", "orig_recipe_select")
     )
 
-    recipe = RECIPE_DATA[selected_recipe_name]
-    base_daily_oz = recipe["base_daily_oz"]
-    
-    # Read portions from session state or default config
-    dex_default = st.session_state.dex_portions.get(selected_recipe_name, recipe["dex_default"])
-    indy_default = st.session_state.indy_portions.get(selected_recipe_name, recipe["indy_default"])
-    base_days = recipe["base_days"]
-    ingredients = recipe["ingredients"]
+    with profiling.section("recipe_lookup"):
+        recipe = RECIPE_DATA[selected_recipe_name]
+        base_daily_oz = recipe["base_daily_oz"]
+
+        # Read portions from the profile store or default config
+        profiles = get_profiles()
+        dex_default = profiles.portion("Dexter", selected_recipe_name, recipe["dex_default"])
+        indy_default = profiles.portion("Indiana", selected_recipe_name, recipe["indy_default"])
 
     st.markdown(
         f"""
@@ -196,20 +515,8 @@ Main proteins are shown in **pounds**, other ingredients keep their original uni
     )
 
     if change_portions:
-        dex_daily = st.number_input(
-            "Dexter daily food (oz)",
-            min_value=0.0,
-            value=float(dex_default),
-            step=0.5,
-            key=f"orig_dex_{selected_recipe_name}",
-        )
-        indy_daily = st.number_input(
-            "Indiana daily food (oz)",
-            min_value=0.0,
-            value=float(indy_default),
-            step=0.5,
-            key=f"orig_indy_{selected_recipe_name}",
-        )
+        dex_daily = portion_input("Dexter daily food (oz)", "orig_dex", "Dexter", selected_recipe_name, dex_default)
+        indy_daily = portion_input("Indiana daily food (oz)", "orig_indy", "Indiana", selected_recipe_name, indy_default)
     else:
         dex_daily = dex_default
         indy_daily = indy_default
@@ -235,41 +542,12 @@ Main proteins are shown in **pounds**, other ingredients keep their original uni
         st.warning("Total daily intake is 0 oz — increase Dexter or Indiana’s daily ounces.")
         st.stop()
 
-    # Scale factor
-    scale_factor = (total_daily_oz / base_daily_oz) * (days / base_days)
-
-    rows = []
-    print_rows = []
-
-    for ing in ingredients:
-        name = ing["name"]
-        base_7 = ing["base_7day_amount"]
-        unit = ing["unit"]
-
-        base_per_day = base_7 / base_days
-        per_day_yours = base_per_day * (total_daily_oz / base_daily_oz)
-        total_period = base_7 * scale_factor
-
-        rows.append(
-            {
-                "Ingredient": name,
-                "Per Day": f"{per_day_yours:.3f} {unit}".strip(),
-                f"Total for {int(days)} days": f"{total_period:.3f} {unit}".strip(),
-            }
-        )
-
-        print_rows.append(
-            {
-                "Ingredient": name,
-                f"Total for {int(days)} days": f"{total_period:.3f} {unit}".strip(),
-            }
-        )
-
-    result_df = pd.DataFrame(rows)
-    print_df = pd.DataFrame(print_rows)
+    # Scale factor and tables, shared across sessions
+    scale_factor, result_table, print_table = cached_view("original", selected_recipe_name, total_daily_oz, days)
+    record_plan(selected_recipe_name, "Dexter, Indiana", total_daily_oz, days)
 
     st.subheader("4. Ingredient Requirements (scaled from 7-day batch)")
-    st.dataframe(result_df, use_container_width=True)
+    render_table(result_table)
 
     st.markdown(
         f"""
@@ -284,7 +562,7 @@ Main proteins are shown in **pounds**, other ingredients keep their original uni
 
     if show_print:
         st.markdown(f"**Print view for {selected_recipe_name} – Total for {int(days)} days**")
-        st.table(print_df)
+        render_table(print_table)
 
     if selected_recipe_name == "Chicken":
         st.caption(
@@ -305,435 +583,835 @@ Main proteins are shown in **pounds**, other ingredients keep their original uni
 # MOBILE-FIRST CLEAN VERSION SCREEN
 # -------------------------------------------------------------------
 def show_clean_version():
-    # Inject mobile app styling & Outfit Font
+    # Mobile app styling & Outfit Font, sent once per browser when static
+    # serving is on
+    st.html(mobile_stylesheet())
+
+    # App Header
     st.markdown(
-        """
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700&display=swap');
-        
-        /* Mobile-First Frame Emulator for Desktop */
-        @media (min-width: 600px) {
-            .main .block-container {
-                max-width: 440px !important;
-                padding: 40px 24px 30px 24px !important;
-                border: 12px solid #2e3033 !important; /* Phone Bezel */
-                border-radius: 40px !important;
-                box-shadow: 0 20px 40px rgba(0,0,0,0.15) !important;
-                background-color: #ffffff !important;
-                margin-top: 30px !important;
-                margin-bottom: 30px !important;
-                position: relative;
-            }
-            
-            /* Notch Simulator */
-            .main .block-container::before {
-                content: "";
-                position: absolute;
-                top: 0;
-                left: 50%;
-                transform: translateX(-50%);
-                width: 140px;
-                height: 20px;
-                background-color: #2e3033;
-                border-bottom-left-radius: 12px;
-                border-bottom-right-radius: 12px;
-                z-index: 999;
-            }
-        }
-        
-        /* Apply fonts globally */
-        html, body, [data-testid="stAppViewContainer"], [class*="css"] {
-            font-family: 'Outfit', sans-serif !important;
-            font-size: 18px !important;
-        }
-        
-        /* Headers and Text */
-        .app-title {
-            font-size: 1.8rem !important;
-            font-weight: 700 !important;
-            color: #1e3f20 !important; /* Dark Green */
-            margin-bottom: 4px !important;
-            text-align: center;
-        }
-        
-        .app-subtitle {
-            font-size: 0.95rem !important;
-            color: #556b2f !important;
-            margin-top: 0px !important;
-            margin-bottom: 20px !important;
-            text-align: center;
-            font-weight: 400;
-        }
-        
-        /* Custom Mobile Cards */
-        .mobile-card {
-            background-color: #f8faf7;
-            border-radius: 16px;
-            padding: 16px;
-            border: 1px solid #e6ede8;
-            margin-bottom: 16px;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.02);
-        }
-        
-        .card-header {
-            font-size: 1.15rem;
-            font-weight: 600;
-            color: #1e3f20;
-            margin-bottom: 12px;
-            border-bottom: 1px solid #e1e9e3;
-            padding-bottom: 6px;
-        }
-        
-        /* Large Highlighted Metrics */
-        .mobile-metrics {
-            display: flex;
-            justify-content: space-between;
-            background-color: #edf2ed;
-            border-radius: 14px;
-            padding: 14px;
-            margin-top: 15px;
-            margin-bottom: 15px;
-            border: 1px solid #d4ded4;
-        }
-        
-        .metric-item {
-            text-align: center;
-            flex: 1;
-        }
-        
-        .metric-val {
-            font-size: 1.55rem;
-            font-weight: 700;
-            color: #1e3f20;
-        }
-        
-        .metric-lbl {
-            font-size: 0.8rem;
-            color: #666666;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-            margin-top: 3px;
-        }
-
-        /* Ingredient Plate styling */
-        .ingredient-plate {
-            background-color: #edf2ed;
-            border-radius: 12px;
-            padding: 12px 16px;
-            border-left: 5px solid #4a7c59;
-            margin-bottom: 10px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 2px 6px rgba(0,0,0,0.02);
-            border-top: 1px solid #e1e9e3;
-            border-right: 1px solid #e1e9e3;
-            border-bottom: 1px solid #e1e9e3;
-        }
-        
-        .plate-name {
-            font-weight: 600;
-            color: #1e3f20;
-            font-size: 1.05rem;
-        }
-        
-        .plate-subtext {
-            font-size: 0.85rem;
-            color: #555555;
-            margin-top: 2px;
-        }
-        
-        .plate-val {
-            font-size: 1.3rem;
-            font-weight: 700;
-            color: #1e3f20;
-            text-align: right;
-        }
-        
-        /* Bigger Font for inputs and checkboxes */
-        .stRadio label, .stSelectbox label, .stNumberInput label {
-            font-size: 1.15rem !important;
-            font-weight: 500 !important;
-            color: #333333 !important;
-        }
-        </style>
-        """,
+        "<div class='app-title'>DIMeal App 🐾</div><div class='app-subtitle'>JFFD DIY Meal Prep Companion</div>",
         unsafe_allow_html=True,
     )
 
-    # App Header
-    st.markdown("<div class='app-title'>DIMeal App 🐾</div>", unsafe_allow_html=True)
-    st.markdown("<div class='app-subtitle'>JFFD DIY Meal Prep Companion</div>", unsafe_allow_html=True)
-
     # Version toggle button inside the container
     col_btn = st.columns([1])[0]
-    col_btn.button("🔙 Switch to Original Calculator", on_click=set_version, args=("original",), use_container_width=True)
+    col_btn.button("🔙 Switch to Original Calculator", on_click=set_version, args=("original",), width="stretch")
     st.write("")
 
     # Mobile Tab Navigation
-    tab_calc, tab_recipes, tab_dogs, tab_guide = st.tabs([
+    # Switching tabs reruns the app so only the open tab's body executes;
+    # widgets inside a tab rerun just that tab's fragment.
+    tab_calc, tab_shop, tab_rotation, tab_recipes, tab_dogs, tab_guide = st.tabs([
         "⚖️ Calculator",
+        "🛒 Shopping",
+        "🔁 Rotation",
         "📚 Recipes",
         "🐶 Profiles",
         "🍳 Prep Guide"
-    ])
-
-    # --------------------------------------------------------
-    # TAB 1: CALCULATOR
-    # --------------------------------------------------------
-    with tab_calc:
-        # Recipe Selection Card
-        st.markdown("<div class='mobile-card'><div class='card-header'>🍳 Select Recipe</div>", unsafe_allow_html=True)
-        selected_recipe_name = st.selectbox(
-            "Which recipe are you cooking?",
-            list(RECIPE_DATA.keys()),
-            key="clean_recipe_select",
-            label_visibility="collapsed"
-        )
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        recipe = RECIPE_DATA[selected_recipe_name]
-        base_daily_oz = recipe["base_daily_oz"]
-        base_days = recipe["base_days"]
-        ingredients = recipe["ingredients"]
+    ], key="clean_tab", on_change="rerun")
+
+    for tab, render_tab in (
+        (tab_calc, clean_calculator_tab),
+        (tab_shop, clean_shopping_tab),
+        (tab_rotation, clean_rotation_tab),
+        (tab_recipes, clean_recipes_tab),
+        (tab_dogs, clean_profiles_tab),
+        (tab_guide, clean_guide_tab),
+    ):
+        if tab.open:
+            with tab:
+                render_tab()
+
+
+# --------------------------------------------------------
+# TAB 1: CALCULATOR
+# --------------------------------------------------------
+@st.fragment
+@profiled_fragment("tab.calculator")
+def clean_calculator_tab():
+    # Recipe Selection Card
+    mobile_card("🍳 Select Recipe")
+    drop_unknown_recipe("clean_recipe_select")
+    selected_recipe_name = st.selectbox(
+        "Which recipe are you cooking?",
+        list(RECIPE_DATA.keys()),
+        key="clean_recipe_select",
+        persist_state="page",
+        on_change=save_widget,
+        args=("plan", "clean_recipe_select"),
+        label_visibility="collapsed"
+    )
 
-        # Dog Selection Card
-        st.markdown("<div class='mobile-card'><div class='card-header'>🐕 Prepare Food For</div>", unsafe_allow_html=True)
-        dog_choice = st.radio(
+    # Dog Selection Card
+    profiles = get_profiles()
+    mobile_card("🐕 Prepare Food For")
+    all_dogs = st.checkbox(
+        f"All dogs ({len(profiles)})",
+        value=True,
+        key="clean_all_dogs",
+        persist_state="page"
+    )
+    if all_dogs:
+        selected_dogs = profiles.dogs
+    else:
+        selected_dogs = st.multiselect(
             "Select dogs:",
-            ("Both Dogs (Dexter & Indiana)", "Dexter Only", "Indiana Only"),
+            profiles.dogs,
             key="clean_dog_choice",
+            persist_state="page",
             label_visibility="collapsed"
         )
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # Portions & Duration
-        st.markdown("<div class='mobile-card'><div class='card-header'>Portions & Duration</div>", unsafe_allow_html=True)
-        
-        # Load defaults dynamically from session state
-        dex_default = st.session_state.dex_portions.get(selected_recipe_name, recipe["dex_default"])
-        indy_default = st.session_state.indy_portions.get(selected_recipe_name, recipe["indy_default"])
-
-        if dog_choice == "Both Dogs (Dexter & Indiana)":
-            dex_daily = st.number_input(
-                "Dexter portion (oz/day):",
-                min_value=0.0,
-                value=float(dex_default),
-                step=0.5,
-                key=f"clean_dex_{selected_recipe_name}"
+    dog_choice = ", ".join(selected_dogs) if len(selected_dogs) <= MAX_PORTION_INPUTS else f"{len(selected_dogs)} dogs"
+
+    # Portions & Duration
+    mobile_card("Portions & Duration")
+
+    # A handful of dogs get editable portions; larger groups are summed
+    # straight from the profile store.
+    if len(selected_dogs) <= MAX_PORTION_INPUTS:
+        total_daily_oz = 0.0
+        for dog in selected_dogs:
+            dog_daily = portion_input(
+                f"{dog} portion (oz/day):",
+                f"clean_portion_{dog}",
+                dog,
+                selected_recipe_name,
+                profiles.portion(dog, selected_recipe_name),
             )
-            indy_daily = st.number_input(
-                "Indiana portion (oz/day):",
-                min_value=0.0,
-                value=float(indy_default),
-                step=0.5,
-                key=f"clean_indy_{selected_recipe_name}"
-            )
-            if dex_daily is None or indy_daily is None:
+            if dog_daily is None:
                 st.warning("Please enter valid food portions.")
                 st.stop()
-            total_daily_oz = dex_daily + indy_daily
-        elif dog_choice == "Dexter Only":
-            dex_daily = st.number_input(
-                "Dexter portion (oz/day):",
-                min_value=0.0,
-                value=float(dex_default),
-                step=0.5,
-                key=f"clean_dex_only_{selected_recipe_name}"
-            )
-            if dex_daily is None:
-                st.warning("Please enter a valid portion size.")
-                st.stop()
-            indy_daily = 0.0
-            total_daily_oz = dex_daily
-        else: # Indiana Only
-            indy_daily = st.number_input(
-                "Indiana portion (oz/day):",
-                min_value=0.0,
-                value=float(indy_default),
-                step=0.5,
-                key=f"clean_indy_only_{selected_recipe_name}"
-            )
-            if indy_daily is None:
-                st.warning("Please enter a valid portion size.")
-                st.stop()
-            dex_daily = 0.0
-            total_daily_oz = indy_daily
-
+            total_daily_oz += dog_daily
+    else:
+        total_daily_oz = float(profiles.combined_daily_oz(selected_dogs).get(selected_recipe_name, 0.0))
+        st.caption(f"{len(selected_dogs)} dogs selected. Edit their portions in the Profiles tab.")
 
-        # Days Choice
-        days_choice = st.radio(
-            "Prep duration (days):",
-            ("3 days (trip)", "7 days (week)", "Custom days"),
-            key="clean_days_choice"
+    # Days Choice
+    days_choice = st.radio(
+        "Prep duration (days):",
+        ("3 days (trip)", "7 days (week)", "Custom days"),
+        key="clean_days_choice",
+        persist_state="page",
+    )
+    if days_choice.startswith("3"):
+        days = 3
+    elif days_choice.startswith("7"):
+        days = 7
+    else:
+        days = st.number_input(
+            "Enter custom days:",
+            min_value=1,
+            value=7,
+            step=1,
+            key="clean_custom_days",
+            persist_state="page",
         )
-        if days_choice.startswith("3"):
-            days = 3
-        elif days_choice.startswith("7"):
-            days = 7
-        else:
-            days = st.number_input(
-                "Enter custom days:",
-                min_value=1,
-                value=7,
-                step=1,
-                key="clean_custom_days"
-            )
-        
-        if days is None:
-            st.warning("Please enter a valid number of days.")
-            st.stop()
-            
-        st.markdown("</div>", unsafe_allow_html=True)
 
-        if total_daily_oz == 0:
-            st.warning("Total daily intake cannot be 0 oz.")
-            st.stop()
+    if days is None:
+        st.warning("Please enter a valid number of days.")
+        st.stop()
 
-        # Calculate scale factor
-        scale_factor = (total_daily_oz / base_daily_oz) * (days / base_days)
 
-        # Display Mobile Metrics (Intake, Days, Scale Plates)
-        st.markdown(
-            f"""
-            <div class="mobile-metrics">
-                <div class="metric-item">
-                    <div class="metric-val">{total_daily_oz:.1f} oz</div>
-                    <div class="metric-lbl">Daily Intake</div>
-                </div>
-                <div class="metric-item">
-                    <div class="metric-val">{int(days)}</div>
-                    <div class="metric-lbl">Days</div>
-                </div>
-                <div class="metric-item">
-                    <div class="metric-val">{scale_factor:.2f}x</div>
-                    <div class="metric-lbl">Scale</div>
-                </div>
+    if total_daily_oz == 0:
+        st.warning("Total daily intake cannot be 0 oz.")
+        st.stop()
+
+    # Calculate scale factor and plates, shared across sessions
+    scale_factor, plates, print_table = cached_view("clean", selected_recipe_name, total_daily_oz, days)
+    # What ticking "freeze" in the Prep Guide puts in the freezer
+    st.session_state.freezer_batch = (selected_recipe_name, float(total_daily_oz), int(days), scale_factor)
+    record_plan(selected_recipe_name, dog_choice, total_daily_oz, days)
+
+    # Display Mobile Metrics (Intake, Days, Scale Plates)
+    st.markdown(
+        f"""
+        <div class="mobile-metrics">
+            <div class="metric-item">
+                <div class="metric-val">{total_daily_oz:.1f} oz</div>
+                <div class="metric-lbl">Daily Intake</div>
+            </div>
+            <div class="metric-item">
+                <div class="metric-val">{int(days)}</div>
+                <div class="metric-lbl">Days</div>
+            </div>
+            <div class="metric-item">
+                <div class="metric-val">{scale_factor:.2f}x</div>
+                <div class="metric-lbl">Scale</div>
             </div>
-            """,
-            unsafe_allow_html=True
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # Ingredient plates rerun on their own when the print toggle changes
+    clean_ingredient_plates(plates, print_table, selected_recipe_name, total_daily_oz, days, dog_choice)
+
+
+@st.fragment
+@profiled_fragment("tab.calculator.plates")
+def clean_ingredient_plates(plates, print_table, selected_recipe_name, total_daily_oz, days, dog_choice):
+    # Ingredients requirements custom plates rendering, as a single element
+    mobile_card("🛒 Scaled Ingredients", plates)
+
+    # Recipe description captions
+    if selected_recipe_name == "Chicken":
+        st.caption("Chicken Thighs are shown in lbs (converted from original 75.25 oz). Other items keep original units.")
+    elif selected_recipe_name == "Fish":
+        st.caption("Fish recipe is calibrated so that a 7-day batch uses 7.2 lbs of fish (calibrated for Dex 23.5 oz and Indy 14 oz daily).")
+
+    # Print Friendly Checkbox
+    show_print = st.checkbox("Show print-friendly summary", key="clean_show_print", persist_state="page")
+    if show_print:
+        st.markdown(f"**Print view – Total for {int(days)} days ({dog_choice})**")
+        render_table(print_table)
+        # The sheet is only rendered when the button is clicked
+        st.download_button(
+            "⬇️ Printable prep sheet (HTML)",
+            data=functools.partial(
+                plan_document, ((selected_recipe_name, float(total_daily_oz), days),), f"{selected_recipe_name} – {dog_choice}"
+            ),
+            file_name=f"prep-sheet-{selected_recipe_name.lower()}.html",
+            mime="text/html",
+            on_click="ignore",
         )
 
-        # Ingredients requirements custom plates rendering
-        st.markdown("<div class='mobile-card'><div class='card-header'>🛒 Scaled Ingredients</div>", unsafe_allow_html=True)
-        
-        print_rows = []
-        for idx, ing in enumerate(ingredients):
-            name = ing["name"]
-            base_7 = ing["base_7day_amount"]
-            unit = ing["unit"]
+    # Every recipe precomputed into one page, for kitchens without signal
+    st.download_button(
+        "📴 Offline calculator (HTML)",
+        data=offline_calculator_page,
+        file_name="dimeal-offline.html",
+        mime="text/html",
+        on_click="ignore",
+        help=(
+            f"Save it on your phone: it answers every recipe for {DEFAULT_OZ_STEP:g}–{DEFAULT_MAX_OZ:g} oz/day "
+            f"and 1–{DEFAULT_MAX_DAYS} days with no connection."
+        ),
+    )
 
-            base_per_day = base_7 / base_days
-            per_day_yours = base_per_day * (total_daily_oz / base_daily_oz)
-            total_period = base_7 * scale_factor
 
-            # Alternating styles (soft green / soft warm gold)
-            if idx % 2 == 0:
-                plate_bg = "#edf2ed"      # Soft Green
-                plate_border = "#4a7c59"  # Olive Green
-            else:
-                plate_bg = "#faf5ec"      # Soft Warm Gold
-                plate_border = "#d4af37"  # Warm Gold
+# --------------------------------------------------------
+# SHOPPING LIST TAB
+# --------------------------------------------------------
+@st.fragment
+@profiled_fragment("tab.shopping")
+def clean_shopping_tab():
+    st.markdown("### Shopping List 🛒")
+    st.write("Combine several recipes into one trip. Set the days for each recipe you are prepping (0 to skip).")
+
+    if st.checkbox("🥫 What can I make from the pantry?", key="shop_pantry", persist_state="page"):
+        clean_pantry()
+
+    profiles = get_profiles()
+    combined = profiles.combined_daily_oz()
+
+    mobile_card("Recipes & Days")
+    plan = []
+    for r_name in RECIPE_DATA.keys():
+        r_oz = combined.get(r_name, 0.0)
+        r_days = st.number_input(
+            f"{r_name} ({r_oz:.1f} oz/day for all dogs):",
+            min_value=0,
+            step=1,
+            key=f"shop_days_{r_name}",
+            persist_state="page",
+            on_change=save_widget,
+            args=("plan", f"shop_days_{r_name}")
+        )
+        if r_days and r_oz > 0:
+            plan.append((r_name, float(r_oz), r_days))
+
+    if not plan:
+        st.info("Add days to at least one recipe to build a shopping list.")
+        return
+
+    shop_table = {"Ingredient": [], "Amount": [], "Recipes": []}
+    with profiling.section("shopping_list"):
+        items = shopping_list(plan)
+    for name, amount, unit, recipes in items:
+        shop_table["Ingredient"].append(name)
+        shop_table["Amount"].append(f"{amount:.2f} {unit}")
+        shop_table["Recipes"].append(", ".join(recipes))
+    render_table(shop_table)
+    st.caption("Weights are combined in oz/lbs and spoon measures in tsp/tbsp. An item bought both ways (like Sunflower Oil) is listed once per measure.")
+    st.download_button(
+        "⬇️ Prep sheets for every recipe (HTML)",
+        data=functools.partial(plan_document, tuple(plan), "Prep sheets"),
+        file_name="prep-sheets.html",
+        mime="text/html",
+        on_click="ignore",
+    )
 
-            # Render custom UI plates matching the metric theme
-            st.markdown(
-                f"""
-                <div class="ingredient-plate" style="background-color: {plate_bg}; border-left: 5px solid {plate_border};">
-                    <div>
-                        <div class="plate-name">{name}</div>
-                        <div class="plate-subtext">Daily: {per_day_yours:.2f} {unit}</div>
-                    </div>
-                    <div class="plate-val">
-                        {total_period:.2f} {unit}
-                    </div>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-            
-            print_rows.append({
-                "Ingredient": name,
-                f"Total ({int(days)}d)": f"{total_period:.2f} {unit}"
-            })
+    if st.checkbox(
+        "💲 Round up to store packages",
+        key="shop_packages",
+        persist_state="page",
+        on_change=save_widget,
+        args=("plan", "shop_packages")
+    ):
+        clean_package_list(plan)
+
+
+def clean_package_list(plan):
+    # Cheapest package combination per ingredient from the price file
+    try:
+        with profiling.section("purchase_optimizer"):
+            purchases = optimize_purchases(plan, default_prices())
+    except (OSError, PriceError) as exc:
+        st.warning(f"Could not load package prices: {exc}")
+        return
+
+    buy_table = {"Ingredient": [], "Need": [], "Buy": [], "Cost": []}
+    for name, needed, unit, picks, bought, bought_unit, cost in purchases.rows():
+        buy_table["Ingredient"].append(name)
+        buy_table["Need"].append(f"{needed:.2f} {unit}")
+        if picks:
+            packages = ", ".join(f"{count} × {label}" for label, count in picks)
+            buy_table["Buy"].append(f"{packages} ({bought:.2f} {bought_unit})")
+            buy_table["Cost"].append(f"${cost:.2f}")
+        else:
+            buy_table["Buy"].append("not in price list")
+            buy_table["Cost"].append("—")
+    render_table(buy_table)
+    st.markdown(f"**Estimated total: ${purchases.cost[0]:.2f}**")
+    st.caption("Package sizes and prices come from the DIMEAL_PRICES file (an example list by default).")
+
+
+# --------------------------------------------------------
+# Pantry Solver
+# --------------------------------------------------------
+def clean_pantry():
+    mobile_card("🥫 Pantry")
+    index = default_index()
+    # Amounts are typed in each measure's larger unit (lbs or tbsp)
+    options = {
+        f"{name} ({DISPLAY_UNITS[dimension][0][0]})": (name, dimension)
+        for name, dimension in sorted(index.keys)
+    }
+    picked = st.multiselect(
+        "Ingredients on hand:", list(options), key="pantry_items", persist_state="page", placeholder="Ground Beef (lbs)…"
+    )
+    # One entry per (ingredient, measure): an oil can be on hand by weight and by volume
+    pantry = []
+    for label in picked:
+        name, dimension = options[label]
+        amount = st.number_input(
+            f"{label}:", min_value=0.0, step=0.5, key=f"pantry_{name}_{dimension}", persist_state="page"
+        )
+        if amount is not None:
+            pantry.append((name, amount, DISPLAY_UNITS[dimension][0][0]))
+    strict = st.checkbox(
+        "Count ingredients not listed as none on hand", key="pantry_strict", persist_state="page",
+        help="Otherwise only the listed ingredients limit a recipe and the rest are bought.",
+    )
+    if not pantry:
+        return
+
+    # Every recipe for all dogs and, for a handful of dogs, each dog alone
+    profiles = get_profiles()
+    groups = {"All dogs": profiles.dogs}
+    if len(profiles.dogs) <= MAX_PORTION_INPUTS:
+        groups.update((dog, [dog]) for dog in profiles.dogs)
+    daily_oz = group_daily_oz(profiles, list(groups.values()), index.book)
+    try:
+        with profiling.section("pantry"):
+            limits = pantry_limits(pantry, daily_oz, index, strict)
+            split = best_split(pantry, daily_oz[0], index, strict)
+    except PantryError as exc:
+        st.warning(str(exc))
+        return
+
+    table = {"Recipe": [name for name, _, _ in limits.rows()]}
+    for g, group in enumerate(groups):
+        table[f"{group} (days)"] = [
+            "–" if days is None else "unlimited" if days == math.inf else days for _, days, _ in limits.rows(g)
+        ]
+    table["Runs out first"] = [limit or "–" for _, _, limit in limits.rows()]
+    render_table(table)
+
+    if split.total_days:
+        plan = ", ".join(f"{name} for {days} days" for name, days in split.rows())
+        st.markdown(f"**Most days for all dogs: {split.total_days}** ({plan})")
+        render_table({
+            "Ingredient": [name for name, *_ in split.stock_rows()],
+            "Have": [f"{have:.2f} {unit}" for _, have, _, _, unit in split.stock_rows()],
+            "Used": [f"{used:.2f} {unit}" for _, _, used, _, unit in split.stock_rows()],
+            "Left": [f"{left:.2f} {unit}" for *_, left, unit in split.stock_rows()],
+        })
+    else:
+        st.write("Not enough on hand for a whole day of any recipe.")
+
+
+# --------------------------------------------------------
+# ROTATION PLANNER TAB
+# --------------------------------------------------------
+@st.fragment
+@profiled_fragment("tab.rotation")
+def clean_rotation_tab():
+    st.markdown("### Rotation Planner 🔁")
+    st.write("Rotate recipes week by week and see what every week, and the whole plan, needs.")
+
+    profiles = get_profiles()
+    recipe_names = list(RECIPE_DATA.keys())
+
+    # Defaults go through Session State so they never clash with restored
+    # values; saved recipes that left the catalog are dropped
+    st.session_state.setdefault("rot_weeks", 4)
+    st.session_state.setdefault("rot_weeks_per_recipe", 1)
+    st.session_state.rot_recipes = [
+        name for name in st.session_state.get("rot_recipes", recipe_names) if name in recipe_names
+    ]
+
+    mobile_card("Rotation Rules")
+    rotation_recipes = st.multiselect(
+        "Recipes, in rotation order:",
+        recipe_names,
+        key="rot_recipes",
+        persist_state="page",
+        on_change=save_widget,
+        args=("plan", "rot_recipes")
+    )
+    weeks = st.number_input(
+        "Plan length (weeks):", min_value=1, max_value=104, step=1,
+        key="rot_weeks", persist_state="page", on_change=save_widget, args=("plan", "rot_weeks")
+    )
+    weeks_per_recipe = st.number_input(
+        "Weeks on each recipe:", min_value=1, max_value=12, step=1,
+        key="rot_weeks_per_recipe", persist_state="page", on_change=save_widget, args=("plan", "rot_weeks_per_recipe")
+    )
+    stagger = st.checkbox(
+        "Stagger dogs (each dog starts one recipe further along)",
+        key="rot_stagger", persist_state="page", on_change=save_widget, args=("plan", "rot_stagger")
+    )
 
-        print_df = pd.DataFrame(print_rows)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # Recipe description captions
-        if selected_recipe_name == "Chicken":
-            st.caption("Chicken Thighs are shown in lbs (converted from original 75.25 oz). Other items keep original units.")
-        elif selected_recipe_name == "Fish":
-            st.caption("Fish recipe is calibrated so that a 7-day batch uses 7.2 lbs of fish (calibrated for Dex 23.5 oz and Indy 14 oz daily).")
-
-        # Print Friendly Checkbox
-        show_print = st.checkbox("Show print-friendly summary", key="clean_show_print")
-        if show_print:
-            st.markdown(f"**Print view – Total for {int(days)} days ({dog_choice})**")
-            st.table(print_df)
-
-    # --------------------------------------------------------
-    # TAB 2: RECIPES LIBRARY
-    # --------------------------------------------------------
-    with tab_recipes:
-        st.markdown("### JFFD Recipes Info")
-        for r_name, r_info in RECIPE_DATA.items():
-            with st.expander(f"📚 {r_name} Recipe"):
-                st.write(f"**Original Base Intake (Dex + Indy):** {r_info['base_daily_oz']} oz/day")
-                st.write(f"**Calibrated 7-day batch ingredients:**")
-                for ing in r_info["ingredients"]:
-                    st.write(f"- {ing['name']}: **{ing['base_7day_amount']:.3f} {ing['unit']}**")
-
-    # --------------------------------------------------------
-    # TAB 3: DOGS PROFILE
-    # --------------------------------------------------------
-    with tab_dogs:
-        st.markdown("### Dog Profiles 🐶")
-        st.write("Customize default daily food portions (oz) for Dexter and Indiana. Changes update the calculator defaults dynamically.")
-
-        # Dexter Card
-        st.markdown("<div class='mobile-card'><div class='card-header'>Dexter Portions (oz)</div>", unsafe_allow_html=True)
-        for r_name in RECIPE_DATA.keys():
-            st.session_state.dex_portions[r_name] = st.number_input(
-                f"{r_name} default daily portion:",
-                min_value=0.0,
-                value=float(st.session_state.dex_portions[r_name]),
-                step=0.5,
-                key=f"profile_dex_{r_name}"
-            )
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # Indiana Card
-        st.markdown("<div class='mobile-card'><div class='card-header'>Indiana Portions (oz)</div>", unsafe_allow_html=True)
-        for r_name in RECIPE_DATA.keys():
-            st.session_state.indy_portions[r_name] = st.number_input(
-                f"{r_name} default daily portion:",
-                min_value=0.0,
-                value=float(st.session_state.indy_portions[r_name]),
-                step=0.5,
-                key=f"profile_indy_{r_name}"
-            )
-        st.markdown("</div>", unsafe_allow_html=True)
+    if not rotation_recipes or not len(profiles):
+        st.info("Pick at least one recipe and add a dog in the Profiles tab to plan a rotation.")
+        return
+
+    with profiling.section("rotation"):
+        plan = plan_rotation(profiles, int(weeks), Rotation(rotation_recipes, weeks_per_recipe, stagger))
+
+    # Week-by-week schedule; one column per dog while there are only a few
+    mobile_card("Schedule")
+    schedule = {"Week": [], "Cook (oz/day)": []}
+    show_dogs = len(plan.dogs) <= MAX_PORTION_INPUTS
+    if show_dogs:
+        schedule.update((dog, []) for dog in plan.dogs)
+    for week in range(plan.weeks):
+        schedule["Week"].append(week + 1)
+        schedule["Cook (oz/day)"].append(", ".join(f"{name} {oz:.1f}" for name, oz, _ in plan.batches(week)))
+        if show_dogs:
+            for dog in plan.dogs:
+                schedule[dog].append(plan.recipe_for(dog, week) or "—")
+    render_table(schedule)
+
+    mobile_card("Ingredients")
+    period = st.selectbox(
+        "Show ingredients for:",
+        [f"All {plan.weeks} weeks"] + [f"Week {week + 1}" for week in range(plan.weeks)],
+        key="rot_period",
+    )
+    week = None if period.startswith("All") else int(period.split()[-1]) - 1
+    shop_table = {"Ingredient": [], "Amount": [], "Recipes": []}
+    for name, amount, unit, recipes in plan.shopping_list(week):
+        shop_table["Ingredient"].append(name)
+        shop_table["Amount"].append(f"{amount:.2f} {unit}")
+        shop_table["Recipes"].append(", ".join(recipes))
+    render_table(shop_table)
+
+
+# --------------------------------------------------------
+# TAB 2: RECIPES LIBRARY
+# --------------------------------------------------------
+@st.fragment
+@profiled_fragment("tab.recipes")
+def clean_recipes_tab():
+    st.markdown("### JFFD Recipes Info")
+    nutrition = get_nutrition()
+    for r_name, r_info in RECIPE_DATA.items():
+        with st.expander(f"📚 {r_name} Recipe"):
+            st.write(f"**Original Base Intake (Dex + Indy):** {r_info['base_daily_oz']} oz/day")
+            st.write(f"**Calibrated 7-day batch ingredients:**")
+            for ing in r_info["ingredients"]:
+                st.write(f"- {ing['name']}: **{ing['base_7day_amount']:.3f} {ing['unit']}**")
+            if nutrition is not None and r_name in nutrition.book.index:
+                per_oz = nutrition.recipe(r_name)
+                st.caption("Per oz of food: " + " · ".join(f"{amount:.1f} {name}" for name, amount in per_oz.items()))
+
+    # PyArrow is only loaded once the history is opened
+    if st.checkbox("📈 Show plan history", key="history_show", persist_state="page"):
+        clean_plan_history()
+
+
+def clean_plan_history():
+    st.markdown("### Plan History 📈")
+    get_history_writer().flush()
+    history = PlanHistory(HISTORY_PATH)
+
+    ingredients = sorted({name for name, _ in default_index().keys})
+    ingredient = st.selectbox("Ingredient:", ingredients, key="history_ingredient")
+    with profiling.section("plan_history"):
+        by_month = history.ingredient_by_month(ingredient)
+        summary = history.recipe_summary()
+    if not summary:
+        st.write("No plans recorded yet.")
+        return
+
+    if by_month:
+        months = {"Month": [], "Amount": [], "Plans": []}
+        for month, dimension, amount, plans in by_month:
+            unit, factor = DISPLAY_UNITS[dimension][0]
+            months["Month"].append(month)
+            months["Amount"].append(f"{amount / factor:.2f} {unit}")
+            months["Plans"].append(plans)
+        render_table(months)
+    else:
+        st.write(f"No recorded plan uses {ingredient}.")
+
+    render_table({
+        "Recipe": [recipe for recipe, *_ in summary],
+        "Plans": [plans for _, plans, *_ in summary],
+        "Avg scale": [f"{scale:.2f}x" for _, _, scale, _, _ in summary],
+        "Avg oz/day": [f"{oz:.1f}" for *_, oz, _ in summary],
+        "Avg days": [f"{days:.1f}" for *_, days in summary],
+    })
+    st.caption("Every plan a calculator shows is recorded once, with its ingredient totals, under DIMEAL_HISTORY.")
+
+
+# --------------------------------------------------------
+# TAB 3: DOGS PROFILE
+# --------------------------------------------------------
+def apply_profile_edits(editor_key):
+    import pandas as pd
+
+    # Fold the grid's edits into the store, then start a fresh grid from it
+    changes = st.session_state[editor_key]
+    profiles = get_profiles().copy()
+    frame = profiles.to_frame()
+
+    for row, edits in changes["edited_rows"].items():
+        for column, value in edits.items():
+            frame.at[row, column] = value
+    frame = frame.drop(index=changes["deleted_rows"])
+    if changes["added_rows"]:
+        frame = pd.concat([frame, pd.DataFrame(changes["added_rows"])], ignore_index=True)
+
+    profiles.replace(frame.set_index(DOG_COLUMN))
+    save_profiles(profiles)
+
+
+@st.fragment
+@profiled_fragment("tab.profiles")
+def clean_profiles_tab():
+    st.markdown("### Dog Profiles 🐶")
+    st.write("Customize default daily food portions (oz) for each dog. Add or delete rows to manage dogs. Changes update the calculator defaults dynamically.")
+
+    profiles = get_profiles()
+    editor_key = f"profile_grid_{st.session_state.get('profile_grid_version', 0)}"
+    column_config = {
+        DOG_COLUMN: st.column_config.TextColumn(DOG_COLUMN, required=True),
+        **{
+            r_name: st.column_config.NumberColumn(f"{r_name} (oz)", min_value=0.0, step=0.5, format="%.1f")
+            for r_name in profiles.recipe_names
+        },
+    }
+    st.data_editor(
+        profiles.to_frame(),
+        key=editor_key,
+        column_config=column_config,
+        num_rows="dynamic",
+        hide_index=True,
+        width="stretch",
+        on_change=apply_profile_edits,
+        args=(editor_key,),
+    )
+    st.caption(f"{len(profiles)} dog(s)")
+
+    # The calorie editor is a second grid, so it only renders when opened
+    if len(profiles) and st.toggle("🔥 Set portions from calorie targets", key="calorie_targets_open"):
+        nutrition = get_nutrition()
+        if nutrition is not None:
+            clean_calorie_targets(profiles, nutrition)
+
+
+def get_nutrition():
+    try:
+        return default_nutrient_profile()
+    except (OSError, NutrientError) as exc:
+        st.warning(f"Could not load nutrient data: {exc}")
+        return None
+
+
+def apply_calorie_targets(dogs, targets):
+    # Solve every dog's daily oz of every recipe from its kcal/day at once
+    nutrition = default_nutrient_profile()
+    portions = nutrition.solve_portions([[kcal] for kcal in targets])
+    profiles = get_profiles().copy()
+    profiles.assign(dogs, nutrition.book.names, portions)
+
+    store = get_state_store()
+    for dog, kcal in zip(dogs, targets):
+        store.set("calories", dog, kcal)
+    save_profiles(profiles)
+
+
+def clean_calorie_targets(profiles, nutrition):
+    import pandas as pd
+
+    st.write("Enter each dog's daily calories and every recipe's portion is recalculated to match.")
+
+    # Start from saved targets, or what each dog eats today on the first recipe
+    saved = get_state_store().get_scope("calories")
+    first = profiles.recipe_names[0] if profiles.recipe_names else None
+    kcal_per_oz = nutrition.recipe(first)["kcal"] if first in nutrition.book.index else 0.0
+    targets = [saved.get(dog, round(profiles.portion(dog, first) * kcal_per_oz)) for dog in profiles.dogs]
+
+    edited = st.data_editor(
+        pd.DataFrame({DOG_COLUMN: profiles.dogs, "kcal/day": targets}),
+        key=f"calorie_grid_{st.session_state.get('profile_grid_version', 0)}",
+        column_config={
+            DOG_COLUMN: st.column_config.TextColumn(DOG_COLUMN, disabled=True),
+            "kcal/day": st.column_config.NumberColumn("kcal/day", min_value=0.0, step=10.0, format="%.0f"),
+        },
+        hide_index=True,
+        width="stretch",
+    )
+    st.button(
+        "Set portions for every recipe",
+        key="calorie_apply",
+        on_click=apply_calorie_targets,
+        args=(edited[DOG_COLUMN].tolist(), edited["kcal/day"].fillna(0.0).astype(float).tolist()),
+    )
 
-    # --------------------------------------------------------
-    # TAB 4: PREP GUIDE
-    # --------------------------------------------------------
-    with tab_guide:
-        st.markdown("### Meal Prep Checklist 🍳")
-        st.write("Keep track of your JFFD DIY batch cooking steps:")
+    # Rough maintenance estimate for dogs without a vet's number
+    col_weight, col_activity = st.columns(2)
+    weight = col_weight.number_input("Estimate from weight (lb):", min_value=1.0, value=50.0, step=1.0, key="kcal_weight")
+    activity = col_activity.selectbox("Activity:", list(ACTIVITY_FACTORS), index=2, key="kcal_activity")
+    st.caption(f"≈ {float(daily_calories(weight, activity)):.0f} kcal/day ({ACTIVITY_FACTORS[activity]} × 70 × kg^0.75)")
+
+
+# --------------------------------------------------------
+# TAB 4: PREP GUIDE
+# --------------------------------------------------------
+@st.fragment
+@profiled_fragment("tab.guide")
+def clean_guide_tab():
+    st.markdown("### Meal Prep Checklist 🍳")
+    st.write("Keep track of your JFFD DIY batch cooking steps:")
+
+    for key, label in PREP_CHECKLIST:
+        on_change, args = (freeze_checked, ()) if key == "ch_freeze" else (save_widget, ("checklist", key))
+        st.checkbox(label, key=key, persist_state="page", on_change=on_change, args=args)
+
+    st.info("💡 **Nutrient Blend Tip:** Always make sure foods are cool before adding JFFD DIY Nutrient Blend to preserve vitamins.")
+
+    if st.checkbox("🕒 Plan the cooking order", key="guide_timeline", persist_state="page"):
+        clean_cook_timeline()
+
+    if st.checkbox("📦 Plan freezer containers", key="guide_packing", persist_state="page"):
+        clean_packing()
+
+    clean_freezer()
+
+
+# --------------------------------------------------------
+# Cook Timeline
+# --------------------------------------------------------
+def cook_day_plans():
+    # Every recipe with days in the Shopping tab, or else the calculator's batch
+    combined = get_profiles().combined_daily_oz()
+    plans = []
+    for r_name in RECIPE_DATA.keys():
+        r_days = st.session_state.get(f"shop_days_{r_name}")
+        if r_days and combined.get(r_name, 0.0) > 0:
+            plans.append((r_name, float(combined[r_name]), r_days))
+    if not plans and st.session_state.get("freezer_batch") is not None:
+        recipe_name, total_daily_oz, days, _ = st.session_state.freezer_batch
+        plans.append((recipe_name, total_daily_oz, days))
+    return plans
+
+
+def clock(minutes):
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def clean_cook_timeline():
+    plans = cook_day_plans()
+    if not plans:
+        st.info("Set days in the Shopping tab (or open the Calculator) to plan a cook day.")
+        return
+    st.caption("Cooking " + ", ".join(f"{r_name} ({days} days)" for r_name, _, days in plans) + ".")
+
+    col_burners, col_ovens, col_pots, col_bowls = st.columns(4)
+    kitchen = Kitchen(
+        burners=col_burners.number_input("Burners", min_value=0, value=4, step=1, key="timeline_burners", persist_state="page"),
+        ovens=col_ovens.number_input("Ovens", min_value=0, value=1, step=1, key="timeline_ovens", persist_state="page"),
+        pots=col_pots.number_input("Pots", min_value=0, value=3, step=1, key="timeline_pots", persist_state="page"),
+        bowls=col_bowls.number_input("Bowls", min_value=0, value=1, step=1, key="timeline_bowls", persist_state="page"),
+    )
+    try:
+        with profiling.section("cook_timeline"):
+            timeline = plan_cook_day(plans, kitchen)
+    except KitchenError as exc:
+        st.warning(str(exc))
+        return
+
+    rows = timeline.rows()
+    render_table({
+        "Time": [f"{clock(start)}–{clock(end)}" for start, end, _, _ in rows],
+        "Step": [label for _, _, label, _ in rows],
+        "Where": [where for *_, where in rows],
+    })
+    st.markdown(
+        f"**Done in {clock(timeline.makespan)}** (h:mm); no order can take less than {clock(timeline.lower_bound)}."
+    )
+    st.caption("Food cools on the counter before the Nutrient blend, oils and raw additions are mixed in.")
+
+
+# --------------------------------------------------------
+# Freezer Containers
+# --------------------------------------------------------
+def clean_packing():
+    batch = st.session_state.get("freezer_batch")
+    if batch is None:
+        st.info("Open the Calculator to portion a batch into containers.")
+        return
+    recipe_name, _, days, _ = batch
+    profiles = get_profiles()
+
+    col_meals, col_most, col_shelf = st.columns(3)
+    meals_per_day = col_meals.number_input(
+        "Meals per day", min_value=1, value=DEFAULT_MEALS_PER_DAY, step=1, key="packing_meals", persist_state="page"
+    )
+    most = col_most.number_input(
+        "Meals per container (0 = any)", min_value=0, value=0, step=1, key="packing_most", persist_state="page"
+    )
+    shelf_oz = col_shelf.number_input(
+        "Freezer shelf (oz, 0 = no limit)", min_value=0.0, value=0.0, step=16.0, key="packing_shelf", persist_state="page"
+    )
+    containers = []
+    for col, (label, size, _) in zip(st.columns(len(DEFAULT_CONTAINERS)), DEFAULT_CONTAINERS):
+        on_hand = col.number_input(
+            f"{label} on hand (-1 = plenty)", min_value=-1, value=-1, step=1,
+            key=f"packing_{label}", persist_state="page",
+        )
+        containers.append((label, size, None if on_hand < 0 else on_hand))
+
+    meals = dog_meals([(dog, profiles.portion(dog, recipe_name)) for dog in profiles.dogs], days, meals_per_day)
+    try:
+        with profiling.section("packing"):
+            plan = pack_meals(meals, containers, shelf_oz=shelf_oz or None, max_meals=most or None)
+    except PackingError as exc:
+        st.warning(str(exc))
+        return
+
+    st.caption(f"{recipe_name}, {days} days at {meals_per_day} meals a day.")
+    rows = plan.rows()
+    render_table({
+        "Dog": [dog for dog, *_ in rows],
+        "Container": [label for _, label, *_ in rows],
+        "Count": [count for _, _, count, _, _ in rows],
+        "Meals each": [meals for *_, meals, _ in rows],
+        "Oz each": [f"{oz:.1f}" for *_, oz in rows],
+    })
+    wasted = plan.waste / plan.volume * 100 if plan.volume else 0.0
+    st.markdown(
+        f"**{plan.count} containers** (no packing needs fewer than {plan.bound}), "
+        f"{plan.waste:.1f} oz of empty space ({wasted:.0f}%)."
+    )
+    if shelf_oz:
+        st.caption(f"Fits the freezer shelf: {plan.volume:.0f} of {shelf_oz:.0f} oz of containers.")
+    if plan.unpacked:
+        st.warning(f"{plan.unpacked} meals do not fit the containers on hand.")
+
+
+# --------------------------------------------------------
+# Freezer Inventory
+# --------------------------------------------------------
+# Cook again this many days before the freezer is empty
+FREEZER_LEAD_DAYS = 1
+
+
+def freeze_checked():
+    # Ticking the freeze step logs the calculator's batch, once per batch
+    # and day however often the box is ticked again
+    save_widget("checklist", "ch_freeze")
+    batch = st.session_state.get("freezer_batch")
+    if st.session_state.ch_freeze and batch is not None:
+        recipe_name, total_daily_oz, days, scale_factor = batch
+        store = get_state_store()
+        logged = [recipe_name, total_daily_oz, days, datetime.date.today().isoformat()]
+        if store.get("freezer", "last_logged") != logged:
+            store.record_batch(recipe_name, total_daily_oz * days, scale_factor)
+            store.set("freezer", "last_logged", logged)
+
+
+def log_meals(recipe_name, day):
+    profiles = get_profiles()
+    get_state_store().record_meals(recipe_name, [(dog, profiles.portion(dog, recipe_name)) for dog in profiles.dogs], day)
+
+
+def clean_freezer():
+    st.markdown("### Freezer 🧊")
+    batch = st.session_state.get("freezer_batch")
+    if batch is not None:
+        recipe_name, total_daily_oz, days, _ = batch
+        st.caption(
+            f"Ticking step 6 adds the calculator's batch to the freezer once: "
+            f"{recipe_name}, {total_daily_oz * days:.1f} oz for {days} days."
+        )
 
-        st.checkbox("🛒 1. Shop for ingredients (proteins, veggies, starch, oils, nutrients)", key="ch_shop")
-        st.checkbox("🍗 2. Weigh & cook protein (e.g. Ground Turkey, Chicken Thighs)", key="ch_cook")
-        st.checkbox("🍚 3. Steam/boil carbohydrates (Rice, Sweet Potatoes, or Pasta)", key="ch_carbs")
-        st.checkbox("🥦 4. Puree or steam vegetables (Carrots, Broccoli, Zucchini, etc.)", key="ch_veggies")
-        st.checkbox("🥣 5. Mix all cooked ingredients, oils, and nutrients thoroughly in a large bowl", key="ch_mix")
-        st.checkbox("📦 6. Portion out daily/weekly amounts into containers and freeze", key="ch_freeze")
+    store = get_state_store()
+    stock = store.freezer_stock()
+    if not stock:
+        st.write("Nothing logged yet.")
+    else:
+        outlook = forecast({name: on_hand for name, (on_hand, _) in stock.items()}, get_profiles().combined_daily_oz())
+        render_table({
+            "Recipe": [name for name, *_ in outlook.rows],
+            "On hand": [f"{on_hand:.1f} oz ({on_hand / 16:.1f} lbs)" for _, on_hand, *_ in outlook.rows],
+            "Days left": [f"{days:.1f}" if days is not None else "–" for *_, days, _ in outlook.rows],
+            "Runs out": [f"{runs_out:%a %d %b}" if runs_out else "–" for *_, runs_out in outlook.rows],
+            "Last cooked": [stock[name][1] or "–" for name, *_ in outlook.rows],
+        })
+        st.markdown(
+            f"**Next prep by {outlook.next_prep(FREEZER_LEAD_DAYS):%a %d %b}**: "
+            f"{outlook.total_days:.1f} days of food if the recipes are fed in turn."
+        )
+
+    col_recipe, col_day = st.columns(2)
+    meal_recipe = col_recipe.selectbox("Fed from the freezer:", list(RECIPE_DATA.keys()), key="freezer_meal_recipe")
+    meal_day = col_day.date_input("On:", key="freezer_meal_day")
+    st.button(
+        "🍽️ Log a day of meals (every dog's portion)",
+        key="freezer_log_meals",
+        on_click=log_meals,
+        args=(meal_recipe, meal_day),
+    )
+
+    with st.expander("Ledger"):
+        entries = store.freezer_ledger()
+        if entries:
+            render_table({
+                "Day": [day for day, *_ in entries],
+                "Entry": [
+                    {"cooked": "🍳 cooked", "eaten": f"🍽️ {dog}", "carried": "📦 carried forward"}.get(kind, kind)
+                    for _, kind, _, dog, _, _ in entries
+                ],
+                "Recipe": [recipe for _, _, recipe, *_ in entries],
+                "Oz": [f"{oz:+.1f}" for *_, oz, _ in entries],
+            })
 
-        st.info("💡 **Nutrient Blend Tip:** Always make sure foods are cool before adding JFFD DIY Nutrient Blend to preserve vitamins.")
 
 # -------------------------------------------------------------------
 # ROUTING
 # -------------------------------------------------------------------
-if st.session_state.app_version == "clean":
-    show_clean_version()
-else:
-    show_original_version()
+try:
+    with traced_run(), profiling.section(f"render.{st.session_state.app_version}"):
+        if st.session_state.app_version == "clean":
+            show_clean_version()
+        else:
+            show_original_version()
+finally:
+    if rerun_profile is not None:
+        end_profile(*rerun_profile)
+        show_profile_panel(rerun_profile[0])
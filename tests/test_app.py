@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from streamlit.testing.v1 import AppTest
+
+from dimeal.recipes import RECIPE_DATA
+from dimeal.storage import StateStore
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+CALCULATOR_TAB = "⚖️ Calculator"
+PREP_TAB = "🍳 Prep Guide"
+SHOPPING_TAB = "🛒 Shopping"
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setenv("DIMEAL_DB", str(tmp_path / "dimeal.db"))
+    monkeypatch.setenv("DIMEAL_HISTORY", str(tmp_path / "history"))
+
+    def start(visitor, tab=CALCULATOR_TAB, version="clean"):
+        at = AppTest.from_file(APP, default_timeout=30)
+        at.query_params["visitor"] = visitor
+        at.session_state["app_version"] = version
+        at.session_state["clean_tab"] = tab
+        at.run()
+        assert not at.exception
+        return at
+
+    return start
+
+
+def saved(at, key):
+    return at.session_state[key] if key in at.session_state else None
+
+
+def test_visitors_keep_their_own_state(session):
+    first = session("a" * 16)
+    first.session_state["clean_tab"] = CALCULATOR_TAB
+    first.selectbox(key="clean_recipe_select").set_value("Beef").run()
+    first.session_state["clean_tab"] = PREP_TAB
+    first.run()
+    first.session_state["clean_tab"] = PREP_TAB
+    first.checkbox(key="ch_cook").check().run()
+    assert not first.exception
+
+    other = session("b" * 16, PREP_TAB)
+    assert saved(other, "clean_recipe_select") != "Beef"
+    assert not other.checkbox(key="ch_cook").value
+
+    again = session("a" * 16, PREP_TAB)
+    assert saved(again, "clean_recipe_select") == "Beef"
+    assert again.checkbox(key="ch_cook").value
+
+
+@pytest.mark.parametrize("version, key", [("original", "orig_recipe_select"), ("clean", "clean_recipe_select")])
+def test_saved_recipe_no_longer_in_catalog(session, tmp_path, version, key):
+    store = StateStore(tmp_path / "dimeal.db")
+    store.set(f"plan:{'c' * 16}", key, "Retired Recipe")
+    store.set(f"plan:{'c' * 16}", "rot_recipes", ["Retired Recipe", "Beef"])
+    store.close()
+
+    at = session("c" * 16, version=version)
+    assert at.selectbox(key=key).value == list(RECIPE_DATA)[0]
+
+
+def test_pantry_days_tell_unlimited_from_unknown(session):
+    at = session("e" * 16, SHOPPING_TAB)
+    at.checkbox(key="shop_pantry").check().run()
+    at.multiselect(key="pantry_items").set_value(["Ground Beef (lbs)"]).run()
+    at.number_input(key="pantry_Ground Beef_weight").set_value(10).run()
+    assert not at.exception
+    table = next(block.value for block in at.markdown if "(days)" in block.value)
+    rows = {line.split(" | ")[0].strip("| "): line for line in table.splitlines()[2:]}
+    assert "| unlimited |" in rows["Chicken"]
+    assert "unlimited" not in rows["Beef"] and "–" not in rows["Beef"]
@@ -0,0 +1,67 @@
+import threading
+
+from dimeal.cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1   # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_put_refreshes_an_existing_key():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10 and cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_build_only_builds_on_a_miss():
+    cache = LRUCache(4)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_build("k", build) == "value"
+    assert cache.get_or_build("k", build) == "value"
+    assert len(calls) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_clear_keeps_counters():
+    cache = LRUCache(4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (0, 1, 1)
+
+
+def test_counts_are_exact_across_threads():
+    cache = LRUCache(8)
+    for key in range(8):
+        cache.put(key, key)
+
+    def work():
+        for i in range(1024):
+            cache.get(i % 16)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4096, 4096)
+    assert stats["size"] == 8
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from dimeal.catalog import DEFAULT_DIRECTORY, CatalogError, CatalogMapping, RecipeCatalog
+
+SIMPLE = """\
+version = 1
+base_daily_oz = 10.0
+dex_default = 6.0
+indy_default = 4.0
+base_days = 7.0
+ingredients = [{ name = "Oats", base_7day_amount = 14.0, unit = "oz" }]
+"""
+
+
+@pytest.fixture
+def directory(tmp_path):
+    path = tmp_path / "recipes"
+    shutil.copytree(DEFAULT_DIRECTORY, path)
+    return path
+
+
+@pytest.fixture
+def catalog(directory):
+    return RecipeCatalog(directory, check_interval=0)
+
+
+def write(path, text):
+    """Write ``text`` and move the mtime on, so the change shows even within one clock tick."""
+    before = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+def test_lists_in_manifest_order(catalog, directory):
+    assert catalog.names() == ("Chicken", "Turkey", "Beef", "Fish")
+    write(directory / "Apple.toml", SIMPLE)
+    assert catalog.names() == ("Chicken", "Turkey", "Beef", "Fish", "Apple")
+    assert catalog.recipe("Apple")["ingredients"][0]["name"] == "Oats"
+
+
+def test_recipes_are_read_only(catalog):
+    recipe = catalog.recipe("Chicken")
+    assert recipe["base_daily_oz"] == recipe.base_daily_oz == 36.0
+    with pytest.raises(AttributeError):
+        recipe.base_daily_oz = 1.0
+    with pytest.raises(KeyError):
+        catalog.recipe("Gravel")
+
+
+def test_recipes_load_on_first_use(catalog, directory):
+    # A broken file is listed without being read; it only fails when asked for
+    write(directory / "Broken.toml", "base_daily_oz = [")
+    assert "Broken" in catalog.names()
+    assert not catalog.errors
+    with pytest.raises(CatalogError):
+        catalog.recipe("Broken")
+    assert str(directory / "Broken.toml") in catalog.errors
+    # ... and the combined book leaves it out
+    assert "Broken" not in catalog.book().names
+
+
+def test_edits_are_picked_up(catalog, directory):
+    path = directory / "Chicken.toml"
+    generation = catalog.generation
+    assert catalog.recipe("Chicken")["base_daily_oz"] == 36.0
+    old_book = catalog.book()
+
+    write(path, path.read_text(encoding="utf-8").replace("base_daily_oz = 36.0", "base_daily_oz = 40.0"))
+    assert catalog.generation > generation
+    assert catalog.recipe("Chicken")["base_daily_oz"] == 40.0
+    assert catalog.book() is not old_book
+    assert catalog.recipe_book("Chicken").base_daily_oz[0] == 40.0
+
+    os.remove(path)
+    assert "Chicken" not in catalog
+    with pytest.raises(KeyError):
+        catalog.recipe("Chicken")
+
+
+def test_check_interval_delays_the_rescan(directory):
+    catalog = RecipeCatalog(directory, check_interval=3600)
+    catalog.names()
+    write(directory / "Apple.toml", SIMPLE)
+    assert "Apple" not in catalog
+    catalog.refresh(force=True)
+    assert "Apple" in catalog
+
+
+def test_a_broken_edit_keeps_the_last_good_version(catalog, directory):
+    path = directory / "Beef.toml"
+    good = catalog.recipe("Beef")
+    write(path, "this is = not [ toml")
+    assert catalog.recipe("Beef") is good
+    assert "Beef.toml" in catalog.errors[str(path)]
+
+    write(path, SIMPLE)
+    assert catalog.recipe("Beef")["base_daily_oz"] == 10.0
+    assert not catalog.errors
+
+
+@pytest.mark.parametrize("text, message", [
+    ("base_daily_oz = [", "Invalid"),
+    (SIMPLE.replace("version = 1", "version = 2"), "unsupported format version"),
+    (SIMPLE.replace("base_days = 7.0\n", ""), "missing field 'base_days'"),
+    (SIMPLE.replace("base_daily_oz = 10.0", "base_daily_oz = 0.0"), "base_daily_oz must be positive"),
+    (SIMPLE.replace("dex_default = 6.0", 'dex_default = "six"'), "dex_default must be a number"),
+    (SIMPLE.replace("dex_default = 6.0", "dex_default = true"), "dex_default must be a number"),
+    (SIMPLE.replace("base_7day_amount = 14.0", "base_7day_amount = -1.0"), "must be non-negative"),
+    (SIMPLE.replace(', unit = "oz"', ""), "ingredient 0 is missing unit"),
+    (SIMPLE.split("ingredients")[0] + "ingredients = []\n", "ingredients must be a non-empty list"),
+])
+def test_malformed_toml_raises(catalog, directory, text, message):
+    write(directory / "Bad.toml", text)
+    with pytest.raises(CatalogError, match=message):
+        catalog.recipe("Bad")
+
+
+def test_json_and_parquet_recipes(catalog, directory):
+    write(directory / "Json.json", json.dumps({
+        "version": 1, "base_daily_oz": 10, "dex_default": 6, "indy_default": 4, "base_days": 7,
+        "ingredients": [{"name": "Oats", "base_7day_amount": 14, "unit": "oz"}],
+    }))
+    write(directory / "Broken.json", "[1, 2]")
+    pq.write_table(pa.table({
+        "recipe": ["Stew", "Stew", "Mash"],
+        "version": [1, 1, 1],
+        "base_daily_oz": [20.0, 20.0, 12.0],
+        "dex_default": [12.0, 12.0, 7.0],
+        "indy_default": [8.0, 8.0, 5.0],
+        "base_days": [7.0, 7.0, 3.0],
+        "ingredient": ["Beef", "Carrots", "Potatoes"],
+        "base_7day_amount": [40.0, 10.0, 9.0],
+        "unit": ["oz", "oz", "oz"],
+    }), directory / "more.parquet")
+
+    assert catalog.recipe("Json")["ingredients"][0]["base_7day_amount"] == 14.0
+    with pytest.raises(CatalogError, match="expected a table"):
+        catalog.recipe("Broken")
+    stew = catalog.recipe("Stew")
+    assert [i["name"] for i in stew["ingredients"]] == ["Beef", "Carrots"]
+    assert catalog.recipe("Mash")["base_days"] == 3.0
+    assert "Stew" in catalog.recipes_with("Carrots")
+
+
+def test_a_recipe_defined_twice_is_reported(catalog, directory):
+    write(directory / "Chicken.json", json.dumps({}))
+    assert "Chicken" in catalog
+    assert "already defined" in catalog.errors[str(directory / "Chicken.toml")]
+
+
+def test_mapping_view(catalog, directory):
+    recipes = CatalogMapping(catalog)
+    assert list(recipes) == list(catalog.names())
+    assert len(recipes) == 4 and "Fish" in recipes
+    write(directory / "Apple.toml", SIMPLE)
+    assert recipes["Apple"]["base_days"] == 7.0
@@ -0,0 +1,55 @@
+import io
+import math
+
+import pytest
+
+from dimeal.cli import PlanError, build_parser, read_chunks, scale_chunk
+
+HEADER = "household,recipe,days,total_daily_oz\n"
+
+
+def scale(text):
+    (first_line, rows), = read_chunks(io.StringIO(HEADER + text), 100)
+    return scale_chunk(first_line, rows)
+
+
+def test_scales_valid_rows():
+    out = scale("A,Beef,3,20\nB,Chicken,7,36\n")
+    assert set(out["household"]) == {"A", "B"}
+    assert all(math.isfinite(total) and total >= 0 for total in out["total"])
+
+
+@pytest.mark.parametrize("row, message", [
+    ("B,Beef,-3,20", "line 3: oz/day and days must be positive"),
+    ("B,Beef,nan,20", "line 3: oz/day and days must be positive"),
+    ("B,Beef,3,inf", "line 3: oz/day and days must be positive"),
+    ("B,Beef,3,0", "line 3: oz/day and days must be positive"),
+    ("B", "line 3: missing 'recipe'"),
+    ("B,Beef,3", "line 3: missing 'total_daily_oz'"),
+    ("B,Gravel,3,20", "line 3: unknown recipe"),
+    ("B,Beef,three,20", "line 3:"),
+])
+def test_rejects_bad_rows_with_line_number(row, message):
+    with pytest.raises(PlanError, match=message):
+        scale("A,Beef,3,20\n" + row + "\n")
+
+
+def test_rejects_negative_portion():
+    (first_line, rows), = read_chunks(io.StringIO("household,recipe,days,portions\nA,Beef,3,12;-5\n"), 10)
+    with pytest.raises(PlanError, match="line 2"):
+        scale_chunk(first_line, rows)
+
+
+@pytest.mark.parametrize("command", ["batch", "sheets"])
+@pytest.mark.parametrize("option", ["--chunk-size", "--workers"])
+@pytest.mark.parametrize("value", ["0", "-5", "two"])
+def test_counts_must_be_positive(capsys, command, option, value):
+    with pytest.raises(SystemExit) as exc:
+        build_parser().parse_args([command, "plans.csv", option, value])
+    assert exc.value.code == 2
+    assert option in capsys.readouterr().err
+
+
+def test_counts_accept_positive_values():
+    args = build_parser().parse_args(["batch", "plans.csv", "--chunk-size", "7", "--workers", "2"])
+    assert (args.chunk_size, args.workers) == (7, 2)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from dimeal.engine import default_book, scale_arrays, scale_batch, scale_recipe
+from dimeal.recipes import RECIPE_DATA
+
+
+def test_scale_batch_matches_calculator_arithmetic():
+    recipe = RECIPE_DATA["Chicken"]
+    batch = scale_batch([("Chicken", 36.0, 7)])
+    factor = (36.0 / recipe["base_daily_oz"]) * (7 / recipe["base_days"])
+    assert batch.scale_factor[0] == pytest.approx(factor)
+    for (name, unit, per_day, total), ingredient in zip(batch.ingredients(0), recipe["ingredients"]):
+        assert name == ingredient["name"]
+        assert total == pytest.approx(ingredient["base_7day_amount"] * factor)
+        assert per_day == pytest.approx(total / 7)
+
+
+def test_base_plan_scales_by_one():
+    recipe = RECIPE_DATA["Beef"]
+    batch = scale_recipe("Beef", recipe["base_daily_oz"], recipe["base_days"])
+    assert batch.scale_factor[0] == pytest.approx(1.0)
+
+
+def test_scale_arrays_agrees_with_scale_batch():
+    book = default_book()
+    requests = [("Chicken", 36.0, 7), ("Fish", 12.5, 30), ("Beef", 80.0, 1)]
+    batch = scale_batch(requests, book)
+    arrays = scale_arrays(book.recipe_indices([r for r, _, _ in requests]), [36.0, 12.5, 80.0], [7, 30, 1], book)
+    np.testing.assert_allclose(batch.totals, arrays.totals)
+    assert [batch.recipe_name(i) for i in range(len(batch))] == ["Chicken", "Fish", "Beef"]
+
+
+def test_scale_batch_empty_and_unknown():
+    assert len(scale_batch([])) == 0
+    with pytest.raises(KeyError):
+        scale_batch([("Gravel", 36.0, 7)])
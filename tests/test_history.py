@@ -0,0 +1,171 @@
+import datetime
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dimeal import history as history_module
+from dimeal.engine import default_book
+from dimeal.history import INGREDIENTS, PLANS, PlanHistory, PlanHistoryWriter, plan_tables
+
+INGREDIENT = "Chicken Thighs"
+
+
+def random_plans(count, seed=0):
+    rng = np.random.default_rng(seed)
+    names = default_book().names
+    months = [datetime.datetime(2026, month, 1) for month in (7, 8, 9)]
+    plans = []
+    for plan_id in range(1, count + 1):
+        start = months[int(rng.integers(len(months)))]
+        recorded = start + datetime.timedelta(minutes=int(rng.integers(0, 28 * 24 * 60)))
+        recipe = names[int(rng.integers(len(names)))]
+        plans.append((plan_id, recorded, recipe, "Dexter, Indiana", int(rng.integers(10, 160)) / 2, int(rng.integers(1, 31))))
+    return plans
+
+
+def reference(plans):
+    """Monthly Chicken Thighs pounds and mean scale factor per recipe, grouped in pandas."""
+    tables = plan_tables(plans)
+    ingredients = pd.concat(
+        [table.to_pandas().assign(month=month) for month, table in tables[INGREDIENTS].items()]
+    )
+    ingredients = ingredients[ingredients["ingredient"] == INGREDIENT]
+    pounds = (ingredients.groupby("month")["amount"].sum() / 16).to_dict()
+    scaled = pd.concat(table.to_pandas() for table in tables[PLANS].values())
+    return pounds, scaled.groupby("recipe")["scale_factor"].mean().to_dict(), len(scaled)
+
+
+def answers(root):
+    history = PlanHistory(root)
+    pounds = {month: amount / 16 for month, _, amount, _ in history.ingredient_by_month(INGREDIENT)}
+    summary = history.recipe_summary()
+    return pounds, {recipe: mean for recipe, _, mean, _, _ in summary}, sum(count for _, count, *_ in summary)
+
+
+def assert_matches(root, plans):
+    pounds, factors, count = answers(root)
+    want_pounds, want_factors, want_count = reference(plans)
+    assert count == want_count == len(plans)
+    assert pounds == pytest.approx(want_pounds)
+    assert factors == pytest.approx(want_factors)
+
+
+def part_count(root):
+    return sum(
+        len([name for name in files if name.startswith("part-")])
+        for _, _, files in os.walk(root)
+    )
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = PlanHistoryWriter(tmp_path, compact_parts=1000)
+    yield writer
+    writer.close()
+
+
+def write_in_batches(writer, plans, size=40):
+    for start in range(0, len(plans), size):
+        writer.write(plans[start:start + size])
+
+
+def test_answers_match_pandas(tmp_path, writer):
+    plans = random_plans(200)
+    write_in_batches(writer, plans)
+    assert part_count(tmp_path) == 2 * 3 * 5
+    assert_matches(tmp_path, plans)
+
+
+def test_compaction_keeps_the_answers(tmp_path, writer):
+    plans = random_plans(200)
+    write_in_batches(writer, plans)
+
+    writer.compact()
+    assert part_count(tmp_path) == 2 * 3
+    assert_matches(tmp_path, plans)
+
+    writer.compact()
+    assert part_count(tmp_path) == 2 * 3
+    assert_matches(tmp_path, plans)
+
+
+def test_compacting_one_month(tmp_path, writer):
+    plans = random_plans(200)
+    write_in_batches(writer, plans)
+    writer.compact("2026-08")
+    assert part_count(tmp_path / PLANS / "month=2026-08") == 1
+    assert part_count(tmp_path / PLANS / "month=2026-07") == 5
+    assert_matches(tmp_path, plans)
+
+
+def test_writes_compact_on_their_own(tmp_path):
+    writer = PlanHistoryWriter(tmp_path, compact_parts=3)
+    try:
+        plans = random_plans(300)
+        write_in_batches(writer, plans, size=30)
+        assert part_count(tmp_path) < 2 * 3 * 3
+        assert_matches(tmp_path, plans)
+    finally:
+        writer.close()
+
+
+def test_interrupted_compaction_is_finished_not_duplicated(tmp_path, writer, monkeypatch):
+    plans = random_plans(200)
+    write_in_batches(writer, plans)
+
+    # The merged files land but the old parts are never removed
+    monkeypatch.setattr(history_module.os, "remove", lambda path: None)
+    writer.compact()
+    monkeypatch.undo()
+    assert part_count(tmp_path) == 2 * 3 * 6
+    assert_matches(tmp_path, plans)
+
+    writer.compact()
+    assert part_count(tmp_path) == 2 * 3
+    assert_matches(tmp_path, plans)
+
+
+def test_compaction_waits_for_another_writer(tmp_path, writer):
+    plans = random_plans(200)
+    write_in_batches(writer, plans)
+    other = PlanHistoryWriter(tmp_path, compact_parts=1000)
+    folder = str(tmp_path / PLANS / "month=2026-07")
+    done = threading.Event()
+
+    def compact():
+        other.compact("2026-07")
+        done.set()
+
+    try:
+        # Stands in for a writer in another process holding the folder
+        with history_module._folder_lock(folder):
+            thread = threading.Thread(target=compact)
+            thread.start()
+            assert not done.wait(0.3)
+        thread.join(10)
+        assert done.is_set()
+        assert_matches(tmp_path, plans)
+    finally:
+        other.close()
+
+
+def test_record_and_flush(tmp_path):
+    writer = PlanHistoryWriter(tmp_path, max_rows=10, flush_interval=60)
+    try:
+        for recipe in default_book().names:
+            writer.record(recipe, "Dexter", 20, 7, recorded=datetime.datetime(2026, 10, 5))
+        writer.flush()
+        summary = PlanHistory(tmp_path).recipe_summary()
+        assert sorted(recipe for recipe, *_ in summary) == sorted(default_book().names)
+        assert writer.dropped == 0
+    finally:
+        writer.close()
+
+
+def test_unknown_recipes_are_dropped(tmp_path, writer):
+    writer.write([(1, datetime.datetime(2026, 10, 5), "Ostrich", "Dexter", 20, 7)])
+    assert PlanHistory(tmp_path).recipe_summary() == []
+    assert PlanHistory(tmp_path).ingredient_by_month(INGREDIENT) == []
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from dimeal.engine import scale_batch
+from dimeal.nutrition import NutrientData, NutrientError, NutrientProfile, daily_calories, default_nutrient_profile
+from dimeal.shopping import default_index
+
+TARGETS = [[650.0], [400.0], [1200.0]]
+
+
+@pytest.fixture
+def nutrition():
+    return default_nutrient_profile()
+
+
+def test_calorie_targets_are_met_exactly(nutrition):
+    oz = nutrition.solve_portions(TARGETS)
+    assert oz.shape == (3, len(nutrition.book))
+    kcal = nutrition.per_oz[:, nutrition.nutrients.index("kcal")]
+    np.testing.assert_allclose(oz * kcal, np.repeat(TARGETS, len(nutrition.book), axis=1))
+
+
+def test_solved_portions_feed_the_target_through_a_batch(nutrition):
+    oz = nutrition.solve_portions([[650.0]])[0]
+    batch = scale_batch([(name, oz[r], 7) for r, name in enumerate(nutrition.book.names)], nutrition.book)
+    per_day = nutrition.batch_per_day(batch)[:, nutrition.nutrients.index("kcal")]
+    np.testing.assert_allclose(per_day, 650.0)
+    np.testing.assert_allclose(nutrition.batch_totals(batch)[:, 0], 650.0 * 7)
+
+
+def test_several_targets_are_the_least_squares_fit(nutrition):
+    nutrients = ("kcal", "protein_g", "fat_g")
+    targets = np.array([[650.0, 60.0, 25.0], [400.0, 30.0, 20.0]])
+    oz = nutrition.solve_portions(targets, nutrients)
+    per_oz = nutrition.per_oz[:, [nutrition.nutrients.index(n) for n in nutrients]]
+    for d, target in enumerate(targets):
+        for r in range(len(nutrition.book)):
+            # One unknown: fit oz * per_oz[r] to target on relative error
+            expected = np.linalg.lstsq((per_oz[r] / target)[:, None], np.ones(len(target)), rcond=None)[0][0]
+            assert oz[d, r] == pytest.approx(expected)
+
+
+def test_no_solution_gives_zero(nutrition):
+    # A recipe with none of the targeted nutrient, and dogs with no target
+    data = NutrientData(["kcal", "vitamin_x"], [{"name": "Chicken Thighs", "per": "oz", "kcal": 30}])
+    profile = NutrientProfile(default_index(), data)
+    chicken = profile.book.index["Chicken"]
+    oz = profile.solve_portions([[500.0]])
+    assert oz[0, chicken] > 0
+    assert (np.delete(oz[0], chicken) == 0).all()
+    assert (profile.solve_portions([[0.0]]) == 0).all()
+    assert (profile.solve_portions([[-100.0]]) == 0).all()
+    assert (profile.solve_portions([[50.0]], ["vitamin_x"]) == 0).all()
+
+
+@pytest.mark.parametrize("targets, nutrients, message", [
+    ([[650.0]], ("vitamin_z",), "unknown nutrient .vitamin_z."),
+    ([[650.0, 40.0]], ("kcal",), "expected 1 targets per dog, got 2"),
+])
+def test_rejects_bad_targets(nutrition, targets, nutrients, message):
+    with pytest.raises(NutrientError, match=message):
+        nutrition.solve_portions(targets, nutrients)
+
+
+@pytest.mark.parametrize("foods, message", [
+    ([{"per": "oz", "kcal": 1}], "missing field 'name'"),
+    ([{"name": "Apple", "per": "handful", "kcal": 1}], "can't read per"),
+    ([{"name": "Apple", "per": "oz", "kcal": "lots"}], "food 0"),
+])
+def test_rejects_bad_nutrient_data(foods, message):
+    with pytest.raises(NutrientError, match=message):
+        NutrientData(["kcal"], foods)
+
+
+def test_per_units():
+    data = NutrientData(["kcal"], [{"name": "Apple", "per": "100 g", "kcal": 52}, {"name": "Omega", "per": "tbsp", "kcal": 120}])
+    assert data.values[("Apple", "weight")][0] == pytest.approx(52 * 28.349523125 / 100)
+    assert data.values[("Omega", "volume")][0] == pytest.approx(40.0)
+
+
+def test_daily_calories():
+    assert daily_calories(22.0462262) == pytest.approx(1.6 * 70 * 10 ** 0.75)
+    np.testing.assert_allclose(daily_calories([10, 50], "active") / daily_calories([10, 50], 1.0), 2.0)
@@ -0,0 +1,21 @@
+import pytest
+
+from dimeal.offline import build_offline_bundle
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"oz_step": 0},
+    {"oz_step": -0.5},
+    {"oz_step": float("nan")},
+    {"max_oz": float("inf")},
+    {"max_days": 0},
+])
+def test_rejects_bad_grid(kwargs):
+    with pytest.raises(ValueError, match="offline grid"):
+        build_offline_bundle(**kwargs)
+
+
+def test_small_grid():
+    bundle = build_offline_bundle(max_oz=2.0, oz_step=0.5, max_days=3)
+    assert bundle["oz_steps"] == 4 and bundle["max_days"] == 3
+    assert bundle["recipes"]
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from dimeal.packing import PackingError, dog_meals, pack_meals
+
+
+def check_plan(plan, meals):
+    """Every meal is packed once, in one of its dog's containers that holds it."""
+    assert (plan.load <= plan.capacity + 1e-6).all()
+    for d, dog in enumerate(plan.dogs):
+        meals_for_dog = [(oz, n) for name, oz, n in meals if name == dog]
+        assert plan.meals[plan.dog == d].sum() == sum(n for _, n in meals_for_dog)
+        assert plan.load[plan.dog == d].sum() == pytest.approx(sum(oz * n for oz, n in meals_for_dog))
+    assert plan.unpacked == 0
+    assert plan.count >= plan.bound
+
+
+def test_dog_meals():
+    assert dog_meals([("Dexter", 23.5), ("Indiana", 0)], 7) == [("Dexter", 11.75, 14)]
+
+
+def test_packs_at_the_bound():
+    meals = dog_meals([("Dexter", 23.5), ("Indiana", 14)], 7)
+    plan = pack_meals(meals)
+    check_plan(plan, meals)
+    assert plan.count == plan.bound
+    assert plan.unpacked == 0
+    assert sum(containers * each for _, _, containers, each, _ in plan.rows()) == 28
+
+
+def test_kennel_reaches_bound():
+    rng = np.random.default_rng(0)
+    meals = dog_meals([(f"Dog {i}", float(rng.integers(8, 60)) / 2) for i in range(100)], 14)
+    plan = pack_meals(meals)
+    check_plan(plan, meals)
+    assert plan.count == plan.bound
+
+
+def test_max_meals_per_container():
+    plan = pack_meals([("A", 2.0, 10)], max_meals=3)
+    assert plan.meals.max() <= 3
+    assert plan.count == 4
+
+
+def test_limited_containers_leave_meals_unpacked():
+    containers = (("8 oz", 8.0, 2), ("16 oz", 16.0, 0), ("32 oz", 32.0, 0))
+    plan = pack_meals([("A", 7.0, 5)], containers)
+    assert plan.count == 2 and plan.unpacked == 3
+    assert list(plan.used()) == [2, 0, 0]
+
+
+def test_shelf_limit_changes_the_plan():
+    containers = (("15 oz", 15.0, None), ("32 oz", 32.0, None))
+    meals = [("A", 5.0, 12)]
+    assert pack_meals(meals, containers).volume == 64.0
+    plan = pack_meals(meals, containers, shelf_oz=62)
+    assert plan.volume <= 62
+    with pytest.raises(PackingError, match="needs 60 oz"):
+        pack_meals(meals, containers, shelf_oz=59)
+
+
+@pytest.mark.parametrize("kwargs, meals", [
+    ({}, [("A", 40.0, 1)]),
+    ({"max_meals": 0}, [("A", 4.0, 1)]),
+    ({"shelf_oz": 0}, [("A", 4.0, 1)]),
+    ({"shelf_oz": float("nan")}, [("A", 4.0, 1)]),
+    ({}, [("A", float("nan"), 1)]),
+    ({"containers": (("none", 0.0, None),)}, [("A", 4.0, 1)]),
+])
+def test_rejects_bad_input(kwargs, meals):
+    with pytest.raises(PackingError):
+        pack_meals(meals, **kwargs)
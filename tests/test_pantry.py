@@ -0,0 +1,67 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from dimeal.pantry import PantryError, best_split, maximize_total, pantry_limits
+
+DAILY_OZ = [36.0, 30.0, 32.0, 37.5]
+
+
+def test_maximize_total_small_lp():
+    # x + y <= 4, x + 3y <= 6: every vertex with the largest sum has x + y = 4
+    x = maximize_total(np.array([[1.0, 1.0], [1.0, 3.0]]), np.array([4.0, 6.0]))
+    assert x.sum() == pytest.approx(4.0)
+    assert (x >= -1e-9).all()
+
+
+def test_maximize_total_matches_grid_search():
+    rng = np.random.default_rng(1)
+    A = rng.uniform(0.1, 2.0, size=(3, 2))
+    b = rng.uniform(1.0, 5.0, size=3)
+    x = maximize_total(A, b)
+    assert (A @ x <= b + 1e-7).all()
+    grid = np.linspace(0, 50, 501)
+    best = max(a + c for a, c in itertools.product(grid, grid) if (A @ [a, c] <= b + 1e-9).all())
+    assert x.sum() >= best - 0.1
+
+
+def test_limits_and_split():
+    pantry = {"Ground Beef": (10, "lbs"), "Russet Potatoes": (40, "oz")}
+    limits = pantry_limits(pantry, [DAILY_OZ, [22, 19, 20, 23.5]])
+    rows = dict((name, days) for name, days, _ in limits.rows(0))
+    assert isinstance(rows["Beef"], int) and rows["Chicken"] == math.inf
+    split = best_split(pantry, DAILY_OZ)
+    assert split.total_days == sum(days for _, days in split.rows())
+    for _, have, used, _, _ in split.stock_rows():
+        assert used <= have + 1e-9
+
+
+def test_recipes_a_configuration_does_not_eat():
+    limits = pantry_limits({"Ground Beef": (10, "lbs")}, [[0.0, 30.0, 32.0, 37.5]])
+    assert limits.rows(0)[0][1] is None
+
+
+def test_same_ingredient_by_weight_and_volume():
+    both = pantry_limits([("Sunflower Oil", 1, "lbs"), ("Sunflower Oil", 4, "tbsp")], DAILY_OZ)
+    assert both.listed.sum() == 2
+    by_weight = pantry_limits([("Sunflower Oil", 1, "lbs")], DAILY_OZ)
+    assert np.nanmin(both.days) <= np.nanmin(by_weight.days)
+
+
+def test_entries_add_up():
+    split = pantry_limits([("Ground Beef", 5, "lbs"), ("Ground Beef", 5, "lbs")], DAILY_OZ)
+    whole = pantry_limits({"Ground Beef": (10, "lbs")}, DAILY_OZ)
+    np.testing.assert_allclose(split.stock, whole.stock)
+
+
+@pytest.mark.parametrize("pantry, message", [
+    ([("Flaxseed Oil", 1, "lbs")], "list it by volume"),
+    ([("Gravel", 1, "lbs")], "No recipe uses Gravel"),
+    ([("Ground Beef", 1, "cups of")], "Unknown unit"),
+    ([("Ground Beef", -1, "lbs")], "zero or more"),
+])
+def test_rejects_bad_pantry(pantry, message):
+    with pytest.raises(PantryError, match=message):
+        pantry_limits(pantry, DAILY_OZ)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from dimeal.profiles import ProfileStore
+from dimeal.recipes import RECIPE_DATA
+
+RECIPES = ("Chicken", "Beef")
+
+
+def test_recipe_defaults():
+    profiles = ProfileStore.from_recipe_defaults()
+    assert profiles.dogs == ["Dexter", "Indiana"]
+    for name, recipe in RECIPE_DATA.items():
+        assert profiles.portion("Dexter", name) == recipe["dex_default"]
+        assert profiles.portion("Indiana", name) == recipe["indy_default"]
+    totals = profiles.combined_daily_oz()
+    assert totals["Chicken"] == pytest.approx(RECIPE_DATA["Chicken"]["dex_default"] + RECIPE_DATA["Chicken"]["indy_default"])
+
+
+def test_from_records_cleans_names_and_portions():
+    records = [
+        {"Dog": " Rex ", "Chicken": "12", "Beef": -3},
+        {"Dog": None, "Chicken": 5},
+        {"Dog": float("nan"), "Chicken": 5},
+        {"Dog": "", "Chicken": 5},
+        {"Dog": "Fido", "Chicken": float("nan"), "Beef": "lots"},
+        {"Dog": "Rex", "Chicken": 14},
+    ]
+    profiles = ProfileStore.from_records(records, RECIPES)
+    assert profiles.dogs == ["Fido", "Rex"]
+    assert profiles.portion("Rex", "Chicken") == 14
+    assert profiles.portion("Fido", "Beef") == 0
+    assert profiles.portion("Nobody", "Chicken", default=-1) == -1
+    assert profiles.portion("Rex", "Fish", default=-1) == -1
+
+
+def test_combined_daily_oz_for_some_dogs():
+    profiles = ProfileStore(["A", "B", "C"], [[1, 2], [3, 4], [5, 6]], RECIPES)
+    assert profiles.combined_daily_oz(["A", "C", "Missing"]) == {"Chicken": 6.0, "Beef": 8.0}
+    assert profiles.combined_daily_oz([]) == {"Chicken": 0.0, "Beef": 0.0}
+
+
+def test_edits():
+    profiles = ProfileStore(["A"], [[1, 2]], RECIPES)
+    profiles.set_portion("B", "Beef", 7)
+    profiles.assign(["B", "A", "Z"], ["Beef", "Fish", "Chicken"], [[9, 1, 8], [-1, 1, 3], [5, 5, 5]])
+    np.testing.assert_array_equal(profiles.portions, [[3, 0], [8, 9]])
+    with pytest.raises(KeyError):
+        profiles.set_portion("A", "Fish", 1)
+    profiles.remove_dogs(["A"])
+    assert profiles.dogs == ["B"]
+
+
+def test_frozen_store_is_read_only():
+    shared = ProfileStore.from_recipe_defaults().freeze()
+    with pytest.raises(ValueError, match="read-only"):
+        shared.set_portion("Dexter", "Chicken", 1)
+    with pytest.raises(ValueError):
+        shared.portions[0, 0] = 1
+    edited = shared.copy()
+    edited.set_portion("Dexter", "Chicken", 1)
+    assert edited.portion("Dexter", "Chicken") == 1
+    assert shared.portion("Dexter", "Chicken") == RECIPE_DATA["Chicken"]["dex_default"]
+
+
+def test_align_to_new_recipes():
+    profiles = ProfileStore(["Dexter", "Rex"], [[10, 20], [30, 40]], RECIPES)
+    data = {"Beef": RECIPE_DATA["Beef"], "Fish": RECIPE_DATA["Fish"]}
+    assert profiles.align(data)
+    assert profiles.recipe_names == ("Beef", "Fish")
+    np.testing.assert_array_equal(profiles.portions, [[20, RECIPE_DATA["Fish"]["dex_default"]], [40, 0]])
+    assert not profiles.align(data)
+
+
+def test_frame_round_trip():
+    profiles = ProfileStore(["A", "B"], [[1, 2], [3, 4]], RECIPES)
+    frame = profiles.frame.astype(object)   # as a grid editor hands it back
+    frame.loc["A", "Beef"] = "x"
+    frame.loc["C"] = [5, 6]
+    profiles.replace(frame)
+    assert profiles.dogs == ["A", "B", "C"]
+    np.testing.assert_array_equal(profiles.portions, [[1, 0], [3, 4], [5, 6]])
+    assert list(profiles.to_frame().columns) == ["Dog", *RECIPES]
+    assert profiles.to_arrow().column("Beef").to_pylist() == [0, 4, 6]
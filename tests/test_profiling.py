@@ -0,0 +1,91 @@
+import contextvars
+
+import pytest
+
+from dimeal import profiling
+from dimeal.profiling import NULL_SECTION, RERUN_BUCKETS, MetricsExporter, RerunProfile
+
+
+# Each test runs in its own context, so no current profile leaks between tests
+def in_context(test):
+    return contextvars.copy_context().run(test)
+
+
+def test_sections_are_no_ops_without_a_profile():
+    assert in_context(lambda: profiling.section("scale")) is NULL_SECTION
+
+
+def test_sections_nest_and_accumulate():
+    def run():
+        profile = profiling.start("fragment")
+        with profiling.section("outer"):
+            for _ in range(3):
+                with profiling.section("inner"):
+                    pass
+        with profiling.section("outer"):
+            pass
+        profiling.stop(profile)
+        assert profiling.current() is None
+        return profile
+
+    profile = in_context(run)
+    rows = profile.rows()
+    assert [(name, calls) for name, _, calls in rows] == [("outer", 2), ("inner", 3)]
+    assert rows[0][1] >= rows[1][1] >= 0
+    assert profile.seconds * 1000 >= rows[0][1]
+    assert profile.elements is None
+
+
+def test_stop_only_clears_its_own_profile():
+    def run():
+        first = profiling.start()
+        second = profiling.start()
+        profiling.stop(first)
+        return profiling.current() is second
+
+    assert in_context(run)
+
+
+def finished(kind, seconds, sections=(), elements=None):
+    profile = RerunProfile(kind)
+    for name, ms in sections:
+        profile.add(name, ms / 1000)
+    profile.seconds = seconds
+    profile.elements = elements
+    return profile
+
+
+def test_metrics_render(tmp_path):
+    exporter = MetricsExporter(tmp_path / "dimeal.prom", interval=3600)
+    exporter.record(finished("full", 0.02, [("scale", 5)], elements=10))
+    exporter.record(finished("full", 3.0, [("scale", 7)]))
+    exporter.record(finished('tab "x"', 0.001))
+    text = exporter.render()
+
+    lines = dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+    assert lines['dimeal_rerun_seconds_bucket{kind="full",le="0.025"}'] == "1"
+    assert lines['dimeal_rerun_seconds_bucket{kind="full",le="5.0"}'] == "2"
+    assert lines['dimeal_rerun_seconds_bucket{kind="full",le="+Inf"}'] == "2"
+    assert float(lines['dimeal_rerun_seconds_sum{kind="full"}']) == pytest.approx(3.02)
+    assert lines['dimeal_section_seconds_count{section="scale"}'] == "2"
+    assert float(lines['dimeal_section_seconds_sum{section="scale"}']) == pytest.approx(0.012)
+    # Reruns that did not count their elements add nothing
+    assert lines['dimeal_rerun_elements_total{kind="full"}'] == "10"
+    assert 'dimeal_rerun_elements_total{kind="tab \\"x\\""}' not in lines
+    assert lines['dimeal_rerun_seconds_count{kind="tab \\"x\\""}'] == "1"
+    assert sum(1 for key in lines if key.startswith('dimeal_rerun_seconds_bucket{kind="full"')) == len(RERUN_BUCKETS) + 1
+
+
+def test_metrics_file_is_written_when_due(tmp_path):
+    path = tmp_path / "dimeal.prom"
+    exporter = MetricsExporter(path, interval=0)
+    exporter.record(finished("full", 0.02))
+    assert path.read_text() == exporter.render()
+    assert [p.name for p in tmp_path.iterdir()] == ["dimeal.prom"]
+
+    # The first record writes; later ones wait for the interval
+    quiet = MetricsExporter(tmp_path / "quiet.prom", interval=3600)
+    quiet.record(finished("full", 0.02))
+    (tmp_path / "quiet.prom").unlink()
+    quiet.record(finished("full", 0.02))
+    assert not (tmp_path / "quiet.prom").exists()
@@ -0,0 +1,42 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from dimeal.purchasing import PackageTable, PriceError
+
+
+def brute_force(sizes, prices, amount):
+    best = None
+    for counts in itertools.product(range(int(amount // min(sizes)) + 2), repeat=len(sizes)):
+        if np.dot(counts, sizes) >= amount - 1e-9:
+            cost = float(np.dot(counts, prices))
+            best = cost if best is None else min(best, cost)
+    return best
+
+
+@pytest.mark.parametrize("sizes, prices", [
+    ((16.0, 40.0), (4.0, 8.0)),
+    ((12.0, 32.0, 80.0), (3.5, 8.0, 17.0)),
+    ((3.0, 5.0), (2.0, 3.0)),
+])
+def test_cheapest_cover_matches_brute_force(sizes, prices):
+    table = PackageTable([f"{s} oz" for s in sizes], sizes, prices)
+    amounts = np.arange(0.0, 130.0, 3.5)
+    counts, cost = table.solve(amounts)
+    for amount, row, total in zip(amounts, counts, cost):
+        assert np.dot(row, sizes) >= amount - 1e-9
+        assert np.dot(row, prices) == pytest.approx(total)
+        assert total == pytest.approx(brute_force(sizes, prices, amount))
+
+
+def test_large_amounts_use_best_value_packages():
+    table = PackageTable(["small", "big"], (16.0, 40.0), (4.0, 8.0))
+    counts, cost = table.solve([10_000.0])
+    assert np.dot(counts[0], (16.0, 40.0)) >= 10_000.0
+    assert cost[0] == pytest.approx(8.0 * 250)
+
+
+def test_rejects_empty_package():
+    with pytest.raises(PriceError):
+        PackageTable(["none"], (0.0,), (1.0,))
@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import pytest
+
+from dimeal.engine import scale_batch
+from dimeal.profiles import ProfileStore
+from dimeal.rotation import DAYS_PER_WEEK, Rotation, plan_rotation
+from dimeal.shopping import default_index
+
+RECIPES = ["Chicken", "Turkey", "Beef", "Fish"]
+
+
+def kennel(dogs, seed=0):
+    rng = np.random.default_rng(seed)
+    return ProfileStore([f"Dog {i}" for i in range(dogs)], rng.uniform(5, 30, size=(dogs, len(RECIPES))), RECIPES)
+
+
+def test_schedule_follows_the_rules():
+    profiles = kennel(3)
+    plan = plan_rotation(profiles, 12, Rotation(RECIPES, weeks_per_recipe=2, stagger=True, avoid={"Dog 2": {"Beef"}}))
+    for d, dog in enumerate(plan.dogs):
+        weeks = [plan.recipe_for(dog, w) for w in range(plan.weeks)]
+        allowed = [name for name in RECIPES if not (dog == "Dog 2" and name == "Beef")]
+        # Two weeks per recipe, in rotation order, each dog one step further along
+        for w in range(plan.weeks):
+            assert weeks[w] == allowed[(w // 2 + d) % len(allowed)]
+    assert "Beef" not in [plan.recipe_for("Dog 2", w) for w in range(12)]
+
+
+def test_without_stagger_everyone_eats_the_same():
+    plan = plan_rotation(kennel(4), 8, Rotation(RECIPES))
+    assert (plan.schedule == plan.schedule[0]).all()
+    assert [plan.recipe_for("Dog 0", w) for w in range(5)] == RECIPES + ["Chicken"]
+
+
+def test_a_dog_with_nothing_allowed_is_not_fed():
+    plan = plan_rotation(kennel(2), 4, Rotation(["Chicken"], avoid={"Dog 1": {"Chicken"}}))
+    assert plan.recipe_for("Dog 1", 0) is None
+    assert (plan.schedule[1] == -1).all()
+
+
+def test_requirements_match_scaling_each_batch():
+    index = default_index()
+    profiles = kennel(5)
+    plan = plan_rotation(profiles, 6, Rotation(RECIPES, stagger=True), index=index)
+    for week in range(plan.weeks):
+        # Each dog eats its profile portion of its recipe for seven days
+        oz_days = {}
+        for dog in plan.dogs:
+            name = plan.recipe_for(dog, week)
+            oz_days[name] = oz_days.get(name, 0.0) + profiles.portion(dog, name) * DAYS_PER_WEEK
+        batches = plan.batches(week)
+        assert {name: oz * days for name, oz, days in batches} == pytest.approx(oz_days)
+        totals, _ = index.aggregate(scale_batch(batches, index.book))
+        np.testing.assert_allclose(plan.requirements[week], totals, atol=1e-9)
+    np.testing.assert_allclose(plan.requirements.sum(axis=0), index.matrix @ plan.oz_days.sum(axis=0))
+
+
+def test_shopping_lists():
+    plan = plan_rotation(kennel(2), 4, Rotation(["Chicken", "Beef"]))
+    week = {name: recipes for name, _, _, recipes in plan.shopping_list(week=0)}
+    assert week["Chicken Thighs"] == ("Chicken",) and "Ground Beef" not in week
+    total = {name: recipes for name, _, _, recipes in plan.shopping_list()}
+    assert "Ground Beef" in total and "Chicken Thighs" in total
+
+
+def test_only_the_chosen_dogs():
+    profiles = kennel(3)
+    plan = plan_rotation(profiles, 2, Rotation(RECIPES), dogs=["Dog 2", "Nobody"])
+    assert plan.dogs == ["Dog 2"]
+    assert plan.oz_days[0].sum() == pytest.approx(profiles.portion("Dog 2", "Chicken") * DAYS_PER_WEEK)
+
+
+@pytest.mark.parametrize("kwargs", [{"recipes": []}, {"recipes": RECIPES, "weeks_per_recipe": 0}])
+def test_rejects_bad_rules(kwargs):
+    with pytest.raises(ValueError):
+        Rotation(**kwargs)
+
+
+def test_a_kennel_year_is_fast():
+    profiles = kennel(500)
+    rotation = Rotation(RECIPES, stagger=True)
+    plan_rotation(profiles, 52, rotation)
+    start = time.perf_counter()
+    plan = plan_rotation(profiles, 52, rotation)
+    assert plan.requirements.shape == (52, len(default_index().keys))
+    # Milliseconds in practice; generous for a loaded CI machine
+    assert time.perf_counter() - start < 0.5
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+from dimeal.service import RequestError, ScaleService, scale_key
+
+
+def call(method, path, query=b"", body=b""):
+    messages = [{"type": "http.request", "body": body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query}
+    asyncio.run(ScaleService()(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_scale_get():
+    status, body = call("GET", "/scale", b"recipe=Chicken&total_daily_oz=36&days=7")
+    assert status == 200
+    assert body["recipe"] == "Chicken" and body["ingredients"]
+
+
+@pytest.mark.parametrize("query", [
+    b"recipe=Chicken&total_daily_oz=nan&days=7",
+    b"recipe=Chicken&total_daily_oz=36&days=inf",
+    b"recipe=Chicken&total_daily_oz=-1&days=7",
+    b"recipe=Chicken&total_daily_oz=36",
+    b"recipe=Gravel&total_daily_oz=36&days=7",
+])
+def test_scale_get_rejects_bad_input(query):
+    status, body = call("GET", "/scale", query)
+    assert status == 400
+    assert "error" in body
+
+
+@pytest.mark.parametrize("payload", [
+    {"recipe": ["x"], "total_daily_oz": 36, "days": 7},
+    {"recipe": {"a": 1}, "total_daily_oz": 36, "days": 7},
+    {"requests": [1]},
+    {"requests": [{"recipe": "Chicken", "total_daily_oz": 36, "days": float("nan")}]},
+])
+def test_scale_post_rejects_bad_input(payload):
+    status, _ = call("POST", "/scale", body=json.dumps(payload).encode())
+    assert status == 400
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/scale", b'{"requests": 5}'),
+    ("/scale", b'{"requests": {"recipe": "Chicken"}}'),
+    ("/scale", b'{"requests": "Chicken"}'),
+    ("/scale", b'[{"recipe": "Chicken", "total_daily_oz": 36, "days": 7}]'),
+    ("/scale", b"not json"),
+    ("/shopping-list", b'{"plan": 5}'),
+    ("/shopping-list", b'{"plan": {"recipe": "Chicken"}}'),
+    ("/shopping-list", b'{"plan": [5]}'),
+    ("/shopping-list", b'[]'),
+])
+def test_post_rejects_bad_shapes(path, body):
+    status, response = call("POST", path, body=body)
+    assert status == 400
+    assert response["error"]
+
+
+def test_batch_and_shopping_list():
+    item = {"recipe": "Chicken", "total_daily_oz": 36, "days": 7}
+    status, body = call("POST", "/scale", body=json.dumps({"requests": [item, item]}).encode())
+    assert status == 200 and len(body["results"]) == 2
+    status, body = call("POST", "/shopping-list", body=json.dumps({"plan": [item]}).encode())
+    assert status == 200 and body["items"]
+
+
+def test_scale_key():
+    assert scale_key({"recipe": "Chicken", "total_daily_oz": "36", "days": 7}) == ("Chicken", 36.0, 7.0)
+    with pytest.raises(RequestError):
+        scale_key({"recipe": "Chicken", "total_daily_oz": 0, "days": 7})
@@ -0,0 +1,82 @@
+import io
+import zipfile
+
+import pytest
+
+from dimeal.cli import main, read_chunks, scale_chunk
+from dimeal.engine import scale_batch
+from dimeal.sheets import (
+    PREP_CHECKLIST, SheetBookWriter, SheetDirectoryWriter, SheetZipWriter, batch_sheets, chunk_sheets, document,
+    plan_document,
+)
+
+PLANS = "household,recipe,days,total_daily_oz\nSmith & Co,Chicken,7,36\nSmith & Co,Beef,3,20\n<Jones>,Fish,14,37.5\n"
+
+
+def chunk():
+    (first_line, rows), = read_chunks(io.StringIO(PLANS), 100)
+    return scale_chunk(first_line, rows)
+
+
+def test_sheet_contents():
+    (name, section), = batch_sheets(scale_batch([("Chicken", 36.0, 7)]), ["Smith & Co"])
+    assert name == "Smith-Co-Chicken"
+    assert "<h1>Smith &amp; Co – Chicken</h1>" in section
+    assert "7 days · 36.0 oz/day · scale ×1.000" in section
+    assert "Chicken Thighs" in section
+    assert section.count("<li>") == len(PREP_CHECKLIST)
+
+
+def test_chunk_sheets_match_batch_sheets():
+    from_chunk = chunk_sheets(chunk())
+    batch = scale_batch([("Chicken", 36.0, 7), ("Beef", 20.0, 3), ("Fish", 37.5, 14)])
+    from_batch = list(batch_sheets(batch, ["Smith & Co", "Smith & Co", "<Jones>"]))
+    assert [name for name, _ in from_chunk] == ["Smith-Co-Chicken", "Smith-Co-Beef", "Jones-Fish"]
+    assert from_chunk == from_batch
+    assert "&lt;Jones&gt;" in from_chunk[2][1]
+
+
+def test_plan_document():
+    page = plan_document([("Chicken", 36.0, 7), ("Beef", 20.0, 3)], title="Week <1>")
+    assert page.startswith("<!DOCTYPE html>") and page.endswith("</html>")
+    assert "<title>Week &lt;1&gt;</title>" in page
+    assert page.count("<section class='sheet'>") == 2
+
+
+def test_writers(tmp_path):
+    sheets = chunk_sheets(chunk())
+
+    book = io.StringIO()
+    writer = SheetBookWriter(book)
+    for sheet in sheets:
+        writer.write(*sheet)
+    writer.close()
+    assert book.getvalue() == document([section for _, section in sheets])
+
+    archive = io.BytesIO()
+    writer = SheetZipWriter(archive)
+    for sheet in sheets:
+        writer.write(*sheet)
+    writer.close()
+    names = zipfile.ZipFile(archive).namelist()
+    assert names == ["000001-Smith-Co-Chicken.html", "000002-Smith-Co-Beef.html", "000003-Jones-Fish.html"]
+
+    writer = SheetDirectoryWriter(tmp_path / "sheets")
+    for sheet in sheets:
+        writer.write(*sheet)
+    writer.close()
+    assert sorted(p.name for p in (tmp_path / "sheets").iterdir()) == sorted(names)
+
+
+@pytest.mark.parametrize("output, workers", [("book.html", 1), ("sheets.zip", 2), ("sheets", 1)])
+def test_sheets_command(tmp_path, output, workers):
+    plans = tmp_path / "plans.csv"
+    plans.write_text(PLANS, encoding="utf-8")
+    target = tmp_path / output
+    main(["sheets", str(plans), "-o", str(target), "--workers", str(workers), "--chunk-size", "2"])
+    if output.endswith(".html"):
+        assert target.read_text(encoding="utf-8").count("<section class='sheet'>") == 3
+    elif output.endswith(".zip"):
+        assert len(zipfile.ZipFile(target).namelist()) == 3
+    else:
+        assert len(list(target.iterdir())) == 3
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from dimeal.engine import scale_batch
+from dimeal.recipes import RECIPE_DATA
+from dimeal.shopping import UNIT_CONVERSIONS, canonical_name, default_index, display_amount, shopping_list
+
+PLAN = [("Chicken", 36.0, 7), ("Fish", 37.5, 14), ("Chicken", 20.0, 3), ("Beef", 30.0, 5)]
+
+
+def reference_totals(plan):
+    """Base-unit totals per (ingredient, dimension), one ingredient at a time."""
+    totals = {}
+    for name, daily_oz, days in plan:
+        recipe = RECIPE_DATA[name]
+        factor = (daily_oz / recipe["base_daily_oz"]) * (days / recipe["base_days"])
+        for ingredient in recipe["ingredients"]:
+            dimension, to_base = UNIT_CONVERSIONS[ingredient["unit"]]
+            key = (canonical_name(ingredient["name"]), dimension)
+            totals[key] = totals.get(key, 0.0) + ingredient["base_7day_amount"] * factor * to_base
+    return totals
+
+
+def test_totals_match_ingredient_by_ingredient_sum():
+    index = default_index()
+    totals, used_by = index.aggregate(scale_batch(PLAN))
+    expected = reference_totals(PLAN)
+    assert {key: totals[i] for i, key in enumerate(index.keys) if totals[i] > 0} == pytest.approx(expected)
+    # Sunflower Oil is bought by weight and by volume, and they stay apart
+    assert ("Sunflower Oil", "weight") in expected and ("Sunflower Oil", "volume") in expected
+    assert used_by[:, index.book.index["Turkey"]].sum() == 0
+
+
+def test_matrix_gives_the_same_totals():
+    index = default_index()
+    oz_days = np.zeros(len(index.book))
+    for name, daily_oz, days in PLAN:
+        oz_days[index.book.index[name]] += daily_oz * days
+    totals, _ = index.aggregate(scale_batch(PLAN))
+    np.testing.assert_allclose(index.matrix @ oz_days, totals)
+
+
+def test_shopping_list_rows():
+    rows = shopping_list(PLAN)
+    names = [(name, unit) for name, _, unit, _ in rows]
+    assert len(names) == len(set(names))
+    recipes = {name: used for name, _, _, used in rows}
+    assert recipes["Chicken Thighs"] == ("Chicken",)
+    assert shopping_list([]) == []
+
+
+@pytest.mark.parametrize("amount, dimension, expected", [
+    (32.0, "weight", (2.0, "lbs")),
+    (8.0, "weight", (8.0, "oz")),
+    (6.0, "volume", (2.0, "tbsp")),
+    (0.5, "volume", (0.5, "tsp")),
+])
+def test_display_amount(amount, dimension, expected):
+    assert display_amount(amount, dimension) == expected
@@ -0,0 +1,182 @@
+import datetime
+import sqlite3
+import time
+
+import pytest
+
+from dimeal.inventory import forecast
+from dimeal.profiles import ProfileStore
+from dimeal.recipes import RECIPE_DATA
+from dimeal.storage import FREEZER_COMPACT_EVERY, FREEZER_KEEP_DAYS, StateStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "dimeal.db"
+
+
+@pytest.fixture
+def store(path):
+    store = StateStore(path)
+    yield store
+    store.close()
+
+
+def test_state_round_trip(path, store):
+    store.set("checklist:a", "ch_cook", True)
+    store.set("plan:a", "rot_recipes", ["Chicken", "Beef"])
+    store.flush()
+
+    other = StateStore(path)
+    try:
+        assert other.get_scope("checklist:a") == {"ch_cook": True}
+        assert other.get("plan:a", "rot_recipes") == ["Chicken", "Beef"]
+        assert other.get("plan:b", "rot_recipes", "none") == "none"
+    finally:
+        other.close()
+
+
+def test_set_keeps_the_rest_of_the_scope(path, store):
+    store.set("plan:a", "one", 1)
+    store.flush()
+    fresh = StateStore(path)
+    try:
+        fresh.set("plan:a", "two", 2)
+        assert fresh.get_scope("plan:a") == {"one": 1, "two": 2}
+    finally:
+        fresh.close()
+
+
+def test_profiles_round_trip(path, store):
+    profiles = ProfileStore.from_recipe_defaults(RECIPE_DATA)
+    store.save_profiles(profiles)
+    store.flush()
+
+    other = StateStore(path)
+    try:
+        loaded = other.load_profiles(list(RECIPE_DATA))
+        assert loaded.dogs == profiles.dogs
+        for dog in profiles.dogs:
+            for recipe in RECIPE_DATA:
+                assert loaded.portion(dog, recipe) == pytest.approx(profiles.portion(dog, recipe))
+    finally:
+        other.close()
+
+
+def test_freezer_ledger_and_compaction(path, store):
+    store.record_batch("Chicken", 100.0, 1.0, datetime.date(2020, 1, 1))
+    store.record_meals("Chicken", [("Dexter", 20.0), ("Indiana", 10.0)], datetime.date(2020, 1, 2))
+    store.flush()
+    assert store.freezer_stock()["Chicken"][0] == pytest.approx(70.0)
+
+    store.compact_freezer_ledger(datetime.date(2021, 1, 1))
+    store.flush()
+    rows = sqlite3.connect(path).execute("SELECT kind, oz FROM freezer_ledger").fetchall()
+    assert rows == [("carried", pytest.approx(70.0))]
+
+    other = StateStore(path)
+    try:
+        assert other.freezer_stock()["Chicken"][0] == pytest.approx(70.0)
+    finally:
+        other.close()
+
+
+def test_back_dated_entries_keep_the_ledger_in_date_order(path, store):
+    store.record_batch("Chicken", 100.0, 1.0, datetime.date(2024, 3, 10))
+    store.record_meals("Chicken", [("Dexter", 10.0)], datetime.date(2024, 3, 12))
+    assert [row[0] for row in store.freezer_ledger()] == ["2024-03-12", "2024-03-10"]
+
+    # Logged today for a day that has already passed
+    store.record_meals("Chicken", [("Indiana", 5.0)], datetime.date(2024, 3, 11))
+    store.record_meals("Chicken", [("Indiana", 6.0)], datetime.date(2024, 3, 12))
+    cached = store.freezer_ledger()
+    assert [(row[0], row[3]) for row in cached] == [
+        ("2024-03-12", "Indiana"), ("2024-03-12", "Dexter"), ("2024-03-11", "Indiana"), ("2024-03-10", None),
+    ]
+
+    store.flush()
+    other = StateStore(path)
+    try:
+        assert other.freezer_ledger() == cached
+        assert other.freezer_ledger(limit=2) == cached[:2]
+    finally:
+        other.close()
+
+
+def old_entries(path, count):
+    """``count`` entries from before the keep window, as earlier runs of the app would have left."""
+    day = (datetime.date.today() - datetime.timedelta(days=FREEZER_KEEP_DAYS + 30)).isoformat()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO freezer_ledger (day, kind, recipe, dog, oz, scale) VALUES (?, 'eaten', 'Beef', 'Dexter', -1, NULL)",
+            [(day,)] * count,
+        )
+    conn.close()
+
+
+def ledger_kinds(path):
+    conn = sqlite3.connect(path)
+    kinds = dict(conn.execute("SELECT kind, count(*) FROM freezer_ledger GROUP BY kind").fetchall())
+    conn.close()
+    return kinds
+
+
+def test_compaction_does_not_wait_for_appends_in_this_process(path, store):
+    old_entries(path, FREEZER_COMPACT_EVERY)
+    # A freshly started store compacts on its first append
+    restarted = StateStore(path)
+    try:
+        restarted.record_meals("Beef", [("Dexter", 1.0)])
+        restarted.flush()
+        assert ledger_kinds(path) == {"carried": 1, "eaten": 1}
+        assert restarted.freezer_stock()["Beef"][0] == pytest.approx(-FREEZER_COMPACT_EVERY - 1.0)
+    finally:
+        restarted.close()
+
+
+def test_few_old_entries_are_left_alone(path, store):
+    old_entries(path, FREEZER_COMPACT_EVERY - 2)
+    store.record_meals("Beef", [("Dexter", 1.0)])
+    store.flush()
+    assert ledger_kinds(path) == {"eaten": FREEZER_COMPACT_EVERY - 1}
+
+
+def test_forecast():
+    today = datetime.date(2024, 1, 1)
+    result = forecast({"Chicken": 100.0, "Beef": 30.0, "Fish": -5.0, "Turkey": 10.0},
+                      {"Chicken": 20.0, "Beef": 40.0, "Fish": 10.0}, today)
+    rows = {row[0]: row[1:] for row in result.rows}
+    assert rows["Chicken"] == (100.0, 20.0, 5.0, datetime.date(2024, 1, 6))
+    assert rows["Beef"] == (30.0, 40.0, 0.75, today)
+    assert rows["Fish"] == (0.0, 10.0, 0.0, today)            # overdrawn stock counts as none
+    assert rows["Turkey"] == (10.0, 0.0, None, None)          # nobody eats it
+    assert result.total_days == pytest.approx(5.75)
+    assert result.next_prep() == datetime.date(2024, 1, 6)
+    assert result.next_prep(lead_days=2) == datetime.date(2024, 1, 4)
+    assert result.next_prep(lead_days=30) == today
+
+
+def test_forecast_from_the_store(store):
+    today = datetime.date.today()
+    store.record_batch("Chicken", 360.0, 1.0, today)
+    store.record_meals("Chicken", [("Dexter", 22.0), ("Indiana", 14.0)], today)
+    stock = {recipe: on_hand for recipe, (on_hand, _) in store.freezer_stock().items()}
+    result = forecast(stock, {"Chicken": 36.0}, today)
+    assert result.rows == [("Chicken", 324.0, 36.0, 9.0, today + datetime.timedelta(days=9))]
+
+
+def test_busy_database_is_retried(path):
+    store = StateStore(path, busy_timeout=0.05)
+    try:
+        blocker = sqlite3.connect(path, isolation_level=None)
+        blocker.execute("BEGIN EXCLUSIVE")
+        store.set("plan:a", "k", 1)
+        # Longer than busy_timeout, so the writer has to try again
+        time.sleep(0.3)
+        blocker.execute("COMMIT")
+        store.flush()
+        assert sqlite3.connect(path).execute("SELECT value FROM state WHERE key = 'k'").fetchall() == [("1",)]
+        blocker.close()
+    finally:
+        store.close()
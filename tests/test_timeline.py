@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from dimeal.timeline import Kitchen, KitchenError, batch_tasks, plan_cook_day, schedule
+
+RECIPES = ("Chicken", "Turkey", "Beef", "Fish")
+KITCHENS = [
+    Kitchen(),
+    Kitchen(burners=1, ovens=1, pots=1, bowls=1),
+    Kitchen(burners=6, ovens=2, pots=2, bowls=2),
+]
+
+
+def plans(count, oz=36, days=7):
+    return [(RECIPES[i % len(RECIPES)], oz + i % 5, days) for i in range(count)]
+
+
+def check(day):
+    end = day.end
+    for t, task in enumerate(day.tasks):
+        for p in task.after:
+            assert day.start[t] >= end[p], f"{task.label} starts before {day.tasks[p].label} is done"
+
+    for kind, capacity in day.kitchen.capacity.items():
+        usage = np.zeros(day.makespan + 1, dtype=np.int64)
+        for t, task in enumerate(day.tasks):
+            usage[day.start[t]:end[t]] += task.needs.get(kind, 0)
+        assert usage.max() <= capacity, f"more than {capacity} {kind} in use at minute {usage.argmax()}"
+
+    # No unit of equipment is given two steps at once
+    for kind in day.kitchen.capacity:
+        spans = {}
+        for t, units in enumerate(day.equipment()):
+            if kind in units:
+                spans.setdefault(units[kind], []).append((int(day.start[t]), int(end[t])))
+        for unit, used in spans.items():
+            used.sort()
+            assert all(a_end <= b_start for (_, a_end), (b_start, _) in zip(used, used[1:]))
+
+    assert day.makespan >= day.lower_bound > 0
+
+
+@pytest.mark.parametrize("kitchen", KITCHENS)
+@pytest.mark.parametrize("count", [1, 4, 12])
+def test_schedule_is_feasible(kitchen, count):
+    check(plan_cook_day(plans(count), kitchen))
+
+
+def test_big_batches_split_into_loads():
+    day = plan_cook_day([("Beef", 150, 14)])
+    check(day)
+    assert any(task.loads > 1 for task in day.tasks)
+
+
+def test_rows_are_in_time_order():
+    day = plan_cook_day(plans(4))
+    rows = day.rows()
+    assert len(rows) == len(day.tasks)
+    assert [start for start, *_ in rows] == sorted(start for start, *_ in rows)
+    assert max(end for _, end, _, _ in rows) == day.makespan
+    assert all(where for *_, where in rows)
+
+
+def test_close_to_the_lower_bound():
+    day = plan_cook_day(plans(24))
+    assert day.makespan <= 1.15 * day.lower_bound
+
+
+def test_missing_equipment():
+    with pytest.raises(KitchenError, match="oven"):
+        plan_cook_day([("Chicken", 36, 7)], Kitchen(ovens=0))
+    with pytest.raises(KitchenError, match="bowl"):
+        plan_cook_day([("Beef", 36, 7)], Kitchen(bowls=0))
+
+
+def test_nothing_to_cook():
+    day = schedule([])
+    assert day.makespan == 0 and day.rows() == []
+
+
+def test_tasks_wait_for_earlier_ones():
+    tasks = batch_tasks(plans(3))
+    assert all(p < t for t, task in enumerate(tasks) for p in task.after)
+    assert {task.step for task in tasks if not task.after} <= {"roast", "brown", "boil", "steam"}
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from dimeal import traces
+from dimeal.traces import TraceWriter, load_traces, snapshot
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(traces.time, "monotonic", lambda: now[0])
+    return now
+
+
+def events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_writes_only_the_visitors_changes(tmp_path, clock):
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path)
+    writer.record("s", snapshot({"clean_days": 7}))
+    writer.settle("s", snapshot({"clean_days": 7, "clean_recipe": "Chicken"}))   # set by the script
+    clock[0] += 2.5
+    writer.record("s", snapshot({"clean_days": 14, "clean_recipe": "Chicken"}))
+    assert events(path) == [{"session": "s.1", "t": 2.5, "key": "clean_days", "value": 14}]
+    assert load_traces(path) == [[(2.5, "clean_days", 14)]]
+
+
+def test_idle_sessions_are_forgotten(tmp_path, clock):
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path, idle_timeout=60)
+    writer.record("a", snapshot({"k": 1}))
+    writer.record("b", snapshot({"k": 1}))
+    clock[0] += 30
+    writer.record("b", snapshot({"k": 2}))
+    assert len(writer) == 2
+    clock[0] += 45
+    writer.record("c", snapshot({"k": 1}))
+    assert len(writer) == 2    # "a" was idle for 75 s
+
+    # "a" comes back as a new trace, starting its clock again
+    writer.record("a", snapshot({"k": 5}))
+    clock[0] += 1
+    writer.record("a", snapshot({"k": 6}))
+    assert [(e["session"], e["t"], e["value"]) for e in events(path)] == [("b.2", 30.0, 2), ("a.4", 1.0, 6)]
+
+
+def test_session_count_is_bounded(tmp_path, clock):
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path, max_sessions=3)
+    for i in range(10):
+        writer.record(f"s{i}", snapshot({"k": i}))
+        writer.settle("s0", snapshot({"k": 0}))   # keeps s0 recently seen
+    assert len(writer) == 3
+    # s0 is still traced under its first id
+    writer.record("s0", snapshot({"k": 1}))
+    assert [e["session"] for e in events(path)] == ["s0.1"]
+
+
+def test_load_traces_rejects_bad_lines(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    path.write_text('{"session": "s", "t": 1, "key": "k", "value": 1}\n\n{"session": "s"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="trace.jsonl:3"):
+        load_traces(path)